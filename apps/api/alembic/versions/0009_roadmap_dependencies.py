@@ -0,0 +1,67 @@
+"""Roadmap dependency edge table.
+
+Revision ID: 0009_roadmap_dependencies
+Revises: 0008_note_retrieval_index
+Create Date: 2026-10-19
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009_roadmap_dependencies"
+down_revision = "0008_note_retrieval_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "roadmap_dependencies",
+        sa.Column("roadmap_item_id", sa.Integer(), sa.ForeignKey("roadmap_items.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("depends_on_item_id", sa.Integer(), primary_key=True),
+        sa.Column("family_id", sa.Integer(), sa.ForeignKey("families.id", ondelete="CASCADE"), nullable=False),
+    )
+    op.create_index(
+        "ix_roadmap_dependencies_depends_on",
+        "roadmap_dependencies",
+        ["depends_on_item_id", "roadmap_item_id"],
+    )
+    op.create_index("ix_roadmap_dependencies_family", "roadmap_dependencies", ["family_id"])
+
+    # Backfill edges from the JSON column.
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            """
+            SELECT r.id AS id, r.dependencies AS dependencies, d.family_id AS family_id
+            FROM roadmap_items r
+            JOIN decisions d ON d.id = r.decision_id
+            """
+        )
+    ).mappings().all()
+    edges = []
+    for row in rows:
+        try:
+            deps = json.loads(row["dependencies"] or "[]")
+        except ValueError:
+            continue
+        for dep in dict.fromkeys(deps):
+            if isinstance(dep, int) and dep != row["id"]:
+                edges.append({"roadmap_item_id": row["id"], "depends_on_item_id": dep, "family_id": row["family_id"]})
+    if edges:
+        table = sa.table(
+            "roadmap_dependencies",
+            sa.column("roadmap_item_id", sa.Integer()),
+            sa.column("depends_on_item_id", sa.Integer()),
+            sa.column("family_id", sa.Integer()),
+        )
+        op.bulk_insert(table, edges)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_roadmap_dependencies_family", table_name="roadmap_dependencies")
+    op.drop_index("ix_roadmap_dependencies_depends_on", table_name="roadmap_dependencies")
+    op.drop_table("roadmap_dependencies")
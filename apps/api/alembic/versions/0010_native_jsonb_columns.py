@@ -0,0 +1,48 @@
+"""Convert JSON-in-Text columns to JSONB and index decision tags.
+
+Revision ID: 0010_native_jsonb_columns
+Revises: 0009_roadmap_dependencies
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "0010_native_jsonb_columns"
+down_revision = "0009_roadmap_dependencies"
+branch_labels = None
+depends_on = None
+
+
+JSON_TEXT_COLUMNS = [
+    ("goals", "action_types"),
+    ("decisions", "tags"),
+    ("decisions", "attachments"),
+    ("decisions", "links"),
+    ("roadmap_items", "dependencies"),
+]
+
+
+def upgrade() -> None:
+    for table, column in JSON_TEXT_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT")
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE jsonb "
+            f"USING COALESCE(NULLIF(btrim({column}), ''), '[]')::jsonb"
+        )
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT '[]'::jsonb")
+    op.create_index(
+        "ix_decisions_tags_gin",
+        "decisions",
+        ["tags"],
+        postgresql_using="gin",
+        postgresql_ops={"tags": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_decisions_tags_gin", table_name="decisions")
+    for table, column in JSON_TEXT_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE text USING {column}::text")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT '[]'")
@@ -0,0 +1,54 @@
+"""Content hash and entity columns on memory documents (dedup + compaction).
+
+Revision ID: 0011_memory_dedup_columns
+Revises: 0010_native_jsonb_columns
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011_memory_dedup_columns"
+down_revision = "0010_native_jsonb_columns"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("memory_documents", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.add_column("memory_documents", sa.Column("entity_type", sa.String(length=32), nullable=True))
+    op.add_column("memory_documents", sa.Column("entity_id", sa.Integer(), nullable=True))
+
+    # Same formula as app.services.memory.content_hash.
+    op.execute(
+        "UPDATE memory_documents "
+        "SET content_hash = encode(sha256(convert_to(type || E'\\n' || text, 'UTF8')), 'hex')"
+    )
+    # Roadmap and scoring docs carry their ids in the text; "Decision created/updated" docs do not
+    # and only get entity columns going forward.
+    op.execute(
+        "UPDATE memory_documents "
+        "SET entity_type = 'roadmap_item', entity_id = substring(text from '^Roadmap item (?:created|updated): id=(\\d+)')::int "
+        "WHERE type = 'roadmap' AND text ~ '^Roadmap item (created|updated): id=\\d+'"
+    )
+    op.execute(
+        "UPDATE memory_documents "
+        "SET entity_type = 'decision', entity_id = substring(text from '^Decision scored: decision_id=(\\d+)')::int "
+        "WHERE type = 'rationale' AND text ~ '^Decision scored: decision_id=\\d+'"
+    )
+
+    op.create_index("ix_memory_documents_family_hash", "memory_documents", ["family_id", "content_hash"])
+    op.create_index(
+        "ix_memory_documents_entity",
+        "memory_documents",
+        ["family_id", "entity_type", "entity_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_memory_documents_entity", table_name="memory_documents")
+    op.drop_index("ix_memory_documents_family_hash", table_name="memory_documents")
+    op.drop_column("memory_documents", "entity_id")
+    op.drop_column("memory_documents", "entity_type")
+    op.drop_column("memory_documents", "content_hash")
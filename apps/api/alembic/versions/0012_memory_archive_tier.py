@@ -0,0 +1,60 @@
+"""Archive tier for memory documents/embeddings.
+
+Revision ID: 0012_memory_archive_tier
+Revises: 0011_memory_dedup_columns
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0012_memory_archive_tier"
+down_revision = "0011_memory_dedup_columns"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "memory_documents_archive",
+        sa.Column("doc_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("family_id", sa.Integer(), sa.ForeignKey("families.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("type", sa.String(length=64), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("source_refs_jsonb", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+        sa.Column("entity_type", sa.String(length=32), nullable=True),
+        sa.Column("entity_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index(
+        "ix_memory_documents_archive_family_created", "memory_documents_archive", ["family_id", "created_at"]
+    )
+
+    op.create_table(
+        "memory_embeddings_archive",
+        sa.Column(
+            "doc_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("memory_documents_archive.doc_id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("chunk_id", sa.Integer(), primary_key=True),
+        sa.Column("embedding", sa.Text(), nullable=False),  # replaced with vector below
+        sa.Column("metadata_jsonb", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.execute("ALTER TABLE memory_embeddings_archive ALTER COLUMN embedding TYPE vector(1536) USING embedding::vector")
+
+    # Retention sweeps select by (type, created_at) on the hot table.
+    op.create_index("ix_memory_documents_type_created", "memory_documents", ["type", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_memory_documents_type_created", table_name="memory_documents")
+    op.drop_table("memory_embeddings_archive")
+    op.drop_index("ix_memory_documents_archive_family_created", table_name="memory_documents_archive")
+    op.drop_table("memory_documents_archive")
@@ -0,0 +1,38 @@
+"""HNSW indexes for embedding search and a GIN index for memory source_refs filters.
+
+Revision ID: 0013_vector_ann_indexes
+Revises: 0012_memory_archive_tier
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "0013_vector_ann_indexes"
+down_revision = "0012_memory_archive_tier"
+branch_labels = None
+depends_on = None
+
+
+# Searches order by `embedding <-> query` (L2), so the indexes use vector_l2_ops.
+VECTOR_TABLES = ["memory_embeddings", "memory_embeddings_archive", "note_embeddings"]
+
+
+def upgrade() -> None:
+    for table in VECTOR_TABLES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_hnsw ON {table} USING hnsw (embedding vector_l2_ops)")
+    op.create_index(
+        "ix_memory_documents_source_refs_gin",
+        "memory_documents",
+        ["source_refs_jsonb"],
+        postgresql_using="gin",
+        postgresql_ops={"source_refs_jsonb": "jsonb_path_ops"},
+    )
+    op.create_index("ix_memory_documents_family_type_created", "memory_documents", ["family_id", "type", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_memory_documents_family_type_created", table_name="memory_documents")
+    op.drop_index("ix_memory_documents_source_refs_gin", table_name="memory_documents")
+    for table in VECTOR_TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_hnsw")
@@ -0,0 +1,53 @@
+"""Family purge jobs.
+
+Revision ID: 0014_family_purge_jobs
+Revises: 0013_vector_ann_indexes
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0014_family_purge_jobs"
+down_revision = "0013_vector_ann_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "family_purge_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("family_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="queued"),
+        sa.Column("requested_by", sa.String(length=255), nullable=False, server_default="system"),
+        sa.Column("steps_done", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("current_step", sa.String(length=64), nullable=True),
+        sa.Column("deleted_counts", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default="{}"),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_family_purge_jobs_family_status", "family_purge_jobs", ["family_id", "status"])
+    op.create_index("ix_family_purge_jobs_status_updated", "family_purge_jobs", ["status", "updated_at"])
+
+    # Purge steps select children by parent id; these foreign keys had no index of their own.
+    op.create_index("ix_decision_scores_goal", "decision_scores", ["goal_id"])
+    op.create_index("ix_decision_suggestions_decision", "decision_suggestions", ["decision_id"])
+    op.create_index("ix_roadmap_items_decision", "roadmap_items", ["decision_id"])
+    op.create_index("ix_ledger_period", "discretionary_budget_ledger", ["period_id"])
+    op.create_index("ix_audit_actor", "audit_logs", ["actor_member_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_actor", table_name="audit_logs")
+    op.drop_index("ix_ledger_period", table_name="discretionary_budget_ledger")
+    op.drop_index("ix_roadmap_items_decision", table_name="roadmap_items")
+    op.drop_index("ix_decision_suggestions_decision", table_name="decision_suggestions")
+    op.drop_index("ix_decision_scores_goal", table_name="decision_scores")
+    op.drop_index("ix_family_purge_jobs_status_updated", table_name="family_purge_jobs")
+    op.drop_index("ix_family_purge_jobs_family_status", table_name="family_purge_jobs")
+    op.drop_table("family_purge_jobs")
@@ -0,0 +1,72 @@
+"""Family-scoped, insert-only audit log.
+
+Revision ID: 0015_audit_log_capture
+Revises: 0014_family_purge_jobs
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0015_audit_log_capture"
+down_revision = "0014_family_purge_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nothing wrote audit rows before this revision, so there is nothing to backfill.
+    op.add_column("audit_logs", sa.Column("family_id", sa.Integer(), nullable=True))
+    op.create_index("ix_audit_family_created", "audit_logs", ["family_id", "created_at", "id"])
+    op.create_index(
+        "ix_audit_family_entity_created",
+        "audit_logs",
+        ["family_id", "entity_type", "entity_id", "created_at", "id"],
+    )
+
+    # Deleting a member keeps their history; the actor is cleared instead of blocking the delete.
+    op.drop_constraint("audit_logs_actor_member_id_fkey", "audit_logs", type_="foreignkey")
+    op.create_foreign_key(
+        "audit_logs_actor_member_id_fkey",
+        "audit_logs",
+        "family_members",
+        ["actor_member_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+    # Insert-only: rows cannot be deleted or rewritten. The one permitted update is clearing
+    # actor_member_id, which happens when the member is deleted.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION audit_logs_insert_only() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                RAISE EXCEPTION 'audit_logs is insert-only';
+            END IF;
+            IF (NEW.id, NEW.family_id, NEW.entity_type, NEW.entity_id, NEW.action, NEW.changes_json, NEW.created_at)
+                    IS DISTINCT FROM
+                    (OLD.id, OLD.family_id, OLD.entity_type, OLD.entity_id, OLD.action, OLD.changes_json, OLD.created_at)
+                OR (NEW.actor_member_id IS NOT NULL AND NEW.actor_member_id IS DISTINCT FROM OLD.actor_member_id) THEN
+                RAISE EXCEPTION 'audit_logs is insert-only';
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER audit_logs_insert_only BEFORE UPDATE OR DELETE ON audit_logs "
+        "FOR EACH ROW EXECUTE FUNCTION audit_logs_insert_only()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS audit_logs_insert_only ON audit_logs")
+    op.execute("DROP FUNCTION IF EXISTS audit_logs_insert_only()")
+    op.drop_constraint("audit_logs_actor_member_id_fkey", "audit_logs", type_="foreignkey")
+    op.create_foreign_key("audit_logs_actor_member_id_fkey", "audit_logs", "family_members", ["actor_member_id"], ["id"])
+    op.drop_index("ix_audit_family_entity_created", table_name="audit_logs")
+    op.drop_index("ix_audit_family_created", table_name="audit_logs")
+    op.drop_column("audit_logs", "family_id")
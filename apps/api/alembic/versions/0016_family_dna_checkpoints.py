@@ -0,0 +1,35 @@
+"""Family DNA checkpoints for historical reads.
+
+Revision ID: 0016_family_dna_checkpoints
+Revises: 0015_audit_log_capture
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0016_family_dna_checkpoints"
+down_revision = "0015_audit_log_capture"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing families get their checkpoints lazily, the first time a historical read replays past them.
+    op.create_table(
+        "family_dna_checkpoints",
+        sa.Column("family_id", sa.Integer(), sa.ForeignKey("families.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("version", sa.Integer(), primary_key=True),
+        sa.Column("snapshot_jsonb", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_family_dna_events_family_version", "family_dna_events", ["family_id", "result_version"])
+    op.create_index("ix_family_dna_events_family_ts", "family_dna_events", ["family_id", "ts"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_family_dna_events_family_ts", table_name="family_dna_events")
+    op.drop_index("ix_family_dna_events_family_version", table_name="family_dna_events")
+    op.drop_table("family_dna_checkpoints")
@@ -0,0 +1,24 @@
+"""Base version on Family DNA patch proposals.
+
+Revision ID: 0017_dna_proposal_base_version
+Revises: 0016_family_dna_checkpoints
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0017_dna_proposal_base_version"
+down_revision = "0016_family_dna_checkpoints"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NULL for proposals made before this revision: they are applied to the latest snapshot, as before.
+    op.add_column("family_dna_patch_proposals", sa.Column("base_version", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("family_dna_patch_proposals", "base_version")
@@ -0,0 +1,32 @@
+"""Idempotency records for POST /v1/batch.
+
+Revision ID: 0018_batch_idempotency_records
+Revises: 0017_dna_proposal_base_version
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0018_batch_idempotency_records"
+down_revision = "0017_dna_proposal_base_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "batch_idempotency_records",
+        sa.Column("key", sa.String(length=255), primary_key=True),
+        sa.Column("fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("results", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default="[]"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_batch_idempotency_records_created", "batch_idempotency_records", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_batch_idempotency_records_created", table_name="batch_idempotency_records")
+    op.drop_table("batch_idempotency_records")
@@ -12,8 +12,32 @@ class Settings(BaseSettings):
     postgres_password: str = "decision_pass"
     postgres_host: str = "db"
     postgres_port: int = 5432
+    # Optional streaming replica for read-only endpoints (empty host disables routing).
+    postgres_replica_host: str = ""
+    postgres_replica_port: int = 5432
+    # Without an LSN to compare (non-Postgres), clients that wrote within this window read from the primary.
+    replica_max_lag_seconds: float = 5.0
+    # Connection pool tuning (see app/core/db.py). Pre-ping costs a round trip per checkout;
+    # pool_recycle plus SQLAlchemy's disconnect handling is usually enough.
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 10.0
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = False
+    db_statement_timeout_ms: int = 30_000  # 0 disables
+    db_lock_timeout_ms: int = 5_000  # 0 disables
+    # Transaction-pooling PgBouncer in front of Postgres: no session-level state, timeouts via SET LOCAL.
+    db_pgbouncer_mode: bool = False
     redis_host: str = "redis"
     redis_port: int = 6379
+    # Search caches (app/services/search_cache.py): redis | memory (single process, tests).
+    search_cache_enabled: bool = True
+    search_cache_backend: str = "redis"
+    search_cache_redis_db: int = 2
+    search_cache_timeout_seconds: float = 0.2
+    search_cache_retry_seconds: float = 30.0  # back off this long after a cache error
+    search_cache_embedding_ttl_seconds: int = 600
+    search_cache_result_ttl_seconds: int = 60
 
     # Keycloak (for group -> family sync)
     keycloak_base_url: str = "http://keycloak:8080"
@@ -24,6 +48,54 @@ class Settings(BaseSettings):
     openai_api_key: str = ""
     note_embedding_model: str = "text-embedding-3-small"
     note_embedding_timeout_seconds: float = 20.0
+    # Chunking for notes/memory embeddings (estimated tokens; keep under the embedding model's input limit).
+    chunk_max_tokens: int = 300
+    chunk_overlap_tokens: int = 40
+    chunk_embed_batch_size: int = 32
+    # Memory retention tiers: days a document stays in the hot tables, per type (unlisted types stay hot),
+    # then how long the archive keeps it (0 = forever). Set as JSON, e.g. MEMORY_HOT_RETENTION_DAYS='{"chat": 14}'.
+    memory_hot_retention_days: dict[str, int] = {"chat": 30, "note": 90, "rationale": 180, "roadmap": 180, "decision": 365}
+    memory_archive_retention_days: int = 0
+    memory_retention_batch_size: int = 500
+    # Family purge: rows per DELETE statement (each batch commits), and how long a running job may go
+    # without progress before the resume sweep takes it over.
+    purge_batch_size: int = 1000
+    purge_job_stale_seconds: int = 300
+    # POST /v1/batch: most operations one request may run in its single transaction.
+    batch_max_operations: int = 100
+    # How long the result of a batch sent with an Idempotency-Key is kept; a repeat within it is not re-run.
+    batch_idempotency_ttl_seconds: int = 86400
+    # Family DNA: a full checkpoint is stored every N versions, so a historical read replays at most N patches.
+    dna_checkpoint_interval: int = 50
+    # Memory search: candidates fetched per requested hit for diversity reranking, and whether filtered
+    # HNSW scans may continue past ef_search (hnsw.iterative_scan; skipped automatically below pgvector 0.8).
+    memory_search_candidate_multiplier: int = 4
+    memory_search_iterative_scan: bool = True
+    # Where note/memory vectors live: auto (pgvector on Postgres, the local store elsewhere) | pgvector | local.
+    vector_store: str = "auto"
+    # Local store: per-family float32 matrices under this directory; flat (NumPy brute force) | hnsw (hnswlib).
+    local_vector_store_dir: str = ".vector_store"
+    local_vector_index: str = "flat"
+    # OpenAI request sizing (API limits: 2048 inputs / 300k tokens per request) and client-side throttling.
+    openai_embedding_batch_size: int = 512
+    openai_embedding_batch_tokens: int = 200_000
+    openai_embedding_concurrency: int = 4
+    openai_embedding_max_retries: int = 5
+    openai_embedding_backoff_base_seconds: float = 0.5
+    openai_embedding_backoff_max_seconds: float = 20.0
+    # auto (OpenAI when a key is set, else hash) | openai | local | hash
+    embedding_provider: str = "auto"
+    # Width the provider produces; vectors are zero-padded to the 1536-wide storage columns.
+    embedding_dim: int = 1536
+    # Local CPU provider: directory holding model.onnx + tokenizer.json.
+    local_embedding_model_dir: str = ""
+    local_embedding_max_length: int = 256
+    local_embedding_max_batch_tokens: int = 16_384
+    local_embedding_max_batch_size: int = 64
+    local_embedding_tokenizer_workers: int = 4
+    local_embedding_intra_op_threads: int = 0
+    # Disable NATS publishing entirely (offline benchmarks, local runs without a broker).
+    events_enabled: bool = True
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -34,5 +106,14 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
+    @property
+    def replica_database_url(self) -> str | None:
+        if not self.postgres_replica_host.strip():
+            return None
+        return (
+            f"postgresql+psycopg2://{self.postgres_user}:{self.postgres_password}"
+            f"@{self.postgres_replica_host}:{self.postgres_replica_port}/{self.postgres_db}"
+        )
+
 
 settings = Settings()
@@ -1,15 +1,240 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from __future__ import annotations
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+
+class _PoolWaitStats:
+    """Process-wide counters for time spent waiting on a pooled connection."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, seconds: float, *, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += int(timed_out)
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_seconds_total": round(self.wait_seconds_total, 6),
+                "checkout_wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+pool_wait_stats = _PoolWaitStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            pool_wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_wait_stats.record(time.perf_counter() - started)
+        return conn
+
+
+def _timeout_settings() -> list[tuple[str, int]]:
+    return [
+        (name, value)
+        for name, value in (
+            ("statement_timeout", settings.db_statement_timeout_ms),
+            ("lock_timeout", settings.db_lock_timeout_ms),
+        )
+        if value > 0
+    ]
+
+
+def build_engine(url: str):
+    kwargs: dict[str, Any] = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    is_postgres = url.startswith("postgresql")
+    timeouts = _timeout_settings() if is_postgres else []
+    if timeouts and not settings.db_pgbouncer_mode:
+        # Direct connections: set timeouts once per connection as startup parameters (no per-transaction cost).
+        kwargs["connect_args"] = {"options": " ".join(f"-c {name}={value}" for name, value in timeouts)}
+    engine = create_engine(url, **kwargs)
+
+    if timeouts and settings.db_pgbouncer_mode:
+        # In transaction pooling mode server connections are shared between clients, so session-level SETs
+        # (and startup options, which PgBouncer rejects) would leak. Scope them to each transaction instead.
+        # psycopg2 interpolates parameters client-side, so no server-side prepared statements are created.
+        set_local = "; ".join(f"SET LOCAL {name} = {value}" for name, value in timeouts)
+
+        @event.listens_for(engine, "begin")
+        def _set_local_timeouts(conn) -> None:
+            conn.exec_driver_sql(set_local)
+
+    return engine
+
+
+def pool_status(bind=None) -> dict[str, Any]:
+    pool = (bind or engine).pool
+    status: dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        )
+    status.update(pool_wait_stats.snapshot())
+    return status
+
+
+engine = build_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_replica_url = settings.replica_database_url
+replica_engine = build_engine(_replica_url) if _replica_url else None
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine is not None else None
+)
+
+# Read-your-writes: after a request commits a write, the client receives a consistency token
+# (the primary's WAL LSN on Postgres, a timestamp elsewhere). Reads presenting a token are only
+# served by the replica once it has replayed past that point.
+CONSISTENCY_TOKEN_HEADER = "X-Consistency-Token"
+CONSISTENCY_TOKEN_COOKIE = "consistency_token"
+CONSISTENCY_TOKEN_TTL_SECONDS = 60
+
+_request_writes: ContextVar[dict[str, str] | None] = ContextVar("request_writes", default=None)
+
 
-def get_db():
+def track_request_writes() -> dict[str, str]:
+    """Start collecting the consistency token for the current request; returns the holder to read it from."""
+    holder: dict[str, str] = {}
+    _request_writes.set(holder)
+    return holder
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_session_wrote(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_consistency_token(session: Session) -> None:
+    if session.info.pop("wrote", False):
+        record_request_write(session.get_bind())
+
+
+def record_request_write(bind) -> None:
+    """Stamp the current request's consistency token after a committed write on `bind`."""
+    if ReplicaSessionLocal is None:
+        return
+    holder = _request_writes.get()
+    if holder is None:
+        return
+    if bind.dialect.name == "postgresql":
+        with bind.engine.connect() as conn:
+            lsn = conn.exec_driver_sql("SELECT pg_current_wal_lsn()::text").scalar()
+        holder["token"] = f"lsn:{lsn}"
+    else:
+        holder["token"] = f"ts:{time.time():.6f}"
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_session_wrote(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+
+def replica_is_fresh(replica: Session, token: str | None) -> bool:
+    if not token:
+        return True
+    kind, _, value = token.partition(":")
+    try:
+        if kind == "ts":
+            return time.time() - float(value) > settings.replica_max_lag_seconds
+        if kind == "lsn":
+            # NULL when the "replica" is not in recovery (e.g. pointed at the primary): trivially fresh.
+            caught_up = replica.execute(
+                text("SELECT pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn)"), {"lsn": value}
+            ).scalar()
+            return caught_up is None or bool(caught_up)
+    except Exception:
+        return False
+    return False
+
+
+# Sub-requests of POST /v1/batch carry the batch's session in their ASGI scope: every operation runs in
+# it, and only the batch commits (see app/routers/batch.py).
+BATCH_SESSION_SCOPE_KEY = "decision.batch_session"
+# Set in a batch session's `info`: effects outside the database (search-cache generations, local vector
+# files) queue here; the batch runs them once it commits and drops them if it rolls back.
+DEFERRED_EFFECTS_KEY = "decision.deferred_effects"
+
+
+def is_batch_session(db: Session) -> bool:
+    return DEFERRED_EFFECTS_KEY in db.info
+
+
+def defer_until_batch_commit(db: Session, effect: Callable[[], None]) -> None:
+    """Run `effect` now or, on a batch session (whose commits are only savepoints), after the batch commits."""
+    pending = db.info.get(DEFERRED_EFFECTS_KEY)
+    if pending is None:
+        effect()
+    else:
+        pending.append(effect)
+
+
+def get_db(request: Request):
+    batch = request.scope.get(BATCH_SESSION_SCOPE_KEY)
+    if batch is not None:
+        yield batch
+        return
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Session for read-only endpoints.
+
+    Routes to the replica when one is configured and has caught up with the caller's last write;
+    otherwise falls back to the primary session from `get_db`. Never use it for handlers that write.
+    """
+    if ReplicaSessionLocal is None or BATCH_SESSION_SCOPE_KEY in request.scope:
+        yield db
+        return
+    replica = ReplicaSessionLocal()
+    try:
+        token = request.headers.get(CONSISTENCY_TOKEN_HEADER) or request.cookies.get(CONSISTENCY_TOKEN_COOKIE)
+        yield replica if replica_is_fresh(replica, token) else db
+    finally:
+        replica.close()
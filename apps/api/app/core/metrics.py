@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+registry = CollectorRegistry(auto_describe=True)
+
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+    registry=registry,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "api_request_db_queries",
+    "SQL statements executed per HTTP request.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144),
+    registry=registry,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "api_request_db_seconds",
+    "Time spent executing SQL per HTTP request.",
+    ["method", "route"],
+    registry=registry,
+)
+EMBEDDING_CALLS = Counter(
+    "api_embedding_calls_total",
+    "Embedding provider calls.",
+    ["provider", "outcome"],
+    registry=registry,
+)
+EMBEDDING_TEXTS = Counter(
+    "api_embedding_texts_total",
+    "Texts sent for embedding.",
+    ["provider"],
+    registry=registry,
+)
+EMBEDDING_TOKENS = Counter(
+    "api_embedding_tokens_total",
+    "Tokens billed by the embedding provider.",
+    ["provider"],
+    registry=registry,
+)
+EMBEDDING_LATENCY = Histogram(
+    "api_embedding_duration_seconds",
+    "Embedding call latency.",
+    ["provider"],
+    registry=registry,
+)
+SEARCH_CACHE_REQUESTS = Counter(
+    "api_search_cache_requests_total",
+    "Search cache lookups.",
+    ["cache", "outcome"],
+    registry=registry,
+)
+EVENT_PUBLISH_LATENCY = Histogram(
+    "api_event_publish_duration_seconds",
+    "Event bus publish latency.",
+    ["subject", "outcome"],
+    registry=registry,
+)
+
+
+class _PoolCollector:
+    """Reads connection pool occupancy at scrape time."""
+
+    def collect(self):
+        from app.core.db import pool_status
+
+        status = pool_status()
+        for key in ("size", "checked_out", "checked_in", "overflow"):
+            if key in status:
+                yield GaugeMetricFamily(f"api_db_pool_{key}", f"Connection pool {key.replace('_', ' ')}.", value=status[key])
+        yield GaugeMetricFamily("api_db_pool_checkouts", "Pool checkouts since start.", value=status["checkouts"])
+        yield GaugeMetricFamily("api_db_pool_checkout_timeouts", "Pool checkout timeouts since start.", value=status["checkout_timeouts"])
+        yield GaugeMetricFamily(
+            "api_db_pool_checkout_wait_seconds", "Total time spent waiting for a pooled connection.",
+            value=status["checkout_wait_seconds_total"],
+        )
+
+
+registry.register(_PoolCollector())
+
+
+# Per-request SQL counters. The middleware installs a fresh dict; sync endpoints run in a worker
+# thread with a copy of the request context, so mutating the shared dict is visible to the middleware.
+_request_db_stats: ContextVar[dict[str, float] | None] = ContextVar("request_db_stats", default=None)
+
+
+def start_request_db_stats() -> dict[str, float]:
+    stats = {"queries": 0, "seconds": 0.0}
+    _request_db_stats.set(stats)
+    return stats
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _request_db_stats.get()
+    if stats is None:
+        return
+    stats["queries"] += 1
+    started = getattr(context, "_metrics_started", None)
+    if started is not None:
+        stats["seconds"] += time.perf_counter() - started
+
+
+def route_template(scope) -> str:
+    # Label by the matched path template, never the raw path, to keep label cardinality bounded.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def observe_request(method: str, route: str, status: int, seconds: float, db_stats: dict[str, float]) -> None:
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(seconds)
+    REQUEST_DB_QUERIES.labels(method, route).observe(db_stats["queries"])
+    REQUEST_DB_SECONDS.labels(method, route).observe(db_stats["seconds"])
+
+
+@contextmanager
+def track_embedding_call(provider: str, text_count: int) -> Iterator[dict[str, int]]:
+    """Time an embedding call; the caller may set `usage["tokens"]` from the provider response."""
+    usage = {"tokens": 0}
+    started = time.perf_counter()
+    try:
+        yield usage
+    except Exception:
+        EMBEDDING_CALLS.labels(provider, "error").inc()
+        raise
+    finally:
+        EMBEDDING_LATENCY.labels(provider).observe(time.perf_counter() - started)
+    EMBEDDING_CALLS.labels(provider, "ok").inc()
+    EMBEDDING_TEXTS.labels(provider).inc(text_count)
+    if usage["tokens"]:
+        EMBEDDING_TOKENS.labels(provider).inc(usage["tokens"])
@@ -1,15 +1,26 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 
 from app.core.config import settings
+from app.core.db import (
+    CONSISTENCY_TOKEN_COOKIE,
+    CONSISTENCY_TOKEN_HEADER,
+    CONSISTENCY_TOKEN_TTL_SECONDS,
+    track_request_writes,
+)
+from app.core.metrics import observe_request, route_template, start_request_db_stats
 from app.routers import (
     admin_families,
     admin_keycloak,
+    admin_memory,
     agents_decision,
     agent_sessions,
     audit,
     auth,
+    batch,
     budgets,
     decisions,
     families,
@@ -17,6 +28,7 @@ from app.routers import (
     goals,
     health,
     memory,
+    metrics,
     notes,
     roadmap,
 )
@@ -39,15 +51,42 @@ def swagger_ui():
     openapi_url = f"{prefix}{app.openapi_url}"
     return get_swagger_ui_html(openapi_url=openapi_url, title=f"{app.title} - Docs")
 
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    db_stats = start_request_db_stats()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        observe_request(request.method, route_template(request.scope), status, time.perf_counter() - started, db_stats)
+
+
+@app.middleware("http")
+async def consistency_token_middleware(request: Request, call_next):
+    # Hand clients that just wrote a token so replica-routed reads stay read-your-writes.
+    writes = track_request_writes()
+    response = await call_next(request)
+    token = writes.get("token")
+    if token:
+        response.headers[CONSISTENCY_TOKEN_HEADER] = token
+        response.set_cookie(CONSISTENCY_TOKEN_COOKIE, token, max_age=CONSISTENCY_TOKEN_TTL_SECONDS, httponly=True)
+    return response
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[CONSISTENCY_TOKEN_HEADER],
 )
 
 app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(auth.router)
 app.include_router(families.router)
 app.include_router(goals.router)
@@ -60,5 +99,7 @@ app.include_router(notes.router)
 app.include_router(agents_decision.router)
 app.include_router(agent_sessions.router)
 app.include_router(audit.router)
+app.include_router(batch.router)
 app.include_router(admin_keycloak.router)
 app.include_router(admin_families.router)
+app.include_router(admin_memory.router)
@@ -3,3 +3,5 @@ from app.models.agent_sessions import *  # noqa: F401,F403
 from app.models.family_dna import *  # noqa: F401,F403
 from app.models.memory import *  # noqa: F401,F403
 from app.models.notes import *  # noqa: F401,F403
+from app.models.purge_jobs import *  # noqa: F401,F403
+from app.models.batch_requests import *  # noqa: F401,F403
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Index, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class BatchIdempotencyRecord(Base):
+    """
+    Result of a committed `POST /v1/batch` sent with an `Idempotency-Key` (see app/routers/batch.py).
+
+    Written in the batch's own transaction, so a key has a record exactly when its batch was applied.
+    """
+
+    __tablename__ = "batch_idempotency_records"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # sha256 of the caller and the operations; a key reused for a different request is rejected.
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    results: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+Index("ix_batch_idempotency_records_created", BatchIdempotencyRecord.created_at)
@@ -14,6 +14,7 @@ from sqlalchemy import (
     String,
     Text,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -80,7 +81,7 @@ class Goal(Base):
     family_id: Mapped[int] = mapped_column(ForeignKey("families.id"), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
-    action_types: Mapped[str] = mapped_column(Text, default="[]")
+    action_types: Mapped[list[str]] = mapped_column(JSONB, nullable=False, default=list)
     weight: Mapped[float] = mapped_column(Float, nullable=False)
     active: Mapped[bool] = mapped_column(Boolean, default=True)
 
@@ -97,11 +98,11 @@ class Decision(Base):
     cost: Mapped[float | None] = mapped_column(Float)
     urgency: Mapped[int | None] = mapped_column(Integer)
     target_date: Mapped[date | None] = mapped_column(Date)
-    tags: Mapped[str] = mapped_column(Text, default="[]")
+    tags: Mapped[list[str]] = mapped_column(JSONB, nullable=False, default=list)
     status: Mapped[DecisionStatusEnum] = mapped_column(decision_status_sql_enum, default=DecisionStatusEnum.draft)
     notes: Mapped[str] = mapped_column(Text, default="")
-    attachments: Mapped[str] = mapped_column(Text, default="[]")
-    links: Mapped[str] = mapped_column(Text, default="[]")
+    attachments: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+    links: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
     version: Mapped[int] = mapped_column(Integer, default=1)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
 
@@ -152,7 +153,22 @@ class RoadmapItem(Base):
     start_date: Mapped[date | None] = mapped_column(Date)
     end_date: Mapped[date | None] = mapped_column(Date)
     status: Mapped[str] = mapped_column(String(50), nullable=False)
-    dependencies: Mapped[str] = mapped_column(Text, default="[]")
+    dependencies: Mapped[list[int]] = mapped_column(JSONB, nullable=False, default=list)
+
+
+class RoadmapDependency(Base):
+    """
+    Edge table mirroring `RoadmapItem.dependencies` ("roadmap_item_id depends on depends_on_item_id").
+
+    `depends_on_item_id` is intentionally not a foreign key: dependencies may reference items that do not
+    exist (yet), matching the JSON column semantics the API has always exposed.
+    """
+
+    __tablename__ = "roadmap_dependencies"
+
+    roadmap_item_id: Mapped[int] = mapped_column(ForeignKey("roadmap_items.id", ondelete="CASCADE"), primary_key=True)
+    depends_on_item_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    family_id: Mapped[int] = mapped_column(ForeignKey("families.id", ondelete="CASCADE"), nullable=False)
 
 
 class Period(Base):
@@ -200,7 +216,10 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    actor_member_id: Mapped[int | None] = mapped_column(ForeignKey("family_members.id"))
+    # No foreign key: history outlives the family (purges keep audit rows).
+    family_id: Mapped[int | None] = mapped_column(Integer)
+    # Cleared when the member is deleted; their history stays.
+    actor_member_id: Mapped[int | None] = mapped_column(ForeignKey("family_members.id", ondelete="SET NULL"))
     entity_type: Mapped[str] = mapped_column(String(50), nullable=False)
     entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
     action: Mapped[str] = mapped_column(String(50), nullable=False)
@@ -209,11 +228,31 @@ class AuditLog(Base):
 
 
 Index("ix_decisions_family_status", Decision.family_id, Decision.status)
+Index("ix_decisions_tags_gin", Decision.tags, postgresql_using="gin", postgresql_ops={"tags": "jsonb_path_ops"})
 Index("ix_goals_family_active", Goal.family_id, Goal.active)
 Index("ix_ledger_member_period", DiscretionaryBudgetLedger.member_id, DiscretionaryBudgetLedger.period_id)
 Index("ix_periods_family_dates", Period.family_id, Period.start_date, Period.end_date)
 Index("ix_member_budget_settings_family_member", MemberBudgetSetting.family_id, MemberBudgetSetting.member_id, unique=True)
 Index("ix_audit_entity", AuditLog.entity_type, AuditLog.entity_id)
+Index("ix_roadmap_dependencies_depends_on", RoadmapDependency.depends_on_item_id, RoadmapDependency.roadmap_item_id)
+Index("ix_roadmap_dependencies_family", RoadmapDependency.family_id)
+
+# Child lookups by parent id (family purge deletes by these)
+Index("ix_decision_scores_goal", DecisionScore.goal_id)
+Index("ix_decision_suggestions_decision", DecisionSuggestion.decision_id)
+Index("ix_roadmap_items_decision", RoadmapItem.decision_id)
+Index("ix_ledger_period", DiscretionaryBudgetLedger.period_id)
+Index("ix_audit_actor", AuditLog.actor_member_id)
+# Keyset pagination of GET /v1/audit, newest first, per family and optionally per entity.
+Index("ix_audit_family_created", AuditLog.family_id, AuditLog.created_at, AuditLog.id)
+Index(
+    "ix_audit_family_entity_created",
+    AuditLog.family_id,
+    AuditLog.entity_type,
+    AuditLog.entity_id,
+    AuditLog.created_at,
+    AuditLog.id,
+)
 
 # Auth/sync lookups
 Index("ix_family_members_family_email", FamilyMember.family_id, FamilyMember.email, unique=True)
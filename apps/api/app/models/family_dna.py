@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -35,6 +35,17 @@ class FamilyDnaEvent(Base):
     result_version: Mapped[int] = mapped_column(Integer, nullable=False)
 
 
+class FamilyDnaCheckpoint(Base):
+    """Full DNA state at every `dna_checkpoint_interval`-th version; historical reads replay events from here."""
+
+    __tablename__ = "family_dna_checkpoints"
+
+    family_id: Mapped[int] = mapped_column(Integer, ForeignKey("families.id", ondelete="CASCADE"), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, primary_key=True)
+    snapshot_jsonb: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 class FamilyDnaPatchProposal(Base):
     __tablename__ = "family_dna_patch_proposals"
 
@@ -43,9 +54,15 @@ class FamilyDnaPatchProposal(Base):
     ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     actor: Mapped[str] = mapped_column(String(255), nullable=False)
     patch_jsonb: Mapped[list[dict]] = mapped_column(JSONB, nullable=False)
+    # Snapshot version the patch was written against; commits rebase onto newer versions when paths don't overlap.
+    base_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
     status: Mapped[str] = mapped_column(String(32), nullable=False, default="proposed")  # proposed|committed|rejected|canceled
     review_notes: Mapped[str | None] = mapped_column(Text, nullable=True)
     rationale: Mapped[str] = mapped_column(Text, nullable=False, default="")
     confidence: Mapped[float | None] = mapped_column(Float, nullable=True)
     sources_jsonb: Mapped[list[dict] | None] = mapped_column(JSONB, nullable=True)
 
+
+# Replay range scans (versions after a checkpoint) and as_of lookups.
+Index("ix_family_dna_events_family_version", FamilyDnaEvent.family_id, FamilyDnaEvent.result_version)
+Index("ix_family_dna_events_family_ts", FamilyDnaEvent.family_id, FamilyDnaEvent.ts)
@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -19,6 +19,11 @@ class MemoryDocument(Base):
     type: Mapped[str] = mapped_column(String(64), nullable=False)  # decision|rationale|chat|note|dna|roadmap
     text: Mapped[str] = mapped_column(Text, nullable=False)
     source_refs_jsonb: Mapped[list[dict] | None] = mapped_column(JSONB, nullable=True)
+    # sha256 of "{type}\n{text}", for insert-time dedup.
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # What the document describes (e.g. decision/roadmap_item + id); older docs per entity are compacted away.
+    entity_type: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    entity_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
 
@@ -31,3 +36,51 @@ class MemoryEmbedding(Base):
     metadata_jsonb: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+
+
+class MemoryDocumentArchive(Base):
+    """Cold tier: documents past their type's hot retention (see app/services/memory_retention.py)."""
+
+    __tablename__ = "memory_documents_archive"
+
+    doc_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    family_id: Mapped[int] = mapped_column(Integer, ForeignKey("families.id", ondelete="CASCADE"), nullable=False)
+    type: Mapped[str] = mapped_column(String(64), nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    source_refs_jsonb: Mapped[list[dict] | None] = mapped_column(JSONB, nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    entity_type: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    entity_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class MemoryEmbeddingArchive(Base):
+    __tablename__ = "memory_embeddings_archive"
+
+    doc_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("memory_documents_archive.doc_id", ondelete="CASCADE"), primary_key=True
+    )
+    chunk_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    embedding: Mapped[list[float]] = mapped_column(Vector(1536), nullable=False)
+    metadata_jsonb: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+Index("ix_memory_documents_family_hash", MemoryDocument.family_id, MemoryDocument.content_hash)
+Index(
+    "ix_memory_documents_entity",
+    MemoryDocument.family_id,
+    MemoryDocument.entity_type,
+    MemoryDocument.entity_id,
+    MemoryDocument.created_at,
+)
+Index("ix_memory_documents_type_created", MemoryDocument.type, MemoryDocument.created_at)
+Index("ix_memory_documents_family_type_created", MemoryDocument.family_id, MemoryDocument.type, MemoryDocument.created_at)
+Index(
+    "ix_memory_documents_source_refs_gin",
+    MemoryDocument.source_refs_jsonb,
+    postgresql_using="gin",
+    postgresql_ops={"source_refs_jsonb": "jsonb_path_ops"},
+)
+Index("ix_memory_documents_archive_family_created", MemoryDocumentArchive.family_id, MemoryDocumentArchive.created_at)
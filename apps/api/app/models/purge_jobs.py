@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class FamilyPurgeJob(Base):
+    """
+    Progress of a family purge (see app/services/purge.py).
+
+    `family_id` is deliberately not a foreign key: the job outlives the family it deletes.
+    """
+
+    __tablename__ = "family_purge_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    family_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="queued")  # queued|running|completed|failed
+    requested_by: Mapped[str] = mapped_column(String(255), nullable=False, default="system")
+    # Steps (tables) fully purged so far; a resumed job starts at `steps_done`.
+    steps_done: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    current_step: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    deleted_counts: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+Index("ix_family_purge_jobs_family_status", FamilyPurgeJob.family_id, FamilyPurgeJob.status)
+Index("ix_family_purge_jobs_status_updated", FamilyPurgeJob.status, FamilyPurgeJob.updated_at)
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.models.entities import Decision, Family, RoadmapItem
 from app.services.access import require_family
-from app.services.purge import purge_family
+from app.services.family_export import FamilyImporter, FamilyImportError, export_family
+from app.models.purge_jobs import FamilyPurgeJob
+from app.services.purge import create_purge_job, purge_family, purge_job_payload, resume_purge_jobs, run_purge_job
 
 router = APIRouter(prefix="/v1/admin/families", tags=["admin"])
 
@@ -20,7 +26,7 @@ def _require_internal_token(x_internal_admin_token: str | None) -> None:
 
 @router.get("")
 def list_families_admin(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     x_internal_admin_token: str | None = Header(default=None, alias="X-Internal-Admin-Token"),
 ):
     _require_internal_token(x_internal_admin_token)
@@ -31,7 +37,7 @@ def list_families_admin(
 @router.get("/{family_id}/roadmap_items")
 def list_family_roadmap_items_admin(
     family_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     x_internal_admin_token: str | None = Header(default=None, alias="X-Internal-Admin-Token"),
 ):
     _require_internal_token(x_internal_admin_token)
@@ -58,14 +64,107 @@ def list_family_roadmap_items_admin(
     }
 
 
+def _run_purge_jobs(bind: Engine, job_ids: list[int]) -> None:
+    # Background tasks outlive the request session: give the job its own.
+    with Session(bind=bind) as db:
+        for job_id in job_ids:
+            run_purge_job(db, job_id)
+
+
 @router.delete("/{family_id}", status_code=204)
 def delete_family_admin(
     family_id: int,
+    background_tasks: BackgroundTasks,
+    background: bool = False,
     db: Session = Depends(get_db),
     x_internal_admin_token: str | None = Header(default=None, alias="X-Internal-Admin-Token"),
 ):
+    """Purge a family. With `?background=true`, returns 202 and the job to poll instead of waiting."""
     _require_internal_token(x_internal_admin_token)
 
     family = require_family(db, family_id)
-    purge_family(db, family.id)
-    db.commit()
+    if not background:
+        purge_family(db, family.id, requested_by="admin")
+        return Response(status_code=204)
+    job = create_purge_job(db, family.id, requested_by="admin")
+    background_tasks.add_task(_run_purge_jobs, db.get_bind(), [job.id])
+    return JSONResponse(status_code=202, content=purge_job_payload(job))
+
+
+@router.get("/purge-jobs/{job_id}")
+def get_purge_job_admin(
+    job_id: int,
+    db: Session = Depends(get_db),
+    x_internal_admin_token: str | None = Header(default=None, alias="X-Internal-Admin-Token"),
+):
+    _require_internal_token(x_internal_admin_token)
+    job = db.get(FamilyPurgeJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="purge job not found")
+    return purge_job_payload(job)
+
+
+@router.post("/purge-jobs/resume")
+def resume_purge_jobs_admin(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    x_internal_admin_token: str | None = Header(default=None, alias="X-Internal-Admin-Token"),
+):
+    """Restart queued, failed and stalled purges (e.g. ones cut short by an API restart)."""
+    _require_internal_token(x_internal_admin_token)
+    job_ids = resume_purge_jobs(db)
+    if job_ids:
+        background_tasks.add_task(_run_purge_jobs, db.get_bind(), job_ids)
+    return {"resumed": job_ids}
+
+
+@router.get("/{family_id}/export")
+def export_family_admin(
+    family_id: int,
+    db: Session = Depends(get_db),
+    x_internal_admin_token: str | None = Header(default=None, alias="X-Internal-Admin-Token"),
+):
+    """Stream the family's full dataset as NDJSON (see app/services/family_export.py for the format)."""
+    _require_internal_token(x_internal_admin_token)
+    require_family(db, family_id)
+    # The generator reads through its own connection: the request session is closed before streaming ends.
+    return StreamingResponse(
+        export_family(db.get_bind(), family_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="family-{family_id}.ndjson"'},
+    )
+
+
+_IMPORT_LINES_PER_BATCH = 1000
+
+
+@router.post("/import", status_code=201)
+async def import_family_admin(
+    request: Request,
+    db: Session = Depends(get_db),
+    x_internal_admin_token: str | None = Header(default=None, alias="X-Internal-Admin-Token"),
+):
+    """Load an NDJSON export as a new family, streaming the body; all or nothing."""
+    _require_internal_token(x_internal_admin_token)
+    importer = FamilyImporter(db.get_bind())
+    try:
+        pending = b""
+        lines: list[bytes] = []
+        async for chunk in request.stream():
+            *complete, pending = (pending + chunk).split(b"\n")
+            lines.extend(complete)
+            if len(lines) >= _IMPORT_LINES_PER_BATCH:
+                await run_in_threadpool(importer.feed, lines)
+                lines = []
+        lines.append(pending)
+        await run_in_threadpool(importer.feed, lines)
+        return await run_in_threadpool(importer.finish)
+    except FamilyImportError as exc:
+        importer.abort()
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except IntegrityError as exc:
+        importer.abort()
+        raise HTTPException(status_code=409, detail="imported rows conflict with existing data") from exc
+    except BaseException:
+        importer.abort()
+        raise
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import get_db
+from app.services.memory import compact_memory_documents
+from app.services.memory_retention import apply_memory_retention
+
+router = APIRouter(prefix="/v1/admin/memory", tags=["admin"])
+
+
+def _require_internal_token(x_internal_admin_token: str | None) -> None:
+    if not x_internal_admin_token or x_internal_admin_token != settings.internal_admin_token:
+        raise HTTPException(status_code=401, detail="invalid internal admin token")
+
+
+@router.post("/compact")
+def compact_memory(
+    family_id: int | None = Query(default=None),
+    batch_size: int = Query(default=500, ge=1, le=10_000),
+    db: Session = Depends(get_db),
+    x_internal_admin_token: str | None = Header(default=None, alias="X-Internal-Admin-Token"),
+):
+    _require_internal_token(x_internal_admin_token)
+    return compact_memory_documents(db, family_id=family_id, batch_size=batch_size)
+
+
+@router.post("/retention")
+def run_memory_retention(
+    db: Session = Depends(get_db),
+    x_internal_admin_token: str | None = Header(default=None, alias="X-Internal-Admin-Token"),
+):
+    _require_internal_token(x_internal_admin_token)
+    return apply_memory_retention(db)
@@ -1,8 +1,97 @@
-from fastapi import APIRouter
+import base64
+import json
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.auth import AuthContext, get_auth_context
+from app.core.db import get_read_db
+from app.models.entities import AuditLog
+from app.schemas.audit import AuditEventListResponse, AuditEventResponse
+from app.services.access import require_family_member
+from app.services.audit import PRIVILEGED_ENTITY_TYPES
 
 router = APIRouter(prefix="/v1/audit", tags=["audit"])
 
 
-@router.get("")
-def list_audit_events():
-    return {"items": []}
+def _encode_cursor(event: AuditLog) -> str:
+    raw = json.dumps([event.created_at.isoformat(), event.id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return _naive_utc(datetime.fromisoformat(created_at)), int(event_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="invalid cursor") from None
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # created_at is stored as naive UTC.
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _to_event_response(event: AuditLog) -> AuditEventResponse:
+    return AuditEventResponse(
+        id=event.id,
+        family_id=event.family_id,
+        actor_member_id=event.actor_member_id,
+        entity_type=event.entity_type,
+        entity_id=event.entity_id,
+        action=event.action,
+        changes=json.loads(event.changes_json or "{}"),
+        privileged=event.entity_type in PRIVILEGED_ENTITY_TYPES,
+        created_at=event.created_at,
+    )
+
+
+@router.get("", response_model=AuditEventListResponse)
+def list_audit_events(
+    family_id: int = Query(),
+    entity_type: str | None = Query(default=None),
+    entity_id: int | None = Query(default=None),
+    action: str | None = Query(default=None),
+    actor_member_id: int | None = Query(default=None),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    ctx: AuthContext | None = Depends(get_auth_context),
+):
+    """
+    A family's change history, newest first.
+
+    Pages are keyset-paginated on (created_at, id): each page is an index range scan on
+    ix_audit_family_created (or ix_audit_family_entity_created when filtering by entity), so the cost
+    does not grow with how deep the caller has paged or how many rows the table holds.
+    """
+    if ctx is not None:
+        require_family_member(db, family_id, ctx.email)
+    if entity_id is not None and entity_type is None:
+        raise HTTPException(status_code=400, detail="entity_id requires entity_type")
+
+    query = select(AuditLog).where(AuditLog.family_id == family_id)
+    if entity_type is not None:
+        query = query.where(AuditLog.entity_type == entity_type)
+    if entity_id is not None:
+        query = query.where(AuditLog.entity_id == entity_id)
+    if action is not None:
+        query = query.where(AuditLog.action == action)
+    if actor_member_id is not None:
+        query = query.where(AuditLog.actor_member_id == actor_member_id)
+    if since is not None:
+        query = query.where(AuditLog.created_at >= _naive_utc(since))
+    if until is not None:
+        query = query.where(AuditLog.created_at < _naive_utc(until))
+    if cursor is not None:
+        query = query.where(tuple_(AuditLog.created_at, AuditLog.id) < _decode_cursor(cursor))
+
+    events = db.execute(
+        query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(limit + 1)
+    ).scalars().all()
+    next_cursor = _encode_cursor(events[limit - 1]) if len(events) > limit else None
+    return AuditEventListResponse(items=[_to_event_response(event) for event in events[:limit]], next_cursor=next_cursor)
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.auth import AuthContext, get_auth_context
+from app.core.config import settings
+from app.core.db import BATCH_SESSION_SCOPE_KEY, DEFERRED_EFFECTS_KEY, get_db, record_request_write
+from app.models.batch_requests import BatchIdempotencyRecord
+from app.schemas.batch import BatchRequest, BatchResponse, BatchResult
+from app.services.event_bus import deferred_events, publish_deferred
+
+router = APIRouter(prefix="/v1/batch", tags=["batch"])
+
+_REFERENCE = re.compile(r"\$\{(\d+)((?:\.[A-Za-z0-9_-]+)*)\}")
+# Headers describing the outer request's body; each operation gets its own.
+_BODY_HEADERS = {b"content-length", b"content-type", b"transfer-encoding"}
+_INHERITED_SCOPE = ("type", "asgi", "http_version", "scheme", "server", "client", "root_path", "app", "starlette.exception_handlers")
+
+
+def _lookup(results: list[BatchResult], match: re.Match) -> Any:
+    index = int(match.group(1))
+    if index >= len(results):
+        raise HTTPException(status_code=400, detail=f"{match.group(0)} refers to an operation that has not run yet")
+    value = results[index].body
+    for part in filter(None, match.group(2).split(".")):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            raise HTTPException(status_code=400, detail=f"{match.group(0)} not found in the result of operation {index}")
+    return value
+
+
+def _resolve(value: Any, results: list[BatchResult]) -> Any:
+    """Substitute `${N.field}` references; a string that is only a reference takes the referenced value's type."""
+    if isinstance(value, str):
+        whole = _REFERENCE.fullmatch(value)
+        if whole is not None:
+            return _lookup(results, whole)
+        return _REFERENCE.sub(lambda match: str(_lookup(results, match)), value)
+    if isinstance(value, dict):
+        return {key: _resolve(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item, results) for item in value]
+    return value
+
+
+def _api_path(path: str) -> str:
+    path = "/" + path.lstrip("/")
+    path = path if path == "/v1" or path.startswith("/v1/") else f"/v1{path}"
+    if path.rstrip("/") == router.prefix:
+        raise HTTPException(status_code=400, detail="batches cannot be nested")
+    return path
+
+
+async def _dispatch(
+    request: Request,
+    session: Session,
+    method: str,
+    path: str,
+    query: dict[str, Any] | None,
+    body: Any,
+) -> tuple[int, Any]:
+    """Run one operation through the app's routes in-process, on the batch session."""
+    payload = b"" if body is None else json.dumps(body).encode("utf-8")
+    headers = [(name, value) for name, value in request.headers.raw if name.lower() not in _BODY_HEADERS]
+    if body is not None:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+    scope = {
+        **{key: request.scope[key] for key in _INHERITED_SCOPE if key in request.scope},
+        "method": method,
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": urlencode(query or {}, doseq=True).encode("utf-8"),
+        "headers": headers,
+        "state": {},
+        BATCH_SESSION_SCOPE_KEY: session,
+    }
+    received = False
+
+    async def receive() -> dict[str, Any]:
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    status = 500
+    chunks: list[bytes] = []
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = int(message["status"])
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await request.app.router(scope, receive, send)
+    raw = b"".join(chunks)
+    if not raw:
+        return status, None
+    try:
+        return status, json.loads(raw)
+    except ValueError:
+        return status, raw.decode("utf-8", errors="replace")
+
+
+def _fingerprint(payload: BatchRequest, ctx: AuthContext | None) -> str:
+    document = {"caller": ctx.email if ctx else None, "operations": payload.model_dump(mode="json")["operations"]}
+    return hashlib.sha256(json.dumps(document, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def _replay(db: Session, key: str, fingerprint: str) -> BatchResponse | None:
+    """The stored response for an already applied batch with this key, if it has not expired."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.batch_idempotency_ttl_seconds)
+    record = db.execute(select(BatchIdempotencyRecord).where(BatchIdempotencyRecord.key == key)).scalar_one_or_none()
+    if record is None:
+        return None
+    created_at = record.created_at if record.created_at.tzinfo else record.created_at.replace(tzinfo=timezone.utc)
+    if created_at < cutoff:
+        return None
+    if record.fingerprint != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different batch")
+    return BatchResponse(results=record.results)
+
+
+def _record(connection, key: str, fingerprint: str, results: list[BatchResult]) -> None:
+    now = datetime.now(timezone.utc)
+    table = BatchIdempotencyRecord.__table__
+    # Expired records (including an expired one for this key) are pruned as new ones are written.
+    connection.execute(delete(table).where(table.c.created_at < now - timedelta(seconds=settings.batch_idempotency_ttl_seconds)))
+    connection.execute(
+        insert(table).values(
+            key=key,
+            fingerprint=fingerprint,
+            results=[result.model_dump(mode="json") for result in results],
+            created_at=now,
+        )
+    )
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    payload: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    ctx: AuthContext | None = Depends(get_auth_context),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key", min_length=1, max_length=255),
+):
+    """
+    Run ordered API operations in one database transaction.
+
+    Each operation goes through the normal route (validation, auth, access checks) with the caller's
+    headers, but on a shared session whose commits are savepoints; the batch commits once at the end.
+    The first operation answering >= 400 rolls everything back and is reported with the results so far.
+    Events, search-cache invalidations and local vector-store writes are applied only after the final
+    commit, and dropped on rollback.
+
+    With an `Idempotency-Key`, the results are stored in the same transaction; repeating the batch with
+    that key (e.g. after a timeout) returns them without running anything again.
+    """
+    if len(payload.operations) > settings.batch_max_operations:
+        raise HTTPException(status_code=400, detail=f"at most {settings.batch_max_operations} operations per batch")
+    fingerprint = _fingerprint(payload, ctx) if idempotency_key else ""
+    if idempotency_key:
+        replayed = await run_in_threadpool(_replay, db, idempotency_key, fingerprint)
+        if replayed is not None:
+            return replayed
+
+    connection = await run_in_threadpool(db.get_bind().connect)
+    transaction = connection.begin()
+    if connection.dialect.name == "sqlite":
+        # pysqlite defers BEGIN to the first write, so the first SAVEPOINT would open (and its RELEASE
+        # commit) the real transaction. Open it explicitly.
+        connection.exec_driver_sql("BEGIN")
+    session = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
+    effects: list[Callable[[], None]] = []
+    session.info[DEFERRED_EFFECTS_KEY] = effects
+    results: list[BatchResult] = []
+    committed = False
+    duplicate = False
+    try:
+        with deferred_events() as events:
+            for index, operation in enumerate(payload.operations):
+                path = _api_path(_resolve(operation.path, results))
+                status, body = await _dispatch(
+                    request,
+                    session,
+                    operation.method,
+                    path,
+                    _resolve(operation.query, results),
+                    _resolve(operation.body, results),
+                )
+                results.append(BatchResult(index=index, status_code=status, body=body))
+                if status >= 400:
+                    raise HTTPException(
+                        status_code=status,
+                        detail={
+                            "message": f"operation {index} ({operation.method} {path}) failed; nothing was applied",
+                            "failed_index": index,
+                            "results": [result.model_dump() for result in results],
+                        },
+                    )
+            if idempotency_key:
+                try:
+                    await run_in_threadpool(_record, connection, idempotency_key, fingerprint, results)
+                except IntegrityError:
+                    # The same key was applied concurrently and committed first; this run is rolled back.
+                    duplicate = True
+            if not duplicate:
+                await run_in_threadpool(transaction.commit)
+                committed = True
+    finally:
+        if not committed:
+            await run_in_threadpool(transaction.rollback)
+        session.close()
+        connection.close()
+
+    if duplicate:
+        db.expire_all()
+        replayed = await run_in_threadpool(_replay, db, idempotency_key, fingerprint)
+        if replayed is None:
+            raise HTTPException(status_code=409, detail="a batch with this Idempotency-Key is already being applied")
+        return replayed
+
+    for effect in effects:
+        await run_in_threadpool(effect)
+    publish_deferred(events)
+    if any(operation.method != "GET" for operation in payload.operations):
+        record_request_write(db.get_bind())
+    return BatchResponse(results=results)
@@ -10,10 +10,10 @@ from app.models.entities import BudgetPolicy, DiscretionaryBudgetLedger, Family,
 from app.schemas.budgets import BudgetPolicyUpdate, BudgetSummaryResponse, MemberBudgetSummary
 from app.services.budget import (
     ensure_active_period,
-    ensure_member_allocation_in_period,
+    ensure_member_allocations_in_period,
     get_or_create_policy,
     member_allowance_map,
-    member_remaining_in_period,
+    members_remaining_in_period,
 )
 from app.services.access import require_family_admin, require_family_editor, require_family_member
 
@@ -26,10 +26,13 @@ def _family_members(db: Session, family_id: int) -> list[FamilyMember]:
 
 def _summary_response(db: Session, family_id: int, period: Period, policy: BudgetPolicy) -> BudgetSummaryResponse:
     members = _family_members(db, family_id)
+    member_ids = [member.id for member in members]
+    ensure_member_allocations_in_period(db, family_id, period, member_ids)
+    db.flush()
+    balances = members_remaining_in_period(db, period.id, member_ids)
     summaries: list[MemberBudgetSummary] = []
     for member in members:
-        ensure_member_allocation_in_period(db, family_id, period, member.id)
-        allowance, used, remaining = member_remaining_in_period(db, period.id, member.id)
+        allowance, used, remaining = balances[member.id]
         summaries.append(
             MemberBudgetSummary(
                 member_id=member.id,
@@ -114,9 +117,12 @@ def update_budget_policy(
     db.flush()
     period = ensure_active_period(db, family_id)
     allowances = member_allowance_map(db, family_id, policy.default_allowance)
+    member_ids = [member.id for member in members]
+    ensure_member_allocations_in_period(db, family_id, period, member_ids)
+    db.flush()
+    balances = members_remaining_in_period(db, period.id, member_ids)
     for member in members:
-        ensure_member_allocation_in_period(db, family_id, period, member.id)
-        current_allowance, _, _ = member_remaining_in_period(db, period.id, member.id)
+        current_allowance, _, _ = balances[member.id]
         target_allowance = allowances.get(member.id, policy.default_allowance)
         delta = target_allowance - current_allowance
         if delta != 0:
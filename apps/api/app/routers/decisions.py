@@ -1,11 +1,9 @@
-import json
-
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from sqlalchemy import and_, exists, func, select, tuple_
 from sqlalchemy.orm import Session
 
 from app.core.auth import AuthContext, get_auth_context
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.models.entities import Decision, DecisionQueueItem, DecisionScore, DecisionStatusEnum, FamilyMember, Goal, RoadmapItem
 from app.schemas.decisions import (
     DecisionCreate,
@@ -22,17 +20,12 @@ from app.services.access import require_family_admin, require_family_member
 from app.services.event_bus import publish_event
 from agents.common.events.subjects import Subjects
 from app.services.memory import create_document_with_embeddings
+from app.services.roadmap_graph import delete_item_dependencies
 
 router = APIRouter(prefix="/v1/decisions", tags=["decisions"])
 
 
-def _decision_score_summary(db: Session, decision: Decision) -> DecisionScoreSummaryResponse | None:
-    rows = db.execute(
-        select(DecisionScore, Goal).join(Goal, Goal.id == DecisionScore.goal_id).where(
-            DecisionScore.decision_id == decision.id,
-            DecisionScore.version == decision.version,
-        )
-    ).all()
+def _score_summary_from_rows(rows) -> DecisionScoreSummaryResponse | None:
     if not rows:
         return None
 
@@ -59,7 +52,38 @@ def _decision_score_summary(db: Session, decision: Decision) -> DecisionScoreSum
     )
 
 
-def _to_decision_response(db: Session, decision: Decision, include_scores: bool = False) -> DecisionResponse:
+def _decision_score_summaries(db: Session, decisions: list[Decision]) -> dict[int, DecisionScoreSummaryResponse | None]:
+    """Current-version score summaries for many decisions in one query."""
+    if not decisions:
+        return {}
+    rows = db.execute(
+        select(DecisionScore, Goal)
+        .join(Goal, Goal.id == DecisionScore.goal_id)
+        .where(
+            tuple_(DecisionScore.decision_id, DecisionScore.version).in_(
+                [(decision.id, decision.version) for decision in decisions]
+            )
+        )
+        .order_by(DecisionScore.decision_id.asc(), DecisionScore.id.asc())
+    ).all()
+    rows_by_decision: dict[int, list] = {decision.id: [] for decision in decisions}
+    for score, goal in rows:
+        rows_by_decision[score.decision_id].append((score, goal))
+    return {decision_id: _score_summary_from_rows(items) for decision_id, items in rows_by_decision.items()}
+
+
+def _decision_score_summary(db: Session, decision: Decision) -> DecisionScoreSummaryResponse | None:
+    return _decision_score_summaries(db, [decision])[decision.id]
+
+
+def _to_decision_response(
+    db: Session,
+    decision: Decision,
+    include_scores: bool = False,
+    score_summary: DecisionScoreSummaryResponse | None = None,
+) -> DecisionResponse:
+    if include_scores and score_summary is None:
+        score_summary = _decision_score_summary(db, decision)
     return DecisionResponse(
         id=decision.id,
         family_id=decision.family_id,
@@ -70,15 +94,26 @@ def _to_decision_response(db: Session, decision: Decision, include_scores: bool
         cost=decision.cost,
         urgency=decision.urgency,
         target_date=decision.target_date,
-        tags=json.loads(decision.tags or "[]"),
+        tags=list(decision.tags or []),
         status=decision.status.value,
         notes=decision.notes,
         version=decision.version,
         created_at=decision.created_at,
-        score_summary=_decision_score_summary(db, decision) if include_scores else None,
+        score_summary=score_summary if include_scores else None,
     )
 
 
+def _tags_filter(db: Session, tags: list[str]):
+    """All-of tag filter; on Postgres this is a single `tags @> '[...]'` served by the GIN index."""
+    if db.bind is not None and db.bind.dialect.name == "postgresql":
+        return Decision.tags.contains(tags)
+    clauses = []
+    for tag in tags:
+        element = func.json_each(Decision.tags).table_valued("value")
+        clauses.append(exists(select(element.c.value).where(element.c.value == tag)))
+    return and_(*clauses)
+
+
 def _ensure_decision_exists(db: Session, decision_id: int) -> Decision:
     decision = db.get(Decision, decision_id)
     if decision is None:
@@ -90,7 +125,8 @@ def _ensure_decision_exists(db: Session, decision_id: int) -> Decision:
 def list_decisions(
     family_id: int | None = Query(default=None),
     include_scores: bool = Query(default=False),
-    db: Session = Depends(get_db),
+    tag: list[str] = Query(default=[]),
+    db: Session = Depends(get_read_db),
     ctx: AuthContext | None = Depends(get_auth_context),
 ):
     query = select(Decision)
@@ -100,14 +136,24 @@ def list_decisions(
         if ctx is not None:
             require_family_member(db, family_id, ctx.email)
         query = query.where(Decision.family_id == family_id)
+    tags = [item.strip() for item in tag if item.strip()]
+    if tags:
+        query = query.where(_tags_filter(db, tags))
     decisions = db.execute(query.order_by(Decision.created_at.desc())).scalars().all()
-    return DecisionListResponse(items=[_to_decision_response(db, item, include_scores=include_scores) for item in decisions])
+    if not include_scores:
+        return DecisionListResponse(items=[_to_decision_response(db, item) for item in decisions])
+    summaries = _decision_score_summaries(db, decisions)
+    return DecisionListResponse(
+        items=[
+            _to_decision_response(db, item, include_scores=True, score_summary=summaries[item.id]) for item in decisions
+        ]
+    )
 
 
 @router.get("/{decision_id}", response_model=DecisionResponse)
 def get_decision(
     decision_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     ctx: AuthContext | None = Depends(get_auth_context),
 ):
     decision = _ensure_decision_exists(db, decision_id)
@@ -143,7 +189,7 @@ def create_decision(
         cost=payload.cost,
         urgency=payload.urgency,
         target_date=payload.target_date,
-        tags=json.dumps(payload.tags),
+        tags=payload.tags,
         notes=payload.notes,
         status=DecisionStatusEnum.draft,
     )
@@ -157,6 +203,8 @@ def create_decision(
             type="decision",
             text_value=f"Decision created: {decision.title}\n\n{decision.description}",
             source_refs=[],
+            entity_type="decision",
+            entity_id=decision.id,
         )
         db.commit()
     except Exception:
@@ -202,7 +250,7 @@ def update_decision(
     if payload.target_date is not None:
         decision.target_date = payload.target_date
     if payload.tags is not None:
-        decision.tags = json.dumps(payload.tags)
+        decision.tags = payload.tags
     if payload.notes is not None:
         decision.notes = payload.notes
 
@@ -215,6 +263,8 @@ def update_decision(
             type="decision",
             text_value=f"Decision updated: {decision.title}\n\n{decision.description}",
             source_refs=[],
+            entity_type="decision",
+            entity_id=decision.id,
         )
         db.commit()
     except Exception:
@@ -243,6 +293,7 @@ def delete_decision(
         require_family_admin(db, decision.family_id, ctx.email)
     db.query(DecisionScore).filter(DecisionScore.decision_id == decision.id).delete()
     db.query(DecisionQueueItem).filter(DecisionQueueItem.decision_id == decision.id).delete()
+    delete_item_dependencies(db, select(RoadmapItem.id).where(RoadmapItem.decision_id == decision.id))
     db.query(RoadmapItem).filter(RoadmapItem.decision_id == decision.id).delete()
     db.delete(decision)
     db.commit()
@@ -324,6 +375,8 @@ def manual_score_decision(
             type="rationale",
             text_value=f"Decision scored: decision_id={decision.id} weighted_1_to_5={weighted_1_to_5} threshold={payload.threshold_1_to_5} routed_to={routed_to}. Scores: {payload.goal_scores}",
             source_refs=[],
+            entity_type="decision",
+            entity_id=decision.id,
         )
         db.commit()
     except Exception:
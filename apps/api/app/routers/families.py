@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from fastapi import APIRouter, Depends, HTTPException
 
 from app.core.auth import AuthContext, get_auth_context
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.models.entities import Family, FamilyMember, RoleEnum
 from app.schemas.families import (
     FamilyCreate,
@@ -17,6 +17,7 @@ from app.schemas.families import (
     FamilyUpdate,
 )
 from app.services.access import require_family, require_family_admin, require_family_member
+from app.services.audit import detach_audit_actor
 from app.services.purge import purge_family
 
 router = APIRouter(prefix="/v1/families", tags=["families"])
@@ -24,7 +25,7 @@ router = APIRouter(prefix="/v1/families", tags=["families"])
 
 @router.get("", response_model=FamilyListResponse)
 def list_families(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     ctx: AuthContext | None = Depends(get_auth_context),
 ):
     query = select(Family)
@@ -61,7 +62,7 @@ def create_family(
 @router.get("/{family_id}", response_model=FamilyResponse)
 def get_family(
     family_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     ctx: AuthContext | None = Depends(get_auth_context),
 ):
     family = require_family(db, family_id)
@@ -95,14 +96,13 @@ def delete_family(
     family = require_family(db, family_id)
     if ctx is not None:
         require_family_admin(db, family_id, ctx.email)
-    purge_family(db, family.id)
-    db.commit()
+    purge_family(db, family.id, requested_by=ctx.email if ctx is not None else "system")
 
 
 @router.get("/{family_id}/members", response_model=FamilyMemberListResponse)
 def list_family_members(
     family_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     ctx: AuthContext | None = Depends(get_auth_context),
 ):
     require_family(db, family_id)
@@ -164,7 +164,7 @@ def create_family_member(
 def get_family_member(
     family_id: int,
     member_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     ctx: AuthContext | None = Depends(get_auth_context),
 ):
     require_family(db, family_id)
@@ -228,6 +228,7 @@ def delete_family_member(
     if member is None or member.family_id != family_id:
         raise HTTPException(status_code=404, detail="family member not found")
 
+    detach_audit_actor(db, member_id)
     db.delete(member)
     try:
         db.commit()
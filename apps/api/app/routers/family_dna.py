@@ -1,15 +1,29 @@
 from __future__ import annotations
 
 import uuid
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, Header
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.core.auth import AuthContext, get_auth_context
 from app.core.db import get_db
-from app.schemas.family_dna import DnaCommitResponse, DnaProposeRequest, DnaProposeResponse, DnaSnapshotResponse
+from app.schemas.family_dna import (
+    DnaCommitResponse,
+    DnaDiffResponse,
+    DnaProposeRequest,
+    DnaProposeResponse,
+    DnaSnapshotResponse,
+)
 from app.services.access import require_family, require_family_editor, require_family_member
-from app.services.family_dna import commit_proposal, get_latest_snapshot, propose_patch
+from app.services.family_dna import (
+    commit_proposal,
+    diff_versions,
+    get_latest_snapshot,
+    get_snapshot_at_version,
+    propose_patch,
+    version_as_of,
+)
 
 router = APIRouter(prefix="/v1/family/{family_id}/dna", tags=["family-dna"])
 
@@ -17,13 +31,30 @@ router = APIRouter(prefix="/v1/family/{family_id}/dna", tags=["family-dna"])
 @router.get("", response_model=DnaSnapshotResponse)
 def get_dna_snapshot(
     family_id: int,
+    version: int | None = Query(default=None, ge=0),
+    as_of: datetime | None = Query(default=None),
     db: Session = Depends(get_db),
     ctx: AuthContext | None = Depends(get_auth_context),
 ):
+    """Latest snapshot, or the state at `version` / at the `as_of` timestamp (replayed from a checkpoint)."""
     require_family(db, family_id)
     if ctx is not None:
         require_family_member(db, family_id, ctx.email)
+    if version is not None and as_of is not None:
+        raise HTTPException(status_code=400, detail="pass either version or as_of, not both")
+    if as_of is not None:
+        version = version_as_of(db, family_id, as_of.astimezone(timezone.utc) if as_of.tzinfo else as_of)
     snap = get_latest_snapshot(db, family_id)
+    if version is not None and version != snap.version:
+        state, event = get_snapshot_at_version(db, family_id, version)
+        db.commit()
+        return DnaSnapshotResponse(
+            family_id=family_id,
+            version=version,
+            snapshot=state,
+            updated_at=event.ts if event is not None else None,
+            updated_by=event.actor if event is not None else "system",
+        )
     db.commit()
     db.refresh(snap)
     return DnaSnapshotResponse(
@@ -35,6 +66,22 @@ def get_dna_snapshot(
     )
 
 
+@router.get("/diff", response_model=DnaDiffResponse)
+def diff_dna_versions(
+    family_id: int,
+    from_version: int = Query(ge=0),
+    to_version: int = Query(ge=0),
+    db: Session = Depends(get_db),
+    ctx: AuthContext | None = Depends(get_auth_context),
+):
+    require_family(db, family_id)
+    if ctx is not None:
+        require_family_member(db, family_id, ctx.email)
+    patch = diff_versions(db, family_id, from_version, to_version)
+    db.commit()
+    return DnaDiffResponse(family_id=family_id, from_version=from_version, to_version=to_version, patch=patch)
+
+
 @router.post("/propose", response_model=DnaProposeResponse, status_code=201)
 def propose_dna_patch(
     family_id: int,
@@ -55,9 +102,14 @@ def propose_dna_patch(
         rationale=payload.rationale,
         confidence=payload.confidence,
         sources=payload.sources,
+        base_version=payload.base_version,
     )
     db.commit()
-    return DnaProposeResponse(proposal_id=str(proposal.proposal_id), status=proposal.status)
+    return DnaProposeResponse(
+        proposal_id=str(proposal.proposal_id),
+        status=proposal.status,
+        base_version=proposal.base_version,
+    )
 
 
 @router.post("/commit/{proposal_id}", response_model=DnaCommitResponse)
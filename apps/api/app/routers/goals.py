@@ -1,11 +1,9 @@
-import json
-
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.auth import AuthContext, get_auth_context
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.models.entities import FamilyMember, Goal
 from app.schemas.goals import GoalCreate, GoalListResponse, GoalResponse, GoalUpdate
 from app.services.access import require_family_editor, require_family_member
@@ -20,7 +18,7 @@ def _to_goal_response(goal: Goal) -> GoalResponse:
         name=goal.name,
         description=goal.description,
         weight=goal.weight,
-        action_types=json.loads(goal.action_types or "[]"),
+        action_types=list(goal.action_types or []),
         active=goal.active,
     )
 
@@ -29,7 +27,7 @@ def _to_goal_response(goal: Goal) -> GoalResponse:
 def list_goals(
     family_id: int | None = Query(default=None),
     active_only: bool = Query(default=False),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     ctx: AuthContext | None = Depends(get_auth_context),
 ):
     query = select(Goal)
@@ -48,7 +46,7 @@ def list_goals(
 @router.get("/{goal_id}", response_model=GoalResponse)
 def get_goal(
     goal_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     ctx: AuthContext | None = Depends(get_auth_context),
 ):
     goal = db.get(Goal, goal_id)
@@ -72,7 +70,7 @@ def create_goal(
         name=payload.name,
         description=payload.description,
         weight=payload.weight,
-        action_types=json.dumps(payload.action_types),
+        action_types=payload.action_types,
         active=payload.active,
     )
     db.add(goal)
@@ -101,7 +99,7 @@ def update_goal(
     if payload.weight is not None:
         goal.weight = payload.weight
     if payload.action_types is not None:
-        goal.action_types = json.dumps(payload.action_types)
+        goal.action_types = payload.action_types
     if payload.active is not None:
         goal.active = payload.active
 
@@ -1,8 +1,16 @@
 from fastapi import APIRouter
 
+from app.core.db import pool_status
+
 router = APIRouter(prefix="/health", tags=["health"])
 
 
 @router.get("")
 def health_check():
     return {"status": "ok"}
+
+
+@router.get("/db")
+def db_pool_health():
+    """Connection pool occupancy and checkout-wait counters (does not open a connection)."""
+    return {"status": "ok", "pool": pool_status()}
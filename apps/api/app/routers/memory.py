@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, Header
 from sqlalchemy.orm import Session
 
 from app.core.auth import AuthContext, get_auth_context
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.schemas.memory import (
     MemoryDocumentCreate,
     MemoryDocumentResponse,
@@ -34,6 +34,8 @@ def create_memory_document(
         type=payload.type,
         text_value=payload.text,
         source_refs=payload.source_refs,
+        entity_type=payload.entity_type,
+        entity_id=payload.entity_id,
     )
     db.commit()
     db.refresh(doc)
@@ -51,12 +53,24 @@ def create_memory_document(
 def search_memory(
     family_id: int,
     payload: MemorySearchRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     ctx: AuthContext | None = Depends(get_auth_context),
     x_dev_user: str | None = Header(default=None, alias="X-Dev-User"),
 ):
     require_family(db, family_id)
     if ctx is not None:
         require_family_member(db, family_id, ctx.email)
-    hits = semantic_search(db, family_id=family_id, query=payload.query, top_k=payload.top_k)
+    hits = semantic_search(
+        db,
+        family_id=family_id,
+        query=payload.query,
+        top_k=payload.top_k,
+        types=payload.types,
+        created_from=payload.created_from,
+        created_to=payload.created_to,
+        source_ref=payload.source_ref,
+        diversity=payload.diversity,
+        mmr_lambda=payload.mmr_lambda,
+        include_archive=payload.include_archive,
+    )
     return MemorySearchResponse(items=hits)
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, Header
 from sqlalchemy.orm import Session
 
 from app.core.auth import AuthContext, get_auth_context
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.schemas.notes import NoteIndexRequest, NoteIndexResponse, NoteSearchRequest, NoteSearchResponse
 from app.services.access import require_family, require_family_member
 from app.services.notes import search_notes, upsert_note_document
@@ -37,7 +37,7 @@ def index_note(
 @router.post("/search", response_model=NoteSearchResponse)
 def note_search(
     payload: NoteSearchRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     ctx: AuthContext | None = Depends(get_auth_context),
     x_dev_user: str | None = Header(default=None, alias="X-Dev-User"),
 ):
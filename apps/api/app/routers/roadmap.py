@@ -1,13 +1,18 @@
-import json
-
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.auth import AuthContext, get_auth_context
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.models.entities import Decision, DecisionScore, DecisionStatusEnum, DiscretionaryBudgetLedger, FamilyMember, Goal, RoadmapItem
-from app.schemas.roadmaps import RoadmapCreate, RoadmapListResponse, RoadmapResponse, RoadmapUpdate
+from app.schemas.roadmaps import (
+    RoadmapBlockersResponse,
+    RoadmapCreate,
+    RoadmapDependencyGraphResponse,
+    RoadmapListResponse,
+    RoadmapResponse,
+    RoadmapUpdate,
+)
 from app.services.budget import (
     ensure_active_period,
     ensure_member_allocation_in_period,
@@ -19,6 +24,12 @@ from app.services.access import require_family_member
 from app.services.event_bus import publish_event
 from agents.common.events.subjects import Subjects
 from app.services.memory import create_document_with_embeddings
+from app.services.roadmap_graph import (
+    delete_item_dependencies,
+    set_item_dependencies,
+    transitive_blockers,
+    transitive_dependents,
+)
 
 router = APIRouter(prefix="/v1/roadmap", tags=["roadmap"])
 
@@ -31,7 +42,7 @@ def _to_response(item: RoadmapItem) -> RoadmapResponse:
         start_date=item.start_date,
         end_date=item.end_date,
         status=item.status,
-        dependencies=json.loads(item.dependencies or "[]"),
+        dependencies=list(item.dependencies or []),
     )
 
 
@@ -48,10 +59,33 @@ def _decision_weighted_score(db: Session, decision: Decision) -> float | None:
     return compute_weighted_score(weighted, normalize_to=5)
 
 
+def _ensure_item_decision(db: Session, roadmap_id: int, ctx: AuthContext | None) -> tuple[RoadmapItem, Decision]:
+    item = db.get(RoadmapItem, roadmap_id)
+    if item is None:
+        raise HTTPException(status_code=404, detail="roadmap item not found")
+    decision = db.get(Decision, item.decision_id)
+    if decision is None:
+        raise HTTPException(status_code=404, detail="decision not found")
+    if ctx is not None:
+        require_family_member(db, decision.family_id, ctx.email)
+    return item, decision
+
+
+def _items_by_id(db: Session, family_id: int, item_ids: set[int]) -> list[RoadmapItem]:
+    if not item_ids:
+        return []
+    return db.execute(
+        select(RoadmapItem)
+        .join(Decision, Decision.id == RoadmapItem.decision_id)
+        .where(Decision.family_id == family_id, RoadmapItem.id.in_(item_ids))
+        .order_by(RoadmapItem.id.asc())
+    ).scalars().all()
+
+
 @router.get("", response_model=RoadmapListResponse)
 def list_roadmap_items(
     family_id: int | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     ctx: AuthContext | None = Depends(get_auth_context),
 ):
     query = select(RoadmapItem)
@@ -120,9 +154,10 @@ def create_roadmap_item(
         start_date=payload.start_date,
         end_date=payload.end_date,
         status=payload.status,
-        dependencies=json.dumps(payload.dependencies),
     )
     db.add(item)
+    db.flush()
+    item.dependencies = set_item_dependencies(db, item, decision.family_id, payload.dependencies)
     decision.status = DecisionStatusEnum.scheduled
     db.commit()
     db.refresh(item)
@@ -133,6 +168,8 @@ def create_roadmap_item(
             type="roadmap",
             text_value=f"Roadmap item created: id={item.id} decision_id={item.decision_id} bucket={item.bucket} start={item.start_date} end={item.end_date} status={item.status}",
             source_refs=[],
+            entity_type="roadmap_item",
+            entity_id=item.id,
         )
         db.commit()
     except Exception:
@@ -157,14 +194,7 @@ def update_roadmap_item(
     db: Session = Depends(get_db),
     ctx: AuthContext | None = Depends(get_auth_context),
 ):
-    item = db.get(RoadmapItem, roadmap_id)
-    if item is None:
-        raise HTTPException(status_code=404, detail="roadmap item not found")
-    if ctx is not None:
-        decision = db.get(Decision, item.decision_id)
-        if decision is None:
-            raise HTTPException(status_code=404, detail="decision not found")
-        require_family_member(db, decision.family_id, ctx.email)
+    item, decision = _ensure_item_decision(db, roadmap_id, ctx)
 
     if payload.bucket is not None:
         item.bucket = payload.bucket
@@ -175,7 +205,7 @@ def update_roadmap_item(
     if payload.status is not None:
         item.status = payload.status
     if payload.dependencies is not None:
-        item.dependencies = json.dumps(payload.dependencies)
+        item.dependencies = set_item_dependencies(db, item, decision.family_id, payload.dependencies)
 
     db.commit()
     db.refresh(item)
@@ -188,6 +218,8 @@ def update_roadmap_item(
                 type="roadmap",
                 text_value=f"Roadmap item updated: id={item.id} decision_id={item.decision_id} bucket={item.bucket} start={item.start_date} end={item.end_date} status={item.status}",
                 source_refs=[],
+                entity_type="roadmap_item",
+                entity_id=item.id,
             )
             db.commit()
     except Exception:
@@ -213,14 +245,7 @@ def delete_roadmap_item(
     db: Session = Depends(get_db),
     ctx: AuthContext | None = Depends(get_auth_context),
 ):
-    item = db.get(RoadmapItem, roadmap_id)
-    if item is None:
-        raise HTTPException(status_code=404, detail="roadmap item not found")
-    if ctx is not None:
-        decision = db.get(Decision, item.decision_id)
-        if decision is None:
-            raise HTTPException(status_code=404, detail="decision not found")
-        require_family_member(db, decision.family_id, ctx.email)
+    item, _ = _ensure_item_decision(db, roadmap_id, ctx)
 
     if item.status != "Done":
         debits = db.execute(
@@ -248,5 +273,43 @@ def delete_roadmap_item(
                 )
             )
 
+    delete_item_dependencies(db, [item.id])
     db.delete(item)
     db.commit()
+
+
+@router.get("/{roadmap_id}/blockers", response_model=RoadmapBlockersResponse)
+def get_roadmap_item_blockers(
+    roadmap_id: int,
+    db: Session = Depends(get_read_db),
+    ctx: AuthContext | None = Depends(get_auth_context),
+):
+    """Transitive blockers: every item this one (directly or indirectly) depends on."""
+    item, decision = _ensure_item_decision(db, roadmap_id, ctx)
+    blocker_ids = transitive_blockers(db, decision.family_id, item.id)
+    items = _items_by_id(db, decision.family_id, blocker_ids)
+    found = {blocker.id for blocker in items}
+    return RoadmapBlockersResponse(
+        roadmap_id=item.id,
+        blocked=any(blocker.status != "Done" for blocker in items),
+        items=[_to_response(blocker) for blocker in items],
+        missing_item_ids=sorted(blocker_ids - found),
+    )
+
+
+@router.get("/{roadmap_id}/dependents", response_model=RoadmapDependencyGraphResponse)
+def get_roadmap_item_dependents(
+    roadmap_id: int,
+    db: Session = Depends(get_read_db),
+    ctx: AuthContext | None = Depends(get_auth_context),
+):
+    """Transitive dependents: every item that is (directly or indirectly) blocked by this one."""
+    item, decision = _ensure_item_decision(db, roadmap_id, ctx)
+    dependent_ids = transitive_dependents(db, decision.family_id, item.id)
+    items = _items_by_id(db, decision.family_id, dependent_ids)
+    found = {dependent.id for dependent in items}
+    return RoadmapDependencyGraphResponse(
+        roadmap_id=item.id,
+        items=[_to_response(dependent) for dependent in items],
+        missing_item_ids=sorted(dependent_ids - found),
+    )
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class AuditFieldChange(BaseModel):
+    old: Any = None
+    new: Any = None
+
+
+class AuditEventResponse(BaseModel):
+    id: int
+    family_id: int | None
+    actor_member_id: int | None
+    entity_type: str
+    entity_id: int
+    action: str
+    changes: dict[str, AuditFieldChange]
+    # Budget/threshold overrides, highlighted in the history view.
+    privileged: bool
+    created_at: datetime
+
+
+class AuditEventListResponse(BaseModel):
+    items: list[AuditEventResponse]
+    # Pass back as `cursor` for the next (older) page; null on the last page.
+    next_cursor: str | None = None
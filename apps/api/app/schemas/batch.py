@@ -0,0 +1,27 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+
+class BatchOperation(BaseModel):
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    # API path, with or without the /v1 prefix. `${N.field}` is replaced with a field of operation N's
+    # response body (0-based), e.g. "/decisions/${0.id}/score".
+    path: str = Field(min_length=1)
+    body: dict[str, Any] | list[Any] | None = None
+    query: dict[str, Any] | None = None
+    summary: str | None = None
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(min_length=1)
+
+
+class BatchResult(BaseModel):
+    index: int
+    status_code: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    results: list[BatchResult]
@@ -17,20 +17,33 @@ class DnaSnapshotResponse(BaseModel):
     family_id: int
     version: int
     snapshot: dict[str, Any]
-    updated_at: datetime
+    # Null only for version 0 (before the first commit) when read historically.
+    updated_at: datetime | None
     updated_by: str
 
 
+class DnaDiffResponse(BaseModel):
+    family_id: int
+    from_version: int
+    to_version: int
+    # RFC 6902 operations turning the `from_version` snapshot into the `to_version` snapshot.
+    patch: list[dict[str, Any]]
+
+
 class DnaProposeRequest(BaseModel):
     patch: list[JsonPatchOp] = Field(min_length=1)
     rationale: str = Field(default="", max_length=10_000)
     confidence: float | None = Field(default=None, ge=0.0, le=1.0)
     sources: list[dict[str, Any]] = Field(default_factory=list)
+    # Version of the snapshot the patch was written against (defaults to the current one). Commits made
+    # after it are fine as long as they touched different paths; otherwise the commit returns 409.
+    base_version: int | None = Field(default=None, ge=0)
 
 
 class DnaProposeResponse(BaseModel):
     proposal_id: str
     status: str
+    base_version: int | None = None
 
 
 class DnaCommitResponse(BaseModel):
@@ -11,6 +11,9 @@ class MemoryDocumentCreate(BaseModel):
     type: Literal["decision", "rationale", "chat", "note", "dna", "roadmap"]
     text: str = Field(min_length=1)
     source_refs: list[dict[str, Any]] = Field(default_factory=list)
+    # Optional subject of the document; older documents for the same entity are compacted away.
+    entity_type: str | None = Field(default=None, max_length=32)
+    entity_id: int | None = None
 
 
 class MemoryDocumentResponse(BaseModel):
@@ -25,6 +28,16 @@ class MemoryDocumentResponse(BaseModel):
 class MemorySearchRequest(BaseModel):
     query: str = Field(min_length=1)
     top_k: int = Field(default=8, ge=1, le=50)
+    types: list[Literal["decision", "rationale", "chat", "note", "dna", "roadmap"]] = Field(default_factory=list)
+    created_from: datetime | None = None
+    created_to: datetime | None = None  # exclusive
+    # Matches documents with a source_refs entry containing these keys/values.
+    source_ref: dict[str, Any] | None = None
+    # collapse: best chunk per document; mmr: maximal marginal relevance; none: raw nearest chunks.
+    diversity: Literal["collapse", "mmr", "none"] = "collapse"
+    mmr_lambda: float = Field(default=0.5, ge=0.0, le=1.0)
+    # Also search documents moved to the archive tier by retention.
+    include_archive: bool = False
 
 
 class MemorySearchHit(BaseModel):
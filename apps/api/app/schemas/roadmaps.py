@@ -33,3 +33,13 @@ class RoadmapResponse(BaseModel):
 
 class RoadmapListResponse(BaseModel):
     items: list[RoadmapResponse]
+
+
+class RoadmapDependencyGraphResponse(BaseModel):
+    roadmap_id: int
+    items: list[RoadmapResponse]
+    missing_item_ids: list[int] = Field(default_factory=list)
+
+
+class RoadmapBlockersResponse(RoadmapDependencyGraphResponse):
+    blocked: bool
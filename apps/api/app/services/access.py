@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.models.entities import Family, FamilyMember, RoleEnum
+from app.services.audit import set_audit_actor
 
 
 def get_member_by_email(db: Session, family_id: int, email: str) -> FamilyMember | None:
@@ -24,6 +25,7 @@ def require_family_member(db: Session, family_id: int, email: str) -> FamilyMemb
     member = get_member_by_email(db, family_id, email)
     if member is None:
         raise HTTPException(status_code=403, detail="not a member of this family")
+    set_audit_actor(db, member.id)
     return member
 
 
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import event, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.models.entities import (
+    AuditLog,
+    BudgetPolicy,
+    Decision,
+    DiscretionaryBudgetLedger,
+    FamilyMember,
+    Goal,
+    MemberBudgetSetting,
+    RoadmapItem,
+)
+
+# Audited models and the `entity_type` their rows are recorded under.
+AUDITED_ENTITIES: dict[type, str] = {
+    Decision: "decision",
+    Goal: "goal",
+    RoadmapItem: "roadmap_item",
+    DiscretionaryBudgetLedger: "budget_ledger",
+    BudgetPolicy: "budget_policy",
+    MemberBudgetSetting: "member_budget_setting",
+    FamilyMember: "member",
+}
+
+# Entity types whose changes override scoring/budget rules; the history view highlights them.
+PRIVILEGED_ENTITY_TYPES = frozenset({"budget_policy", "member_budget_setting", "budget_ledger"})
+
+_ACTOR_KEY = "audit_actor_member_id"
+_BUFFER_KEY = "audit_buffer"
+
+
+def set_audit_actor(db: Session, member_id: int | None) -> None:
+    """Attribute this session's subsequent changes to `member_id` (set by the access checks)."""
+    db.info[_ACTOR_KEY] = member_id
+
+
+def detach_audit_actor(db: Session, member_id: int) -> None:
+    """
+    Before deleting a member: keep their audit history, unattributed (as a purge does).
+
+    Clears the rows explicitly so this also holds where ON DELETE SET NULL is not enforced (SQLite), and
+    stops attributing this session's changes to them (an admin removing themselves).
+    """
+    db.execute(update(AuditLog).where(AuditLog.actor_member_id == member_id).values(actor_member_id=None))
+    if db.info.get(_ACTOR_KEY) == member_id:
+        db.info[_ACTOR_KEY] = None
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _json_value(item) for key, item in value.items()}
+    return value
+
+
+def _field_changes(obj: Any, action: str) -> dict[str, dict[str, Any]]:
+    """`{field: {"old": ..., "new": ...}}` from the instance's attribute history (read before it is reset)."""
+    state = inspect(obj)
+    changes: dict[str, dict[str, Any]] = {}
+    for column in state.mapper.column_attrs:
+        history = state.attrs[column.key].history
+        if action == "create":
+            old, new = None, (history.added or history.unchanged or [None])[0]
+            if new is None:
+                continue
+        elif action == "delete":
+            old, new = (history.deleted or history.unchanged or [None])[0], None
+            if old is None:
+                continue
+        else:
+            if not history.has_changes():
+                continue
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            if old == new:
+                continue
+        changes[column.key] = {"old": _json_value(old), "new": _json_value(new)}
+    return changes
+
+
+# Roadmap items and ledger entries have no family column; their family is looked up through this parent.
+_FAMILY_VIA: dict[str, tuple[type, str]] = {
+    "roadmap_item": (Decision, "decision_id"),
+    "budget_ledger": (FamilyMember, "member_id"),
+}
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_changes(session: Session, flush_context) -> None:
+    buffer: list[dict[str, Any]] = session.info.setdefault(_BUFFER_KEY, [])
+    actor = session.info.get(_ACTOR_KEY)
+    for action, objects in (("create", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            entity_type = AUDITED_ENTITIES.get(type(obj))
+            if entity_type is None:
+                continue
+            changes = _field_changes(obj, action)
+            if action == "update" and not changes:
+                continue
+            values = inspect(obj).dict
+            via = _FAMILY_VIA.get(entity_type)
+            buffer.append(
+                {
+                    "family_id": values.get("family_id"),
+                    "parent_id": values.get(via[1]) if via else None,
+                    "actor_member_id": actor,
+                    "entity_type": entity_type,
+                    "entity_id": values.get("id"),
+                    "action": action,
+                    "changes": changes,
+                }
+            )
+
+
+def _resolve_family_ids(session: Session, buffer: list[dict[str, Any]]) -> None:
+    """One lookup per parent type for rows whose entity has no family column."""
+    for entity_type, (parent, _) in _FAMILY_VIA.items():
+        rows = [row for row in buffer if row["entity_type"] == entity_type and row["family_id"] is None]
+        parent_ids = {row["parent_id"] for row in rows} - {None}
+        if not parent_ids:
+            continue
+        # A parent deleted in the same transaction is only in the buffer.
+        parent_type = AUDITED_ENTITIES[parent]
+        families = {row["entity_id"]: row["family_id"] for row in buffer if row["entity_type"] == parent_type}
+        missing = parent_ids - families.keys()
+        if missing:
+            families.update(
+                session.connection().execute(select(parent.id, parent.family_id).where(parent.id.in_(missing))).all()
+            )
+        for row in rows:
+            row["family_id"] = families.get(row["parent_id"])
+
+
+@event.listens_for(Session, "before_commit")
+def _write_audit_rows(session: Session) -> None:
+    # Flush first so changes still pending at commit time are captured too.
+    session.flush()
+    buffer = session.info.pop(_BUFFER_KEY, None)
+    if not buffer:
+        return
+    _resolve_family_ids(session, buffer)
+    created_at = datetime.now(timezone.utc)
+    session.connection().execute(
+        insert(AuditLog.__table__),
+        [
+            {
+                "family_id": row["family_id"],
+                "actor_member_id": row["actor_member_id"],
+                "entity_type": row["entity_type"],
+                "entity_id": row["entity_id"],
+                "action": row["action"],
+                "changes_json": json.dumps(row["changes"], separators=(",", ":"), default=str),
+                "created_at": created_at,
+            }
+            for row in buffer
+        ],
+    )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_audit_rows(session: Session) -> None:
+    session.info.pop(_BUFFER_KEY, None)
@@ -99,40 +99,59 @@ def ensure_active_period(db: Session, family_id: int, today: date | None = None)
 
 
 def ensure_member_allocation_in_period(db: Session, family_id: int, period: Period, member_id: int) -> None:
-    existing = db.execute(
-        select(DiscretionaryBudgetLedger).where(
-            DiscretionaryBudgetLedger.member_id == member_id,
-            DiscretionaryBudgetLedger.period_id == period.id,
-            DiscretionaryBudgetLedger.reason == "period_allocation",
-        )
-    ).scalar_one_or_none()
-    if existing is not None:
+    ensure_member_allocations_in_period(db, family_id, period, [member_id])
+
+
+def ensure_member_allocations_in_period(db: Session, family_id: int, period: Period, member_ids: list[int]) -> None:
+    """Add the period allocation for any of `member_ids` missing one (constant number of queries)."""
+    if not member_ids:
+        return
+    allocated = set(
+        db.execute(
+            select(DiscretionaryBudgetLedger.member_id).where(
+                DiscretionaryBudgetLedger.period_id == period.id,
+                DiscretionaryBudgetLedger.member_id.in_(member_ids),
+                DiscretionaryBudgetLedger.reason == "period_allocation",
+            )
+        ).scalars()
+    )
+    missing = [member_id for member_id in dict.fromkeys(member_ids) if member_id not in allocated]
+    if not missing:
         return
 
     policy = get_or_create_policy(db, family_id)
-    allowance = member_allowance_map(db, family_id, policy.default_allowance).get(member_id, policy.default_allowance)
-    db.add(
-        DiscretionaryBudgetLedger(
-            member_id=member_id,
-            period_id=period.id,
-            delta=allowance,
-            reason="period_allocation",
-            decision_id=None,
-        )
+    allowances = member_allowance_map(db, family_id, policy.default_allowance)
+    _allocate_period_ledger(
+        db,
+        family_id,
+        period.id,
+        {member_id: allowances.get(member_id, policy.default_allowance) for member_id in missing},
     )
 
 
-def member_remaining_in_period(db: Session, period_id: int, member_id: int) -> tuple[int, int, int]:
-    rows = db.execute(
-        select(DiscretionaryBudgetLedger).where(
-            DiscretionaryBudgetLedger.period_id == period_id,
-            DiscretionaryBudgetLedger.member_id == member_id,
-        )
-    ).scalars().all()
-
+def _balance(rows: list[DiscretionaryBudgetLedger]) -> tuple[int, int, int]:
     allowance = sum(item.delta for item in rows if item.reason in {"period_allocation", "policy_adjustment"})
     spent_overrides = -sum(item.delta for item in rows if item.reason == "discretionary_schedule_override")
     spent_refunds = sum(item.delta for item in rows if item.reason == "discretionary_unschedule_refund")
     spent = max(spent_overrides - spent_refunds, 0)
     remaining = allowance - spent
     return allowance, spent, remaining
+
+
+def member_remaining_in_period(db: Session, period_id: int, member_id: int) -> tuple[int, int, int]:
+    return members_remaining_in_period(db, period_id, [member_id])[member_id]
+
+
+def members_remaining_in_period(db: Session, period_id: int, member_ids: list[int]) -> dict[int, tuple[int, int, int]]:
+    """(allowance, spent, remaining) per member, from a single ledger query."""
+    rows_by_member: dict[int, list[DiscretionaryBudgetLedger]] = {member_id: [] for member_id in member_ids}
+    if member_ids:
+        rows = db.execute(
+            select(DiscretionaryBudgetLedger).where(
+                DiscretionaryBudgetLedger.period_id == period_id,
+                DiscretionaryBudgetLedger.member_id.in_(member_ids),
+            )
+        ).scalars().all()
+        for row in rows:
+            rows_by_member[row.member_id].append(row)
+    return {member_id: _balance(rows) for member_id, rows in rows_by_member.items()}
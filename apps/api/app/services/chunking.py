@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embedding_providers import estimate_tokens
+from app.services.embeddings import embed_texts
+
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _iter_split(text: str, pattern: re.Pattern[str]) -> Iterator[str]:
+    """Lazy `pattern.split` that never copies more than one piece at a time."""
+    start = 0
+    for match in pattern.finditer(text):
+        yield text[start : match.start()]
+        start = match.end()
+    yield text[start:]
+
+
+def _units(text: str, max_tokens: int, count: Callable[[str], int]) -> Iterator[str]:
+    """Paragraphs, falling back to sentences, then words, then hard character slices, each within `max_tokens`."""
+    for paragraph in _iter_split(text, _PARAGRAPH_BREAK):
+        paragraph = _WHITESPACE.sub(" ", paragraph).strip()
+        if not paragraph:
+            continue
+        if count(paragraph) <= max_tokens:
+            yield paragraph
+            continue
+        for sentence in _iter_split(paragraph, _SENTENCE_END):
+            if count(sentence) <= max_tokens:
+                yield sentence
+                continue
+            for word in _iter_split(sentence, _WHITESPACE):
+                if count(word) <= max_tokens:
+                    yield word
+                    continue
+                step = max(1, len(word) * max_tokens // count(word))
+                for start in range(0, len(word), step):
+                    yield word[start : start + step]
+
+
+def iter_chunks(
+    parts: str | Iterable[str],
+    *,
+    max_tokens: int | None = None,
+    overlap_tokens: int | None = None,
+    count: Callable[[str], int] = estimate_tokens,
+) -> Iterator[str]:
+    """
+    Yield chunks of at most `max_tokens`, packed from paragraph/sentence units, with `overlap_tokens` carried over.
+
+    `parts` may be one string or an iterable of sections (title, summary, body, ...); sections are consumed
+    one at a time and always start on a unit boundary, so only the current section and chunk are held in memory.
+    """
+    budget = max(1, max_tokens if max_tokens is not None else settings.chunk_max_tokens)
+    overlap = max(0, min(overlap_tokens if overlap_tokens is not None else settings.chunk_overlap_tokens, budget // 2))
+    sections = [parts] if isinstance(parts, str) else parts
+
+    window: deque[tuple[str, int]] = deque()
+    used = 0
+    fresh = False  # whether the window holds anything not yet emitted
+    for section in sections:
+        for unit in _units(section or "", budget, count):
+            cost = count(unit)
+            if window and used + cost > budget:
+                if fresh:
+                    yield " ".join(item for item, _ in window)
+                # Keep a tail of whole units as overlap for the next chunk.
+                while window and (used > overlap or used + cost > budget):
+                    used -= window.popleft()[1]
+                fresh = False
+            window.append((unit, cost))
+            used += cost
+            fresh = True
+    if window and fresh:
+        yield " ".join(item for item, _ in window)
+
+
+def iter_embedded_chunks(
+    chunks: Iterable[str],
+    *,
+    dim: int = 1536,
+    batch_size: int | None = None,
+) -> Iterator[tuple[int, str, np.ndarray]]:
+    """Embed chunks in batches as they arrive, yielding `(chunk_id, text, vector)`; at most one batch is buffered."""
+    size = max(1, batch_size or settings.chunk_embed_batch_size)
+    batch: list[str] = []
+    chunk_id = 0
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= size:
+            for vector, text in zip(embed_texts(batch, dim=dim), batch, strict=True):
+                yield chunk_id, text, vector
+                chunk_id += 1
+            batch = []
+    if batch:
+        for vector, text in zip(embed_texts(batch, dim=dim), batch, strict=True):
+            yield chunk_id, text, vector
+            chunk_id += 1
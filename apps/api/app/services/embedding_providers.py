@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Protocol, TypeVar
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class EmbeddingProvider(Protocol):
+    """Turns texts into a `(n, dim)` float32 array plus the number of billed tokens (0 when free)."""
+
+    name: str
+    dim: int
+
+    def embed(self, texts: list[str]) -> tuple[np.ndarray, int]: ...
+
+
+class HashEmbeddingProvider:
+    name = "hash"
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+
+    def embed(self, texts: list[str]) -> tuple[np.ndarray, int]:
+        from app.services.embeddings import hash_embeddings
+
+        return hash_embeddings(texts, dim=self.dim), 0
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-ish bound for English text (~4 characters per token), good enough for request sizing."""
+    return len(text) // 4 + 1
+
+
+def batch_by_budget(texts: list[str], *, max_items: int, max_tokens: int) -> list[tuple[int, int]]:
+    """Split `texts` into contiguous `[start, end)` ranges within the provider's per-request input and token limits."""
+    ranges: list[tuple[int, int]] = []
+    start = 0
+    tokens = 0
+    for index, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if index > start and (index - start >= max_items or tokens + cost > max_tokens):
+            ranges.append((start, index))
+            start, tokens = index, 0
+        tokens += cost
+    if start < len(texts):
+        ranges.append((start, len(texts)))
+    return ranges
+
+
+T = TypeVar("T")
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    import openai
+
+    if isinstance(exc, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+
+
+def call_with_retries(
+    fn: Callable[[], T],
+    *,
+    max_retries: int,
+    base_seconds: float,
+    max_seconds: float,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """
+    Run `fn`, retrying 429/5xx/connection errors with capped exponential backoff and full jitter.
+
+    A server-sent Retry-After takes precedence over the computed delay (still capped at `max_seconds`).
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as exc:
+            if attempt >= max_retries or not _is_retryable(exc):
+                raise
+            delay = _retry_after_seconds(exc)
+            if delay is None:
+                delay = random.uniform(0, min(max_seconds, base_seconds * (2**attempt)))
+            sleep(min(delay, max_seconds))
+            attempt += 1
+
+
+class OpenAIEmbeddingProvider:
+    """
+    OpenAI embeddings through one process-wide client (shared HTTP connection pool).
+
+    Inputs are split into request-sized batches that run in parallel on a thread pool. Every request,
+    including the single-batch calls made on the caller's thread, takes a slot from one process-wide
+    semaphore, so at most OPENAI_EMBEDDING_CONCURRENCY requests are in flight across all callers.
+    Retry backoff happens outside the slot.
+    """
+
+    name = "openai"
+
+    def __init__(self, dim: int) -> None:
+        from openai import OpenAI
+
+        self.dim = dim
+        # Retries are handled here (with jitter and Retry-After), not by the SDK.
+        self.client = OpenAI(
+            api_key=settings.openai_api_key,
+            timeout=settings.note_embedding_timeout_seconds,
+            max_retries=0,
+        )
+        concurrency = max(settings.openai_embedding_concurrency, 1)
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embed-openai")
+        self._in_flight = threading.BoundedSemaphore(concurrency)
+
+    def _create(self, texts: list[str]):
+        with self._in_flight:
+            return self.client.embeddings.create(model=settings.note_embedding_model, input=texts, dimensions=self.dim)
+
+    def _embed_batch(self, texts: list[str]) -> tuple[np.ndarray, int]:
+        response = call_with_retries(
+            lambda: self._create(texts),
+            max_retries=settings.openai_embedding_max_retries,
+            base_seconds=settings.openai_embedding_backoff_base_seconds,
+            max_seconds=settings.openai_embedding_backoff_max_seconds,
+        )
+        tokens = getattr(response.usage, "total_tokens", 0) or 0
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return np.asarray([item.embedding for item in ordered], dtype=np.float32), tokens
+
+    def embed(self, texts: list[str]) -> tuple[np.ndarray, int]:
+        ranges = batch_by_budget(
+            texts,
+            max_items=settings.openai_embedding_batch_size,
+            max_tokens=settings.openai_embedding_batch_tokens,
+        )
+        if len(ranges) == 1:
+            return self._embed_batch(texts)
+        results = list(self._pool.map(lambda bounds: self._embed_batch(texts[bounds[0] : bounds[1]]), ranges))
+        return np.concatenate([vectors for vectors, _ in results]), sum(tokens for _, tokens in results)
+
+
+def plan_batches(lengths: list[int], *, max_batch_tokens: int, max_batch_size: int) -> list[list[int]]:
+    """
+    Group input indices into batches of similar length.
+
+    Inputs are sorted by token count so padding is minimal, and a batch grows until its padded size
+    (batch size x longest member) would exceed `max_batch_tokens`: many short texts share a batch,
+    long ones run in small batches.
+    """
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index])
+    batches: list[list[int]] = []
+    current: list[int] = []
+    for index in order:
+        longest = max(lengths[index], 1)  # sorted ascending: the newcomer is the longest
+        if current and (len(current) >= max_batch_size or (len(current) + 1) * longest > max_batch_tokens):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def mean_pool(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Mask-aware mean over the sequence axis, then L2 normalization (sentence-transformers style)."""
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (hidden * mask).sum(axis=1)
+    pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+class LocalOnnxEmbeddingProvider:
+    """
+    CPU inference with an exported sentence-embedding model (e.g. all-MiniLM-L6-v2 / bge-small as ONNX).
+
+    `model_dir` must contain `model.onnx` and a Hugging Face `tokenizer.json`. Requires the optional
+    `onnxruntime` and `tokenizers` packages (see requirements-local-embeddings.txt).
+    """
+
+    name = "local"
+
+    def __init__(self, model_dir: str, dim: int) -> None:
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as exc:  # pragma: no cover - depends on optional packages
+            raise RuntimeError(
+                "local embedding provider requires the optional 'onnxruntime' and 'tokenizers' packages"
+            ) from exc
+
+        path = Path(model_dir)
+        self.tokenizer = Tokenizer.from_file(str(path / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=settings.local_embedding_max_length)
+        options = onnxruntime.SessionOptions()
+        if settings.local_embedding_intra_op_threads > 0:
+            options.intra_op_num_threads = settings.local_embedding_intra_op_threads
+        self.session = onnxruntime.InferenceSession(
+            str(path / "model.onnx"), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {item.name for item in self.session.get_inputs()}
+        self.dim = dim
+        self._tokenizer_workers = max(settings.local_embedding_tokenizer_workers, 1)
+        self._tokenizer_pool = ThreadPoolExecutor(max_workers=self._tokenizer_workers, thread_name_prefix="embed-tokenize")
+
+    def _tokenize(self, texts: list[str]) -> list[Any]:
+        # `encode_batch` releases the GIL, so slices tokenize in parallel while inference runs natively.
+        step = max(1, -(-len(texts) // self._tokenizer_workers))
+        slices = [texts[start : start + step] for start in range(0, len(texts), step)]
+        encodings: list[Any] = []
+        for part in self._tokenizer_pool.map(self.tokenizer.encode_batch, slices):
+            encodings.extend(part)
+        return encodings
+
+    def _run(self, encodings: list[Any]) -> np.ndarray:
+        width = max(len(item.ids) for item in encodings)
+        input_ids = np.zeros((len(encodings), width), dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), width), dtype=np.int64)
+        for row, item in enumerate(encodings):
+            input_ids[row, : len(item.ids)] = item.ids
+            attention_mask[row, : len(item.ids)] = 1
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        output = self.session.run(None, {name: value for name, value in feeds.items() if name in self.input_names})[0]
+        if output.ndim == 2:  # model already pools (e.g. "sentence_embedding" output)
+            norms = np.linalg.norm(output, axis=1, keepdims=True)
+            return (output / np.clip(norms, 1e-12, None)).astype(np.float32)
+        return mean_pool(output, attention_mask)
+
+    def embed(self, texts: list[str]) -> tuple[np.ndarray, int]:
+        encodings = self._tokenize(texts)
+        batches = plan_batches(
+            [len(item.ids) for item in encodings],
+            max_batch_tokens=settings.local_embedding_max_batch_tokens,
+            max_batch_size=settings.local_embedding_max_batch_size,
+        )
+        out: np.ndarray | None = None
+        for batch in batches:
+            vectors = self._run([encodings[index] for index in batch])
+            if out is None:
+                out = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[batch] = vectors
+        assert out is not None
+        if out.shape[1] > self.dim:
+            # Deployment asked for fewer dimensions than the model emits: keep the leading ones, renormalized.
+            out = out[:, : self.dim]
+            out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+        return out, 0
+
+
+_provider: EmbeddingProvider | None = None
+_provider_lock = threading.Lock()
+
+
+def provider() -> EmbeddingProvider:
+    """Process-wide provider chosen by EMBEDDING_PROVIDER (the local model is loaded once, on first use)."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = _build_provider()
+    return _provider
+
+
+def reset_provider() -> None:
+    global _provider
+    with _provider_lock:
+        _provider = None
+
+
+def _build_provider() -> EmbeddingProvider:
+    choice = settings.embedding_provider.strip().lower()
+    if choice == "auto":
+        choice = "openai" if settings.openai_api_key.strip() else "hash"
+    if choice == "openai":
+        return OpenAIEmbeddingProvider(settings.embedding_dim)
+    if choice == "local":
+        if not settings.local_embedding_model_dir.strip():
+            raise RuntimeError("LOCAL_EMBEDDING_MODEL_DIR must be set for the local embedding provider")
+        return LocalOnnxEmbeddingProvider(settings.local_embedding_model_dir, settings.embedding_dim)
+    if choice == "hash":
+        return HashEmbeddingProvider(settings.embedding_dim)
+    raise RuntimeError(f"unknown EMBEDDING_PROVIDER: {settings.embedding_provider}")
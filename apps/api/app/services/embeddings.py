@@ -3,41 +3,60 @@ from __future__ import annotations
 import hashlib
 from typing import Iterable
 
-from openai import OpenAI
+import numpy as np
 
-from app.core.config import settings
+from app.core.metrics import track_embedding_call
+from app.services.embedding_providers import provider
 
 
 def _hash_bytes(text: str) -> bytes:
     return hashlib.sha256(text.encode("utf-8")).digest()
 
 
-def embed_text(text: str, *, dim: int = 1536) -> list[float]:
+def hash_embeddings(texts: list[str], *, dim: int = 1536) -> np.ndarray:
     """
-    Deterministic embedding baseline (no external model required).
+    Deterministic embedding baseline (no external model required), batched.
 
+    Each row repeats the text's SHA-256 digest across `dim` slots, mapping byte b to (b / 255) * 2 - 1.
     This is NOT semantically strong, but it unblocks pgvector plumbing and API contracts.
     """
-    seed = _hash_bytes(text or "")
-    out: list[float] = []
-    i = 0
-    while len(out) < dim:
-        b = seed[i % len(seed)]
-        out.append((b / 255.0) * 2.0 - 1.0)
-        i += 1
+    digests = np.frombuffer(b"".join(_hash_bytes(text or "") for text in texts), dtype=np.uint8)
+    digests = digests.reshape(len(texts), hashlib.sha256().digest_size)
+    columns = np.arange(dim) % digests.shape[1]
+    return digests[:, columns].astype(np.float32) * np.float32(2.0 / 255.0) - np.float32(1.0)
+
+
+def embed_text(text: str, *, dim: int = 1536) -> list[float]:
+    return hash_embeddings([text], dim=dim)[0].tolist()
+
+
+def fit_width(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """Zero-pad (or truncate) provider output to the storage width; padding leaves L2 distances unchanged."""
+    width = vectors.shape[1]
+    if width == dim:
+        return vectors
+    if width > dim:
+        return np.ascontiguousarray(vectors[:, :dim])
+    out = np.zeros((vectors.shape[0], dim), dtype=np.float32)
+    out[:, :width] = vectors
     return out
 
 
-def embed_texts(texts: Iterable[str], *, dim: int = 1536) -> list[list[float]]:
+def embed_texts(texts: Iterable[str], *, dim: int = 1536) -> np.ndarray:
+    """Embed `texts` with the configured provider as a `(n, dim)` float32 array."""
     values = list(texts)
     if not values:
-        return []
-    if settings.openai_api_key.strip():
-        client = OpenAI(api_key=settings.openai_api_key, timeout=settings.note_embedding_timeout_seconds)
-        response = client.embeddings.create(
-            model=settings.note_embedding_model,
-            input=values,
-            dimensions=dim,
-        )
-        return [list(item.embedding) for item in response.data]
-    return [embed_text(t, dim=dim) for t in values]
+        return np.empty((0, dim), dtype=np.float32)
+    backend = provider()
+    with track_embedding_call(backend.name, len(values)) as usage:
+        vectors, usage["tokens"] = backend.embed(values)
+    return fit_width(vectors, dim)
+
+
+def vector_param(vector: np.ndarray) -> list[float]:
+    """
+    Bind value for a query vector, used as `CAST(:qvec AS real[])::vector`.
+
+    psycopg2 adapts the list as a float array in C, instead of Python formatting a '[...]' literal per element.
+    """
+    return np.asarray(vector, dtype=np.float32).tolist()
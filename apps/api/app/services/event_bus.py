@@ -1,11 +1,19 @@
 from __future__ import annotations
 
-from typing import Any
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
 
 from agents.common.events.publisher import EventPublisher
 
+from app.core.config import settings
+from app.core.metrics import EVENT_PUBLISH_LATENCY
+
 
 _publisher: EventPublisher | None = None
+# Set while a batch runs: events queue here and are published only once the batch commits.
+_deferred: ContextVar[list[tuple[tuple, dict]] | None] = ContextVar("deferred_events", default=None)
 
 
 def publisher() -> EventPublisher:
@@ -25,14 +33,57 @@ def publish_event(
     correlation_id: str | None = None,
     headers: dict[str, str] | None = None,
 ) -> str:
+    if not settings.events_enabled:
+        return ""
+    deferred = _deferred.get()
+    if deferred is not None:
+        deferred.append(
+            (
+                (subject, payload),
+                {
+                    "actor": actor,
+                    "family_id": family_id,
+                    "source": source,
+                    "correlation_id": correlation_id,
+                    "headers": headers,
+                },
+            )
+        )
+        return ""
     # Sync publishing is fine at this stage; replace with async/background task later.
-    return publisher().publish_sync(
-        subject,
-        payload,
-        actor=actor,
-        family_id=family_id,
-        source=source,
-        correlation_id=correlation_id,
-        headers=headers,
-    )
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        event_id = publisher().publish_sync(
+            subject,
+            payload,
+            actor=actor,
+            family_id=family_id,
+            source=source,
+            correlation_id=correlation_id,
+            headers=headers,
+        )
+        outcome = "ok"
+        return event_id
+    finally:
+        EVENT_PUBLISH_LATENCY.labels(subject, outcome).observe(time.perf_counter() - started)
+
+
+
+@contextmanager
+def deferred_events() -> Iterator[list[tuple[tuple, dict]]]:
+    """Hold back `publish_event` calls made inside the block; publish them with `publish_deferred`."""
+    pending: list[tuple[tuple, dict]] = []
+    token = _deferred.set(pending)
+    try:
+        yield pending
+    finally:
+        _deferred.reset(token)
+
 
+def publish_deferred(pending: list[tuple[tuple, dict]]) -> None:
+    for args, kwargs in pending:
+        try:
+            publish_event(*args, **kwargs)
+        except Exception:
+            pass
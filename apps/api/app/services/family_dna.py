@@ -6,12 +6,14 @@ from typing import Any
 
 import jsonpatch
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from agents.common.events.subjects import Subjects
 from agents.common.models.family_dna import FamilyDnaSnapshot as FamilyDnaSnapshotModel
-from app.models.family_dna import FamilyDnaEvent, FamilyDnaPatchProposal, FamilyDnaSnapshot
+from app.core.config import settings
+from app.models.family_dna import FamilyDnaCheckpoint, FamilyDnaEvent, FamilyDnaPatchProposal, FamilyDnaSnapshot
 from app.services.event_bus import publish_event
 from app.services.memory import create_document_with_embeddings
 from app.services.secrets import scan_no_secrets
@@ -20,9 +22,13 @@ from app.services.secrets import scan_no_secrets
 def get_latest_snapshot(db: Session, family_id: int) -> FamilyDnaSnapshot:
     snap = db.get(FamilyDnaSnapshot, family_id)
     if snap is None:
-        snap = FamilyDnaSnapshot(family_id=family_id, version=0, snapshot_jsonb={}, updated_by="system")
-        db.add(snap)
-        db.flush()
+        try:
+            with db.begin_nested():
+                snap = FamilyDnaSnapshot(family_id=family_id, version=0, snapshot_jsonb={}, updated_by="system")
+                db.add(snap)
+        except IntegrityError:
+            # Another request created it first.
+            snap = db.get(FamilyDnaSnapshot, family_id, populate_existing=True)
     return snap
 
 
@@ -35,15 +41,23 @@ def propose_patch(
     rationale: str,
     confidence: float | None,
     sources: list[dict[str, Any]] | None,
+    base_version: int | None = None,
 ) -> FamilyDnaPatchProposal:
     findings = scan_no_secrets({"patch": patch_ops, "rationale": rationale, "sources": sources or []})
     if findings:
         raise HTTPException(status_code=400, detail={"error": "patch contains potential secrets", "findings": findings})
 
+    current_version = get_latest_snapshot(db, family_id).version
+    if base_version is None:
+        base_version = current_version
+    elif base_version > current_version:
+        raise HTTPException(status_code=400, detail=f"base_version {base_version} is ahead of the current version {current_version}")
+
     proposal = FamilyDnaPatchProposal(
         family_id=family_id,
         actor=actor,
         patch_jsonb=patch_ops,
+        base_version=base_version,
         status="proposed",
         rationale=rationale or "",
         confidence=confidence,
@@ -54,23 +68,13 @@ def propose_patch(
     return proposal
 
 
-def commit_proposal(
-    db: Session,
-    *,
-    family_id: int,
-    actor: str,
-    proposal_id: uuid.UUID,
-) -> tuple[int, uuid.UUID]:
-    proposal = db.get(FamilyDnaPatchProposal, proposal_id)
-    if proposal is None or proposal.family_id != family_id:
-        raise HTTPException(status_code=404, detail="proposal not found")
-    if proposal.status != "proposed":
-        raise HTTPException(status_code=400, detail=f"proposal status is {proposal.status}")
+# Compare-and-set attempts before a commit gives up; each lost race means another commit landed meanwhile.
+_COMMIT_ATTEMPTS = 5
+
 
-    snap = get_latest_snapshot(db, family_id)
-    current = snap.snapshot_jsonb or {}
+def _apply_proposal(current: dict[str, Any], patch_ops: list[dict[str, Any]]) -> dict[str, Any]:
     try:
-        patched = jsonpatch.apply_patch(current, proposal.patch_jsonb, in_place=False)
+        patched = jsonpatch.apply_patch(current, patch_ops, in_place=False)
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"invalid patch: {exc}") from exc
 
@@ -80,15 +84,126 @@ def commit_proposal(
 
     # Schema validation (strict structure).
     try:
-        validated = FamilyDnaSnapshotModel.model_validate(patched).model_dump(mode="json")
+        return FamilyDnaSnapshotModel.model_validate(patched).model_dump(mode="json")
     except Exception as exc:
         raise HTTPException(status_code=400, detail=f"schema validation failed: {exc}") from exc
 
-    next_version = int(snap.version) + 1
-    snap.version = next_version
-    snap.snapshot_jsonb = validated
-    snap.updated_at = datetime.now(timezone.utc)
-    snap.updated_by = actor
+
+def _pointer(path: str) -> tuple[str, ...]:
+    return tuple(token.replace("~1", "/").replace("~0", "~") for token in path.split("/")[1:])
+
+
+def _touched(op: dict[str, Any]) -> list[tuple[str, ...]]:
+    return [_pointer(op[key]) for key in ("path", "from") if op.get(key) is not None]
+
+
+def _ops_conflict(theirs: dict[str, Any], ours: dict[str, Any]) -> bool:
+    """Whether `ours`, written against the state before `theirs`, can still be applied after it."""
+    for their_path in _touched(theirs):
+        for our_path in _touched(ours):
+            both_append = (
+                theirs["op"] == ours["op"] == "add" and their_path == our_path and their_path[-1:] == ("-",)
+            )
+            if both_append:
+                continue  # appends to the same array commute
+            depth = min(len(their_path), len(our_path))
+            if their_path[:depth] == our_path[:depth]:
+                return True  # same node, or one is inside the other
+            # Inserting/removing array element i shifts the indices of the elements after it.
+            parent, index = their_path[:-1], their_path[-1] if their_path else ""
+            if (
+                theirs["op"] in {"add", "remove", "move", "copy"}
+                and index.isdigit()
+                and len(our_path) > len(parent)
+                and our_path[: len(parent)] == parent
+                and our_path[len(parent)].isdigit()
+                and int(our_path[len(parent)]) >= int(index)
+            ):
+                return True
+    return False
+
+
+def _ensure_rebasable(db: Session, proposal: FamilyDnaPatchProposal, current_version: int) -> None:
+    """Raise 409 if a commit after the proposal's base version touched what the proposal touches."""
+    events = db.execute(
+        select(FamilyDnaEvent.result_version, FamilyDnaEvent.patch_jsonb)
+        .where(
+            FamilyDnaEvent.family_id == proposal.family_id,
+            FamilyDnaEvent.result_version > proposal.base_version,
+            FamilyDnaEvent.result_version <= current_version,
+        )
+        .order_by(FamilyDnaEvent.result_version.asc())
+    ).all()
+    conflicts = [
+        {"version": version, "their_path": theirs.get("path"), "our_path": ours.get("path")}
+        for version, patch_ops in events
+        for theirs in patch_ops
+        for ours in proposal.patch_jsonb
+        if _ops_conflict(theirs, ours)
+    ]
+    if conflicts:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "error": "proposal conflicts with changes committed since its base version",
+                "base_version": proposal.base_version,
+                "current_version": current_version,
+                "conflicts": conflicts,
+            },
+        )
+
+
+def commit_proposal(
+    db: Session,
+    *,
+    family_id: int,
+    actor: str,
+    proposal_id: uuid.UUID,
+) -> tuple[int, uuid.UUID]:
+    proposal = db.get(FamilyDnaPatchProposal, proposal_id)
+    if proposal is None or proposal.family_id != family_id:
+        raise HTTPException(status_code=404, detail="proposal not found")
+    if proposal.status != "proposed":
+        raise HTTPException(status_code=400, detail=f"proposal status is {proposal.status}")
+
+    # Optimistic concurrency: the snapshot only moves from the version it was read at (compare-and-set), so
+    # concurrent commits cannot both write N+1. A commit that loses the race re-reads and rebases instead of
+    # failing; it is rejected only if a commit since the proposal's base version touched the same paths.
+    for _ in range(_COMMIT_ATTEMPTS):
+        snap = get_latest_snapshot(db, family_id)
+        current_version = int(snap.version)
+        if proposal.base_version is not None and current_version > proposal.base_version:
+            _ensure_rebasable(db, proposal, current_version)
+        validated = _apply_proposal(snap.snapshot_jsonb or {}, proposal.patch_jsonb)
+        next_version = current_version + 1
+        swapped = db.execute(
+            update(FamilyDnaSnapshot)
+            .where(FamilyDnaSnapshot.family_id == family_id, FamilyDnaSnapshot.version == current_version)
+            .values(
+                version=next_version,
+                snapshot_jsonb=validated,
+                updated_at=datetime.now(timezone.utc),
+                updated_by=actor,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.expire(snap)
+        if swapped:
+            break
+    else:
+        raise HTTPException(status_code=409, detail="family DNA is being updated concurrently; retry the commit")
+
+    claimed = db.execute(
+        update(FamilyDnaPatchProposal)
+        .where(FamilyDnaPatchProposal.proposal_id == proposal_id, FamilyDnaPatchProposal.status == "proposed")
+        .values(status="committed")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        raise HTTPException(status_code=409, detail="proposal was committed or closed concurrently")
+    db.expire(proposal, ["status"])
+    if _checkpoint_due(next_version):
+        db.add(FamilyDnaCheckpoint(family_id=family_id, version=next_version, snapshot_jsonb=validated))
 
     event_id = uuid.uuid4()
     db.add(
@@ -104,7 +219,6 @@ def commit_proposal(
             result_version=next_version,
         )
     )
-    proposal.status = "committed"
 
     # Semantic memory: store a compact rationale + patch summary.
     try:
@@ -130,3 +244,84 @@ def commit_proposal(
         pass
 
     return next_version, event_id
+
+
+def _checkpoint_due(version: int) -> bool:
+    interval = settings.dna_checkpoint_interval
+    return interval > 0 and version > 0 and version % interval == 0
+
+
+def _replay_event(state: dict[str, Any], event: FamilyDnaEvent) -> dict[str, Any]:
+    # Same steps as commit_proposal (patch, then schema normalization), so replay reproduces the stored state.
+    patched = jsonpatch.apply_patch(state, event.patch_jsonb, in_place=False)
+    return FamilyDnaSnapshotModel.model_validate(patched).model_dump(mode="json")
+
+
+def get_snapshot_at_version(db: Session, family_id: int, version: int) -> tuple[dict[str, Any], FamilyDnaEvent | None]:
+    """
+    DNA state right after `version` was committed, and the event that produced it (None for version 0).
+
+    Starts from the nearest checkpoint at or below `version` and replays the events after it. Checkpoints
+    missing from before checkpointing existed are stored on the way, so later reads stay within the interval.
+    """
+    latest = get_latest_snapshot(db, family_id)
+    if version < 0 or version > latest.version:
+        raise HTTPException(status_code=404, detail=f"family DNA version {version} not found")
+
+    checkpoint = db.execute(
+        select(FamilyDnaCheckpoint)
+        .where(FamilyDnaCheckpoint.family_id == family_id, FamilyDnaCheckpoint.version <= version)
+        .order_by(FamilyDnaCheckpoint.version.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+    state, base = (checkpoint.snapshot_jsonb, checkpoint.version) if checkpoint is not None else ({}, 0)
+    events = db.execute(
+        select(FamilyDnaEvent)
+        .where(
+            FamilyDnaEvent.family_id == family_id,
+            FamilyDnaEvent.result_version > base,
+            FamilyDnaEvent.result_version <= version,
+        )
+        .order_by(FamilyDnaEvent.result_version.asc())
+    ).scalars().all()
+    if [event.result_version for event in events] != list(range(base + 1, version + 1)):
+        raise HTTPException(status_code=409, detail=f"family DNA history up to version {version} is not replayable")
+
+    for event in events:
+        try:
+            state = _replay_event(state, event)
+        except Exception as exc:
+            raise HTTPException(status_code=409, detail=f"cannot replay family DNA version {event.result_version}: {exc}") from exc
+        if _checkpoint_due(event.result_version):
+            try:
+                with db.begin_nested():
+                    db.add(FamilyDnaCheckpoint(family_id=family_id, version=event.result_version, snapshot_jsonb=state))
+            except IntegrityError:
+                pass  # a concurrent read stored it first
+    return state, events[-1] if events else _event_at(db, family_id, version)
+
+
+def _event_at(db: Session, family_id: int, version: int) -> FamilyDnaEvent | None:
+    if version == 0:
+        return None
+    return db.execute(
+        select(FamilyDnaEvent).where(FamilyDnaEvent.family_id == family_id, FamilyDnaEvent.result_version == version).limit(1)
+    ).scalar_one_or_none()
+
+
+def version_as_of(db: Session, family_id: int, as_of: datetime) -> int:
+    """The DNA version in effect at `as_of` (0 before the first commit)."""
+    version = db.execute(
+        select(FamilyDnaEvent.result_version)
+        .where(FamilyDnaEvent.family_id == family_id, FamilyDnaEvent.ts <= as_of)
+        .order_by(FamilyDnaEvent.ts.desc(), FamilyDnaEvent.result_version.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+    return int(version or 0)
+
+
+def diff_versions(db: Session, family_id: int, from_version: int, to_version: int) -> list[dict[str, Any]]:
+    """JSON patch turning the state at `from_version` into the state at `to_version`."""
+    before, _ = get_snapshot_at_version(db, family_id, from_version)
+    after, _ = get_snapshot_at_version(db, family_id, to_version)
+    return jsonpatch.make_patch(before, after).patch
@@ -0,0 +1,416 @@
+"""
+Per-family NDJSON export/import.
+
+The stream is one JSON object per line:
+
+    {"kind": "header", "format": "decision-system.family", "version": 1, "family_id": 7, "exported_at": "..."}
+    {"kind": "row", "table": "families", "row": {...}}
+    ... every family-scoped table, parents before children ...
+    {"kind": "end", "counts": {"families": 1, "family_members": 3, ...}}
+
+Values are JSON-native except dates/datetimes (ISO 8601), UUIDs (strings), enums (their values) and
+embeddings (base64 of little-endian float32).
+
+Import creates a new family: integer primary keys are reallocated from the target database and every
+reference to them (foreign keys, roadmap dependency lists, memory document entity ids) is rewritten.
+UUID keys (notes, memory, DNA events) are kept, so a family can be restored after a purge or moved to
+another installation, but not copied within the database it came from.
+"""
+
+from __future__ import annotations
+
+import base64
+import enum
+import io
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Iterable, Iterator
+
+import numpy as np
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Boolean, Date, DateTime, Enum as SqlEnum, Table, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.types import JSON, Uuid
+
+from app.models.agent_sessions import AgentSessionState
+from app.models.entities import (
+    BudgetPolicy,
+    Decision,
+    DecisionQueueItem,
+    DecisionScore,
+    DecisionSuggestion,
+    DiscretionaryBudgetLedger,
+    Family,
+    FamilyMember,
+    Goal,
+    MemberBudgetSetting,
+    Period,
+    RoadmapDependency,
+    RoadmapItem,
+)
+from app.models.family_dna import FamilyDnaCheckpoint, FamilyDnaEvent, FamilyDnaPatchProposal, FamilyDnaSnapshot
+from app.models.memory import MemoryDocument, MemoryDocumentArchive, MemoryEmbedding, MemoryEmbeddingArchive
+from app.models.notes import NoteDocument, NoteEmbedding
+
+
+FORMAT = "decision-system.family"
+VERSION = 1
+
+
+class FamilyImportError(ValueError):
+    """The uploaded stream is malformed, truncated, or from an unsupported format version."""
+
+
+@dataclass(frozen=True)
+class _Spec:
+    table: Table
+    # Rows belonging to the family.
+    scope: Callable[[int], ColumnElement[bool]]
+    # Integer primary key reallocated on import (None: composite/UUID/family keyed).
+    key: str | None = "id"
+    # Integer columns pointing at another table's reallocated key.
+    refs: dict[str, str] = field(default_factory=dict)
+    # JSON list columns holding such ids.
+    list_refs: dict[str, str] = field(default_factory=dict)
+
+
+_ENTITY_TABLES = {"decision": "decisions", "roadmap_item": "roadmap_items"}
+
+
+def _family_decisions(family_id: int):
+    return select(Decision.id).where(Decision.family_id == family_id)
+
+
+def _specs() -> list[_Spec]:
+    family_ref = {"family_id": "families"}
+    return [
+        _Spec(Family.__table__, lambda f: Family.id == f),
+        _Spec(FamilyMember.__table__, lambda f: FamilyMember.family_id == f, refs=family_ref),
+        _Spec(Goal.__table__, lambda f: Goal.family_id == f, refs=family_ref),
+        _Spec(Period.__table__, lambda f: Period.family_id == f, refs=family_ref),
+        _Spec(BudgetPolicy.__table__, lambda f: BudgetPolicy.family_id == f, refs=family_ref),
+        _Spec(
+            MemberBudgetSetting.__table__,
+            lambda f: MemberBudgetSetting.family_id == f,
+            refs={**family_ref, "member_id": "family_members"},
+        ),
+        _Spec(
+            Decision.__table__,
+            lambda f: Decision.family_id == f,
+            refs={**family_ref, "created_by_member_id": "family_members", "owner_member_id": "family_members"},
+        ),
+        _Spec(
+            DecisionScore.__table__,
+            lambda f: DecisionScore.decision_id.in_(_family_decisions(f)),
+            refs={"decision_id": "decisions", "goal_id": "goals"},
+        ),
+        _Spec(
+            DecisionSuggestion.__table__,
+            lambda f: DecisionSuggestion.decision_id.in_(_family_decisions(f)),
+            refs={"decision_id": "decisions"},
+        ),
+        _Spec(
+            DecisionQueueItem.__table__,
+            lambda f: DecisionQueueItem.decision_id.in_(_family_decisions(f)),
+            refs={"decision_id": "decisions"},
+        ),
+        _Spec(
+            RoadmapItem.__table__,
+            lambda f: RoadmapItem.decision_id.in_(_family_decisions(f)),
+            refs={"decision_id": "decisions"},
+            list_refs={"dependencies": "roadmap_items"},
+        ),
+        _Spec(
+            RoadmapDependency.__table__,
+            lambda f: RoadmapDependency.family_id == f,
+            key=None,
+            refs={**family_ref, "roadmap_item_id": "roadmap_items", "depends_on_item_id": "roadmap_items"},
+        ),
+        _Spec(
+            DiscretionaryBudgetLedger.__table__,
+            lambda f: DiscretionaryBudgetLedger.period_id.in_(select(Period.id).where(Period.family_id == f)),
+            refs={"member_id": "family_members", "period_id": "periods", "decision_id": "decisions"},
+        ),
+        _Spec(FamilyDnaSnapshot.__table__, lambda f: FamilyDnaSnapshot.family_id == f, key=None, refs=family_ref),
+        _Spec(FamilyDnaEvent.__table__, lambda f: FamilyDnaEvent.family_id == f, key=None, refs=family_ref),
+        _Spec(FamilyDnaCheckpoint.__table__, lambda f: FamilyDnaCheckpoint.family_id == f, key=None, refs=family_ref),
+        _Spec(FamilyDnaPatchProposal.__table__, lambda f: FamilyDnaPatchProposal.family_id == f, key=None, refs=family_ref),
+        _Spec(AgentSessionState.__table__, lambda f: AgentSessionState.family_id == f, key=None, refs=family_ref),
+        _Spec(NoteDocument.__table__, lambda f: NoteDocument.family_id == f, key=None, refs=family_ref),
+        _Spec(
+            NoteEmbedding.__table__,
+            lambda f: NoteEmbedding.doc_id.in_(select(NoteDocument.doc_id).where(NoteDocument.family_id == f)),
+            key=None,
+        ),
+        _Spec(MemoryDocument.__table__, lambda f: MemoryDocument.family_id == f, key=None, refs=family_ref),
+        _Spec(
+            MemoryEmbedding.__table__,
+            lambda f: MemoryEmbedding.doc_id.in_(select(MemoryDocument.doc_id).where(MemoryDocument.family_id == f)),
+            key=None,
+        ),
+        _Spec(MemoryDocumentArchive.__table__, lambda f: MemoryDocumentArchive.family_id == f, key=None, refs=family_ref),
+        _Spec(
+            MemoryEmbeddingArchive.__table__,
+            lambda f: MemoryEmbeddingArchive.doc_id.in_(
+                select(MemoryDocumentArchive.doc_id).where(MemoryDocumentArchive.family_id == f)
+            ),
+            key=None,
+        ),
+    ]
+
+
+def _encode(column_type: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(column_type, Vector):
+        return base64.b64encode(np.asarray(value, dtype="<f4").tobytes()).decode("ascii")
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _decode(column_type: Any, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(column_type, Vector):
+        return np.frombuffer(base64.b64decode(value), dtype="<f4").astype(np.float32)
+    if isinstance(column_type, SqlEnum) and column_type.enum_class is not None:
+        return column_type.enum_class(value)
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value)
+    if isinstance(column_type, Uuid):
+        return uuid.UUID(value)
+    return value
+
+
+def _line(payload: dict[str, Any]) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False) + "\n"
+
+
+def export_family(bind: Engine, family_id: int, *, batch_size: int = 1000) -> Iterator[str]:
+    """
+    Yield the family as NDJSON text chunks.
+
+    Each table is read through a server-side cursor (`yield_per`), so memory stays flat regardless of
+    family size; on Postgres all tables come from one REPEATABLE READ snapshot.
+    """
+    counts: dict[str, int] = {}
+    options: dict[str, Any] = {"stream_results": True, "yield_per": batch_size}
+    if bind.dialect.name == "postgresql":
+        options["isolation_level"] = "REPEATABLE READ"
+    with bind.connect() as conn:
+        conn = conn.execution_options(**options)
+        yield _line(
+            {
+                "kind": "header",
+                "format": FORMAT,
+                "version": VERSION,
+                "family_id": family_id,
+                "exported_at": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+        for spec in _specs():
+            columns = list(spec.table.columns)
+            order = [column for column in spec.table.primary_key.columns]
+            result = conn.execute(select(*columns).where(spec.scope(family_id)).order_by(*order))
+            count = 0
+            for partition in result.partitions():
+                buffer = io.StringIO()
+                for row in partition:
+                    record = {column.name: _encode(column.type, value) for column, value in zip(columns, row)}
+                    buffer.write(_line({"kind": "row", "table": spec.table.name, "row": record}))
+                count += len(partition)
+                yield buffer.getvalue()
+            counts[spec.table.name] = count
+        yield _line({"kind": "end", "counts": counts})
+
+
+class _IdAllocator:
+    """New integer keys from the target database: sequence blocks on Postgres, max(id) + n elsewhere."""
+
+    def __init__(self, conn: Connection, block: int = 500) -> None:
+        self.conn = conn
+        self.block = block
+        self.maps: dict[str, dict[int, int]] = {}
+        self._pools: dict[str, list[int]] = {}
+        self._next: dict[str, int] = {}
+
+    def _allocate(self, table: str) -> int:
+        if self.conn.dialect.name == "postgresql":
+            pool = self._pools.setdefault(table, [])
+            if not pool:
+                pool.extend(
+                    self.conn.execute(
+                        text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :n)"),
+                        {"table": table, "n": self.block},
+                    ).scalars()
+                )
+                pool.reverse()
+            return int(pool.pop())
+        if table not in self._next:
+            current = self.conn.execute(text(f"SELECT MAX(id) FROM {table}")).scalar()
+            self._next[table] = int(current or 0)
+        self._next[table] += 1
+        return self._next[table]
+
+    def map(self, table: str, old: int | None) -> int | None:
+        """New key for `old`, allocated on first sight so forward references (dependencies) resolve too."""
+        if old is None:
+            return None
+        mapping = self.maps.setdefault(table, {})
+        if old not in mapping:
+            mapping[old] = self._allocate(table)
+        return mapping[old]
+
+
+def _copy_text(column_type: Any, value: Any, enum_db_values: dict[Any, str] | None) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(column_type, Vector):
+        literal = "[" + ",".join(repr(float(item)) for item in value) + "]"
+    elif enum_db_values is not None:
+        literal = enum_db_values[value]
+    elif isinstance(column_type, Boolean):
+        literal = "t" if value else "f"
+    elif isinstance(column_type, JSON):
+        literal = json.dumps(value, ensure_ascii=False)
+    elif isinstance(value, (datetime, date)):
+        literal = value.isoformat()
+    else:
+        literal = str(value)
+    return literal.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class FamilyImporter:
+    """
+    Streaming import: `feed()` NDJSON lines as they arrive, then `finish()`. Rows are buffered per table
+    and written in batches (COPY on Postgres, executemany elsewhere) inside one transaction, so a failed
+    or truncated upload leaves nothing behind.
+    """
+
+    def __init__(self, bind: Engine, *, batch_size: int = 1000) -> None:
+        self.batch_size = batch_size
+        self.specs = {spec.table.name: spec for spec in _specs()}
+        self.conn = bind.connect()
+        self.tx = self.conn.begin()
+        self.ids = _IdAllocator(self.conn)
+        self.family_id: int | None = None
+        self.counts: dict[str, int] = {}
+        self._header = False
+        self._end: dict[str, int] | None = None
+        self._table: str | None = None
+        self._rows: list[dict[str, Any]] = []
+
+    def feed(self, lines: Iterable[str | bytes]) -> None:
+        for raw in lines:
+            line = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise FamilyImportError(f"invalid JSON line: {exc}") from exc
+            self._record(record)
+
+    def _record(self, record: dict[str, Any]) -> None:
+        kind = record.get("kind")
+        if not self._header:
+            if kind != "header" or record.get("format") != FORMAT or record.get("version") != VERSION:
+                raise FamilyImportError(f"expected a {FORMAT} v{VERSION} header")
+            self._header = True
+            return
+        if self._end is not None:
+            raise FamilyImportError("data after end record")
+        if kind == "end":
+            self._flush()
+            self._end = {str(name): int(count) for name, count in (record.get("counts") or {}).items()}
+            return
+        if kind != "row" or record.get("table") not in self.specs:
+            raise FamilyImportError(f"unexpected record: kind={kind!r} table={record.get('table')!r}")
+        if record["table"] != self._table:
+            self._flush()
+            self._table = record["table"]
+        self._rows.append(self._remap(self.specs[record["table"]], record.get("row") or {}))
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _remap(self, spec: _Spec, row: dict[str, Any]) -> dict[str, Any]:
+        name = spec.table.name
+        values = {column.name: _decode(column.type, row.get(column.name)) for column in spec.table.columns}
+        if spec.key is not None:
+            values[spec.key] = self.ids.map(name, values[spec.key])
+            if name == "families":
+                if self.family_id is not None:
+                    raise FamilyImportError("stream contains more than one family")
+                self.family_id = values[spec.key]
+        for column, target in spec.refs.items():
+            values[column] = self.ids.map(target, values[column])
+        for column, target in spec.list_refs.items():
+            values[column] = [self.ids.map(target, int(item)) for item in values[column] or []]
+        if "entity_type" in values and values.get("entity_id") is not None and values["entity_type"] in _ENTITY_TABLES:
+            values["entity_id"] = self.ids.map(_ENTITY_TABLES[values["entity_type"]], values["entity_id"])
+        return values
+
+    def _flush(self) -> None:
+        if not self._rows or self._table is None:
+            return
+        table = self.specs[self._table].table
+        if self.family_id is None:
+            raise FamilyImportError("rows before the families record")
+        if self.conn.dialect.name == "postgresql":
+            self._copy(table, self._rows)
+        else:
+            self.conn.execute(insert(table), self._rows)
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(self._rows)
+        self._rows = []
+
+    def _copy(self, table: Table, rows: list[dict[str, Any]]) -> None:
+        columns = list(table.columns)
+        enum_values = {
+            column.name: dict(zip(list(column.type.enum_class), column.type.enums))
+            for column in columns
+            if isinstance(column.type, SqlEnum) and column.type.enum_class is not None
+        }
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write(
+                "\t".join(_copy_text(column.type, row[column.name], enum_values.get(column.name)) for column in columns)
+            )
+            buffer.write("\n")
+        buffer.seek(0)
+        names = ", ".join(f'"{column.name}"' for column in columns)
+        cursor = self.conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(f'COPY "{table.name}" ({names}) FROM STDIN', buffer)
+        finally:
+            cursor.close()
+
+    def finish(self) -> dict[str, Any]:
+        try:
+            self._flush()
+            if self._end is None:
+                raise FamilyImportError("stream ended without an end record (truncated upload?)")
+            expected = {name: count for name, count in self._end.items() if count}
+            if expected != self.counts:
+                raise FamilyImportError(f"row counts do not match the end record: expected {expected}, got {self.counts}")
+            self.tx.commit()
+        except Exception:
+            self.abort()
+            raise
+        self.conn.close()
+        return {"family_id": self.family_id, "counts": self.counts}
+
+    def abort(self) -> None:
+        if self.tx.is_active:
+            self.tx.rollback()
+        self.conn.close()
+
@@ -1,14 +1,59 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import uuid
-from typing import Any
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Iterator
 
-from sqlalchemy import text
+import numpy as np
+from sqlalchemy import Engine, delete, func, select, text
 from sqlalchemy.orm import Session
 
-from agents.common.memory.text import chunk_text
-from app.models.memory import MemoryDocument, MemoryEmbedding
-from app.services.embeddings import embed_texts
+from app.core.config import settings
+from app.core.db import defer_until_batch_commit
+from app.models.memory import MemoryDocument, MemoryDocumentArchive, MemoryEmbedding
+from app.services.chunking import iter_chunks, iter_embedded_chunks
+from app.services.embeddings import vector_param
+from app.services.rerank import collapse_by_document, mmr_order
+from app.services.search_cache import bump_generation, cached_results, embed_query
+from app.services.vector_store import local_store, uses_pgvector
+
+
+def content_hash(type: str, text_value: str) -> str:
+    # Mirrored in SQL by migration 0011 for the backfill; keep the two in sync.
+    return hashlib.sha256(f"{type}\n{text_value}".encode("utf-8")).hexdigest()
+
+
+def _find_duplicate(
+    db: Session,
+    *,
+    family_id: int,
+    type: str,
+    digest: str,
+    entity_type: str | None,
+    entity_id: int | None,
+) -> MemoryDocument | None:
+    if entity_type is not None and entity_id is not None:
+        # Only the entity's current document counts: A -> B -> A must record A again.
+        latest = db.execute(
+            select(MemoryDocument)
+            .where(
+                MemoryDocument.family_id == family_id,
+                MemoryDocument.type == type,
+                MemoryDocument.entity_type == entity_type,
+                MemoryDocument.entity_id == entity_id,
+            )
+            .order_by(MemoryDocument.created_at.desc(), MemoryDocument.doc_id.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+        return latest if latest is not None and latest.content_hash == digest else None
+    return db.execute(
+        select(MemoryDocument)
+        .where(MemoryDocument.family_id == family_id, MemoryDocument.content_hash == digest)
+        .limit(1)
+    ).scalar_one_or_none()
 
 
 def create_document_with_embeddings(
@@ -18,24 +63,42 @@ def create_document_with_embeddings(
     type: str,
     text_value: str,
     source_refs: list[dict[str, Any]] | None = None,
+    entity_type: str | None = None,
+    entity_id: int | None = None,
     embed_dim: int = 1536,
 ) -> MemoryDocument:
+    """
+    Store a memory document and its chunk embeddings.
+
+    Identical content (same type and text) already stored for the family is returned as-is instead of
+    being embedded again. For entity-scoped documents only the entity's latest document is compared.
+    """
+    digest = content_hash(type, text_value)
+    duplicate = _find_duplicate(
+        db, family_id=family_id, type=type, digest=digest, entity_type=entity_type, entity_id=entity_id
+    )
+    if duplicate is not None:
+        return duplicate
+
     doc = MemoryDocument(
         family_id=family_id,
         type=type,
         text=text_value,
         source_refs_jsonb=source_refs or [],
+        content_hash=digest,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        # Set here rather than by the server default so documents written in one transaction still order.
+        created_at=datetime.now(timezone.utc),
     )
     db.add(doc)
     db.flush()
 
-    # SQLite test harness: store documents but skip vector embeddings.
-    if db.bind is not None and db.bind.dialect.name != "postgresql":
+    if not uses_pgvector(db):
+        _index_locally(db, doc, embed_dim=embed_dim)
         return doc
 
-    chunks = chunk_text(text_value)
-    vectors = embed_texts(chunks, dim=embed_dim)
-    for idx, (chunk, vec) in enumerate(zip(chunks, vectors, strict=True)):
+    for idx, chunk, vec in iter_embedded_chunks(iter_chunks(text_value), dim=embed_dim):
         db.add(
             MemoryEmbedding(
                 doc_id=doc.doc_id,
@@ -44,6 +107,9 @@ def create_document_with_embeddings(
                 metadata_jsonb={"text": chunk, "type": type},
             )
         )
+        # Flushed rows are only weakly held by the session, so large documents don't accumulate in memory.
+        if (idx + 1) % settings.chunk_embed_batch_size == 0:
+            db.flush()
     return doc
 
 
@@ -53,42 +119,327 @@ def semantic_search(
     family_id: int,
     query: str,
     top_k: int = 8,
+    types: list[str] | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    source_ref: dict[str, Any] | None = None,
+    diversity: str = "collapse",
+    mmr_lambda: float = 0.5,
+    include_archive: bool = False,
     embed_dim: int = 1536,
 ) -> list[dict[str, Any]]:
-    if db.bind is not None and db.bind.dialect.name != "postgresql":
-        # SQLite fallback: simple substring match against stored docs.
-        rows = db.query(MemoryDocument).filter(MemoryDocument.family_id == family_id).all()
-        hits = []
-        for doc in rows:
-            if query.lower() in (doc.text or "").lower():
-                hits.append({"doc_id": str(doc.doc_id), "chunk_id": 0, "score": 0.1, "text": doc.text[:500], "metadata": {"type": doc.type}})
-        return hits[:top_k]
-
-    qvec = embed_texts([query], dim=embed_dim)[0]
-    # pgvector accepts input like '[1,2,3]'::vector
-    vec_literal = "[" + ",".join(f"{x:.6f}" for x in qvec) + "]"
-    sql = text(
-        """
-        SELECT e.doc_id::text as doc_id,
-               e.chunk_id as chunk_id,
-               1.0 / (1.0 + (e.embedding <-> (:qvec)::vector)) as score,
-               COALESCE(e.metadata_jsonb->>'text', '') as chunk_text,
-               COALESCE(e.metadata_jsonb, '{}'::jsonb) as metadata
-        FROM memory_embeddings e
-        JOIN memory_documents d ON d.doc_id = e.doc_id
-        WHERE d.family_id = :family_id
-        ORDER BY e.embedding <-> (:qvec)::vector
-        LIMIT :top_k
-        """
+    """
+    Nearest memory chunks for the family, optionally filtered by document type, `created_at` range
+    (`created_to` exclusive) and a `source_refs` entry containing `source_ref`.
+
+    `diversity` reranks an over-fetched candidate set: "collapse" keeps the best chunk per document,
+    "mmr" applies maximal marginal relevance, "none" returns raw nearest chunks. Only the hot tables are
+    searched unless `include_archive` is set.
+    """
+    filters = {
+        "types": sorted(types or []),
+        "created_from": created_from,
+        "created_to": created_to,
+        "source_ref": source_ref,
+        "diversity": diversity,
+        "mmr_lambda": mmr_lambda,
+        "include_archive": include_archive,
+    }
+    return cached_results(
+        "memory",
+        family_id,
+        query=query,
+        filters=filters,
+        top_k=top_k,
+        compute=lambda: _search(db, family_id=family_id, query=query, top_k=top_k, embed_dim=embed_dim, **filters),
+        db=db,
+    )
+
+
+def _search(
+    db: Session,
+    *,
+    family_id: int,
+    query: str,
+    top_k: int,
+    types: list[str],
+    created_from: datetime | None,
+    created_to: datetime | None,
+    source_ref: dict[str, Any] | None,
+    diversity: str,
+    mmr_lambda: float,
+    include_archive: bool,
+    embed_dim: int,
+) -> list[dict[str, Any]]:
+    qvec = embed_query(query, dim=embed_dim)
+    limit = top_k if diversity == "none" else max(top_k, top_k * settings.memory_search_candidate_multiplier)
+    fetch = _candidates_sql if uses_pgvector(db) else _candidates_local
+    candidates = fetch(
+        db,
+        family_id=family_id,
+        qvec=qvec,
+        limit=limit,
+        types=types,
+        created_from=created_from,
+        created_to=created_to,
+        source_ref=source_ref,
+        include_archive=include_archive,
+        with_vectors=diversity == "mmr",
+        embed_dim=embed_dim,
     )
-    rows = db.execute(sql, {"qvec": vec_literal, "family_id": family_id, "top_k": top_k}).mappings().all()
+    if diversity == "mmr" and candidates:
+        vectors = np.asarray([item.pop("vector") for item in candidates], dtype=np.float32)
+        candidates = [candidates[index] for index in mmr_order(qvec, vectors, top_k, lambda_=mmr_lambda)]
+    elif diversity == "collapse":
+        candidates = collapse_by_document(candidates, top_k)
+    return [
+        {
+            "doc_id": item["doc_id"],
+            "chunk_id": item["chunk_id"],
+            "score": 1.0 / (1.0 + item["distance"]),
+            "text": item["text"],
+            "metadata": item["metadata"],
+        }
+        for item in candidates[:top_k]
+    ]
+
+
+# pgvector version per database URL. hnsw.iterative_scan exists from 0.8; older versions reserve the
+# `hnsw.` prefix, so setting it raises "invalid configuration parameter" and aborts the transaction.
+_iterative_scan_support: dict[str, bool] = {}
+
+
+def _supports_iterative_scan(db: Session) -> bool:
+    url = str(db.get_bind().engine.url)
+    supported = _iterative_scan_support.get(url)
+    if supported is None:
+        version = db.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+        parts = tuple(int(part) for part in (version or "0").split(".")[:2] if part.isdigit())
+        supported = _iterative_scan_support[url] = parts >= (0, 8)
+    return supported
+
+
+_NEAREST_IN = """
+    SELECT e.doc_id::text as doc_id,
+           e.chunk_id as chunk_id,
+           e.embedding <-> CAST(:qvec AS real[])::vector as distance,
+           {vector_column}
+           COALESCE(e.metadata_jsonb->>'text', '') as chunk_text,
+           COALESCE(e.metadata_jsonb, '{{}}'::jsonb) as metadata
+    FROM {embeddings} e
+    JOIN {documents} d ON d.doc_id = e.doc_id
+    WHERE {where}
+    ORDER BY distance
+    LIMIT :limit
+"""
+
+
+def _candidates_sql(
+    db: Session,
+    *,
+    family_id: int,
+    qvec: np.ndarray,
+    limit: int,
+    types: list[str],
+    created_from: datetime | None,
+    created_to: datetime | None,
+    source_ref: dict[str, Any] | None,
+    include_archive: bool,
+    with_vectors: bool,
+    embed_dim: int,
+) -> list[dict[str, Any]]:
+    clauses = ["d.family_id = :family_id"]
+    params: dict[str, Any] = {"qvec": vector_param(qvec), "family_id": family_id, "limit": limit}
+    if types:
+        clauses.append("d.type = ANY(:types)")
+        params["types"] = types
+    if created_from is not None:
+        clauses.append("d.created_at >= :created_from")
+        params["created_from"] = created_from
+    if created_to is not None:
+        clauses.append("d.created_at < :created_to")
+        params["created_to"] = created_to
+    if source_ref:
+        clauses.append("d.source_refs_jsonb @> CAST(:source_refs AS jsonb)")
+        params["source_refs"] = json.dumps([source_ref])
+
+    # Each tier is searched on its own (so each can use its own HNSW index) and the candidates merged.
+    # The index returns at most ef_search rows before filtering; iterative scans keep going until
+    # enough rows pass the filters (the outer ORDER BY restores exact order).
+    db.execute(text(f"SET LOCAL hnsw.ef_search = {max(40, min(limit, 1000))}"))
+    if settings.memory_search_iterative_scan and _supports_iterative_scan(db):
+        db.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+    fields = {"vector_column": "e.embedding::real[] as vector," if with_vectors else "", "where": " AND ".join(clauses)}
+    branches = [_NEAREST_IN.format(embeddings="memory_embeddings", documents="memory_documents", **fields)]
+    if include_archive:
+        branches.append(
+            _NEAREST_IN.format(embeddings="memory_embeddings_archive", documents="memory_documents_archive", **fields)
+        )
+    union = " UNION ALL ".join(f"({branch})" for branch in branches)
+    rows = db.execute(text(f"SELECT * FROM ({union}) AS nearest ORDER BY distance LIMIT :limit"), params).mappings().all()
     return [
         {
             "doc_id": row["doc_id"],
             "chunk_id": int(row["chunk_id"]),
-            "score": float(row["score"]),
+            "distance": float(row["distance"]),
             "text": row["chunk_text"],
             "metadata": dict(row["metadata"] or {}),
+            **({"vector": row["vector"]} if with_vectors else {}),
         }
         for row in rows
     ]
+
+
+def _matches_source_ref(refs: list[dict] | None, source_ref: dict[str, Any]) -> bool:
+    return any(all(ref.get(key) == value for key, value in source_ref.items()) for ref in refs or [])
+
+
+def _index_locally(db: Session, doc: MemoryDocument | MemoryDocumentArchive, *, embed_dim: int) -> None:
+    # Inside a batch the store is written only once the batch commits, so it never holds rolled-back documents.
+    family_id, doc_id = doc.family_id, str(doc.doc_id)
+    items = [(idx, vec, chunk) for idx, chunk, vec in iter_embedded_chunks(iter_chunks(doc.text or ""), dim=embed_dim)]
+    defer_until_batch_commit(db, lambda: local_store().replace("memory", family_id, doc_id, items))
+
+
+def _candidates_local(
+    db: Session,
+    *,
+    family_id: int,
+    qvec: np.ndarray,
+    limit: int,
+    types: list[str],
+    created_from: datetime | None,
+    created_to: datetime | None,
+    source_ref: dict[str, Any] | None,
+    include_archive: bool,
+    with_vectors: bool,
+    embed_dim: int,
+) -> list[dict[str, Any]]:
+    """
+    Local vector store path (SQLite/dev, or VECTOR_STORE=local): filters run in the database, the nearest
+    chunks of the matching documents come from the store. Documents the store has not seen yet (written
+    before it was enabled) are embedded and indexed on first use.
+    """
+    store = local_store()
+    docs: dict[str, MemoryDocument | MemoryDocumentArchive] = {}
+    for model in [MemoryDocument, MemoryDocumentArchive] if include_archive else [MemoryDocument]:
+        stmt = select(model).where(model.family_id == family_id)
+        if types:
+            stmt = stmt.where(model.type.in_(types))
+        if created_from is not None:
+            stmt = stmt.where(model.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(model.created_at < created_to)
+        for doc in db.execute(stmt).scalars():
+            if source_ref and not _matches_source_ref(doc.source_refs_jsonb, source_ref):
+                continue
+            docs[str(doc.doc_id)] = doc
+    if not docs:
+        return []
+    for doc_id, doc in docs.items():
+        if not store.has("memory", family_id, doc_id):
+            _index_locally(db, doc, embed_dim=embed_dim)
+    neighbors = store.search("memory", family_id, qvec, limit=limit, doc_ids=set(docs), with_vectors=with_vectors)
+    return [
+        {
+            "doc_id": item.doc_id,
+            "chunk_id": item.chunk_id,
+            "distance": item.distance,
+            "text": item.text,
+            "metadata": {"text": item.text, "type": docs[item.doc_id].type},
+            **({"vector": item.vector} if with_vectors else {}),
+        }
+        for item in neighbors
+    ]
+
+
+# Rough on-disk size of one memory_embeddings vector (float32 x 1536 + varlena header).
+_VECTOR_BYTES = 4 * 1536 + 8
+
+
+def _superseded_doc_ids(family_id: int | None):
+    """
+    Documents that compaction removes:
+
+    - entity-scoped docs older than the latest one per (family, type, entity) -- e.g. every
+      "Decision updated" before the current one;
+    - exact duplicates (same family, type and content hash) of an older unscoped doc.
+    """
+    entity_rank = func.row_number().over(
+        partition_by=(MemoryDocument.family_id, MemoryDocument.type, MemoryDocument.entity_type, MemoryDocument.entity_id),
+        order_by=(MemoryDocument.created_at.desc(), MemoryDocument.doc_id.desc()),
+    )
+    hash_rank = func.row_number().over(
+        partition_by=(MemoryDocument.family_id, MemoryDocument.type, MemoryDocument.content_hash),
+        order_by=(MemoryDocument.created_at.asc(), MemoryDocument.doc_id.asc()),
+    )
+    scoped = select(MemoryDocument.doc_id, entity_rank.label("position")).where(
+        MemoryDocument.entity_type.is_not(None), MemoryDocument.entity_id.is_not(None)
+    )
+    unscoped = select(MemoryDocument.doc_id, hash_rank.label("position")).where(
+        MemoryDocument.entity_id.is_(None), MemoryDocument.content_hash.is_not(None)
+    )
+    if family_id is not None:
+        scoped = scoped.where(MemoryDocument.family_id == family_id)
+        unscoped = unscoped.where(MemoryDocument.family_id == family_id)
+    ranked = scoped.union_all(unscoped).subquery()
+    return select(ranked.c.doc_id).where(ranked.c.position > 1)
+
+
+def _superseded_batches(db: Session, family_id: int | None, batch_size: int) -> Iterator[list[Any]]:
+    """
+    Superseded doc ids in lists of `batch_size`, ranked once per run: the window functions cover the whole
+    table (or family), so they must not be re-evaluated for every batch.
+
+    The ids stream from a server-side cursor on a connection of their own, which the caller's per-batch
+    commits do not close. A batch session is bound to one connection; there the ids are read up front.
+    """
+    stmt = _superseded_doc_ids(family_id)
+    bind = db.get_bind()
+    if not isinstance(bind, Engine):
+        ids = list(db.execute(stmt).scalars())
+        for start in range(0, len(ids), batch_size):
+            yield ids[start : start + batch_size]
+        return
+    with bind.connect() as reader:
+        result = reader.execution_options(stream_results=True, yield_per=batch_size).execute(stmt)
+        for partition in result.scalars().partitions():
+            yield list(partition)
+
+
+def _forget_compacted(touched: dict[int, list[str]], *, local: bool) -> None:
+    for touched_family_id, removed in touched.items():
+        if local:
+            local_store().discard("memory", touched_family_id, removed)
+        bump_generation("memory", touched_family_id)
+
+
+def compact_memory_documents(db: Session, *, family_id: int | None = None, batch_size: int = 500) -> dict[str, Any]:
+    """
+    Delete superseded memory documents (and their embeddings) in committed batches.
+
+    Returns what was removed and an estimate of the bytes freed; Postgres returns the space to the
+    table once (auto)vacuum has run.
+    """
+    report = {"documents_removed": 0, "embeddings_removed": 0, "estimated_bytes_reclaimed": 0, "families": []}
+    families: set[int] = set()
+    for doc_ids in _superseded_batches(db, family_id, batch_size):
+        text_bytes, touched = 0, {}
+        for doc_id, doc_family_id, length in db.execute(
+            select(MemoryDocument.doc_id, MemoryDocument.family_id, func.length(MemoryDocument.text)).where(
+                MemoryDocument.doc_id.in_(doc_ids)
+            )
+        ).all():
+            touched.setdefault(int(doc_family_id), []).append(str(doc_id))
+            text_bytes += int(length or 0)
+        embeddings = db.execute(delete(MemoryEmbedding).where(MemoryEmbedding.doc_id.in_(doc_ids))).rowcount or 0
+        db.execute(delete(MemoryDocument).where(MemoryDocument.doc_id.in_(doc_ids)))
+        db.commit()
+        # Bulk deletes bypass the session's search-cache invalidation hooks.
+        defer_until_batch_commit(db, partial(_forget_compacted, touched, local=not uses_pgvector(db)))
+        families.update(touched)
+        report["documents_removed"] += len(doc_ids)
+        report["embeddings_removed"] += embeddings
+        report["estimated_bytes_reclaimed"] += text_bytes + embeddings * _VECTOR_BYTES
+    report["families"] = sorted(families)
+    return report
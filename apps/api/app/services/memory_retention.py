@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import defer_until_batch_commit
+from app.models.memory import MemoryDocument, MemoryDocumentArchive, MemoryEmbedding, MemoryEmbeddingArchive
+from app.services.search_cache import bump_generation
+from app.services.vector_store import local_store, uses_pgvector
+
+
+_DOCUMENT_COLUMNS = (
+    "doc_id",
+    "family_id",
+    "type",
+    "text",
+    "source_refs_jsonb",
+    "content_hash",
+    "entity_type",
+    "entity_id",
+    "created_at",
+)
+_EMBEDDING_COLUMNS = ("doc_id", "chunk_id", "embedding", "metadata_jsonb", "created_at")
+
+
+def _discard_local(docs: list[tuple[int, str]]) -> None:
+    for family_id, doc_id in docs:
+        local_store().discard("memory", family_id, [doc_id])
+
+
+def _archive_batch(db: Session, doc_ids: list[Any]) -> int:
+    """Copy documents (and their embeddings) into the archive tables and delete them from the hot ones."""
+    db.execute(
+        insert(MemoryDocumentArchive).from_select(
+            list(_DOCUMENT_COLUMNS),
+            select(*(getattr(MemoryDocument, name) for name in _DOCUMENT_COLUMNS)).where(MemoryDocument.doc_id.in_(doc_ids)),
+        )
+    )
+    embeddings = db.execute(
+        insert(MemoryEmbeddingArchive).from_select(
+            list(_EMBEDDING_COLUMNS),
+            select(*(getattr(MemoryEmbedding, name) for name in _EMBEDDING_COLUMNS)).where(MemoryEmbedding.doc_id.in_(doc_ids)),
+        )
+    ).rowcount
+    db.execute(delete(MemoryEmbedding).where(MemoryEmbedding.doc_id.in_(doc_ids)))
+    db.execute(delete(MemoryDocument).where(MemoryDocument.doc_id.in_(doc_ids)))
+    return embeddings or 0
+
+
+def apply_memory_retention(
+    db: Session,
+    *,
+    now: datetime | None = None,
+    batch_size: int | None = None,
+) -> dict[str, Any]:
+    """
+    Move memory documents past their type's hot retention (MEMORY_HOT_RETENTION_DAYS) into the archive
+    tier, then drop archived documents older than MEMORY_ARCHIVE_RETENTION_DAYS (when set).
+
+    Works in committed batches so a large backlog never holds long locks on the hot tables.
+    """
+    now = now or datetime.now(timezone.utc)
+    size = max(1, batch_size or settings.memory_retention_batch_size)
+    report: dict[str, Any] = {"archived": {}, "archived_embeddings": 0, "expired": 0}
+    families: set[int] = set()
+
+    for doc_type, days in sorted(settings.memory_hot_retention_days.items()):
+        cutoff = now - timedelta(days=days)
+        archived = 0
+        while True:
+            rows = db.execute(
+                select(MemoryDocument.doc_id, MemoryDocument.family_id)
+                .where(MemoryDocument.type == doc_type, MemoryDocument.created_at < cutoff)
+                .order_by(MemoryDocument.created_at.asc())
+                .limit(size)
+            ).all()
+            if not rows:
+                break
+            report["archived_embeddings"] += _archive_batch(db, [row[0] for row in rows])
+            db.commit()
+            families.update(int(row[1]) for row in rows)
+            archived += len(rows)
+        if archived:
+            report["archived"][doc_type] = archived
+
+    if settings.memory_archive_retention_days > 0:
+        cutoff = now - timedelta(days=settings.memory_archive_retention_days)
+        while True:
+            rows = db.execute(
+                select(MemoryDocumentArchive.doc_id, MemoryDocumentArchive.family_id)
+                .where(MemoryDocumentArchive.created_at < cutoff)
+                .limit(size)
+            ).all()
+            if not rows:
+                break
+            doc_ids = [row[0] for row in rows]
+            db.execute(delete(MemoryEmbeddingArchive).where(MemoryEmbeddingArchive.doc_id.in_(doc_ids)))
+            db.execute(delete(MemoryDocumentArchive).where(MemoryDocumentArchive.doc_id.in_(doc_ids)))
+            db.commit()
+            if not uses_pgvector(db):
+                defer_until_batch_commit(db, partial(_discard_local, [(int(fam), str(doc)) for doc, fam in rows]))
+            families.update(int(row[1]) for row in rows)
+            report["expired"] += len(rows)
+
+    # Bulk statements bypass the session's search-cache invalidation hooks.
+    for family_id in families:
+        defer_until_batch_commit(db, partial(bump_generation, "memory", family_id))
+    report["families"] = sorted(families)
+    return report
@@ -4,13 +4,18 @@ from datetime import date, datetime, timezone
 import re
 from typing import Any
 
+import numpy as np
 from sqlalchemy import delete, select, text
 from sqlalchemy.orm import Session
 
-from agents.common.memory.text import chunk_text
+from app.core.config import settings
+from app.core.db import defer_until_batch_commit
 from app.models.notes import NoteDocument, NoteEmbedding
 from app.schemas.notes import NoteIndexRequest, NoteSearchMatch, NoteSearchRequest
-from app.services.embeddings import embed_texts
+from app.services.chunking import iter_chunks, iter_embedded_chunks
+from app.services.embeddings import vector_param
+from app.services.search_cache import cached_results, embed_query
+from app.services.vector_store import local_store, uses_pgvector
 
 
 def _normalize_text(value: str | None) -> str:
@@ -69,15 +74,25 @@ def _item_type_score(item_type: str) -> float:
     return 0.45
 
 
-def _build_embedding_input(payload: NoteIndexRequest) -> str:
+def _embedding_input_parts(payload: NoteIndexRequest | NoteDocument) -> list[str]:
+    # The body is passed through as-is (possibly megabytes): the chunker normalizes whitespace per unit
+    # and relies on its paragraph breaks.
+    tags = payload.tags if isinstance(payload, NoteIndexRequest) else (payload.tags_jsonb or [])
     parts = [
         _normalize_text(payload.title),
         _normalize_text(payload.summary),
         _normalize_text(payload.excerpt_text),
-        _normalize_text(payload.body_text),
-        " ".join(item.strip() for item in payload.tags if item.strip()),
+        payload.body_text or "",
+        " ".join(str(item).strip() for item in tags if str(item).strip()),
     ]
-    return "\n\n".join(part for part in parts if part).strip()
+    return [part for part in parts if part.strip()]
+
+
+def _index_locally(db: Session, doc: NoteDocument, parts: list[str], *, embed_dim: int) -> None:
+    # Inside a batch the store is written only once the batch commits, so it never holds rolled-back notes.
+    family_id, doc_id = doc.family_id, str(doc.doc_id)
+    items = [(idx, vec, chunk) for idx, chunk, vec in iter_embedded_chunks(iter_chunks(parts), dim=embed_dim)]
+    defer_until_batch_commit(db, lambda: local_store().replace("notes", family_id, doc_id, items))
 
 
 def upsert_note_document(
@@ -112,6 +127,9 @@ def upsert_note_document(
         db.add(existing)
         db.flush()
     else:
+        if existing.family_id != payload.family_id and not uses_pgvector(db):
+            family_id, doc_id = existing.family_id, str(existing.doc_id)
+            defer_until_batch_commit(db, lambda: local_store().discard("notes", family_id, [doc_id]))
         existing.family_id = payload.family_id
         existing.actor = payload.actor.strip().lower()
         existing.source_session_id = (payload.source_session_id or "").strip() or None
@@ -132,11 +150,11 @@ def upsert_note_document(
 
     db.execute(delete(NoteEmbedding).where(NoteEmbedding.doc_id == existing.doc_id))
 
-    combined_text = _build_embedding_input(payload)
-    if combined_text and db.bind is not None and db.bind.dialect.name == "postgresql":
-        chunks = chunk_text(combined_text)
-        vectors = embed_texts(chunks, dim=embed_dim)
-        for idx, (chunk, vec) in enumerate(zip(chunks, vectors, strict=True)):
+    parts = _embedding_input_parts(payload)
+    if not uses_pgvector(db):
+        _index_locally(db, existing, parts, embed_dim=embed_dim)
+    elif parts:
+        for idx, chunk, vec in iter_embedded_chunks(iter_chunks(parts), dim=embed_dim):
             db.add(
                 NoteEmbedding(
                     doc_id=existing.doc_id,
@@ -146,6 +164,8 @@ def upsert_note_document(
                     metadata_jsonb={"item_type": payload.item_type, "path": payload.path},
                 )
             )
+            if (idx + 1) % settings.chunk_embed_batch_size == 0:
+                db.flush()
     return existing
 
 
@@ -159,13 +179,13 @@ def _semantic_scores(
     date_to: date | None,
     top_k: int,
     embed_dim: int,
+    docs: list[NoteDocument],
 ) -> dict[str, float]:
-    if db.bind is None or db.bind.dialect.name != "postgresql":
-        return {}
-    vector = embed_texts([query], dim=embed_dim)[0]
-    vec_literal = "[" + ",".join(f"{value:.6f}" for value in vector) + "]"
+    vector = embed_query(query, dim=embed_dim)
+    if not uses_pgvector(db):
+        return _local_semantic_scores(db, family_id=family_id, vector=vector, docs=docs, top_k=top_k, embed_dim=embed_dim)
     clauses = ["d.family_id = :family_id"]
-    params: dict[str, Any] = {"family_id": family_id, "qvec": vec_literal, "limit": max(top_k * 4, 20)}
+    params: dict[str, Any] = {"family_id": family_id, "qvec": vector_param(vector), "limit": max(top_k * 4, 20)}
     if preferred_item_types:
         clauses.append("d.item_type = ANY(:item_types)")
         params["item_types"] = preferred_item_types
@@ -178,7 +198,7 @@ def _semantic_scores(
     sql = text(
         f"""
         SELECT d.path AS path,
-               MAX(1.0 / (1.0 + (e.embedding <-> (:qvec)::vector))) AS score
+               1.0 / (1.0 + MIN(e.embedding <-> CAST(:qvec AS real[])::vector)) AS score
         FROM note_embeddings e
         JOIN note_documents d ON d.doc_id = e.doc_id
         WHERE {' AND '.join(clauses)}
@@ -191,12 +211,53 @@ def _semantic_scores(
     return {str(row["path"]): float(row["score"]) for row in rows}
 
 
+def _local_semantic_scores(
+    db: Session,
+    *,
+    family_id: int,
+    vector: np.ndarray,
+    docs: list[NoteDocument],
+    top_k: int,
+    embed_dim: int,
+) -> dict[str, float]:
+    """Same scores as the pgvector query, from the local store; `docs` are the already-filtered candidates."""
+    store = local_store()
+    by_id = {str(doc.doc_id): doc for doc in docs}
+    for doc_id, doc in by_id.items():
+        if not store.has("notes", family_id, doc_id):
+            _index_locally(db, doc, _embedding_input_parts(doc), embed_dim=embed_dim)
+    scores: dict[str, float] = {}
+    limit = max(top_k * 4, 20)
+    # Chunk-level neighbors; over-fetch so enough distinct notes survive the per-path MIN(distance).
+    for item in store.search("notes", family_id, vector, limit=limit * 4, doc_ids=set(by_id)):
+        path = by_id[item.doc_id].path
+        if path not in scores:
+            scores[path] = 1.0 / (1.0 + item.distance)
+            if len(scores) >= limit:
+                break
+    return scores
+
+
 def search_notes(
     db: Session,
     *,
     payload: NoteSearchRequest,
     embed_dim: int = 1536,
 ) -> list[NoteSearchMatch]:
+    return cached_results(
+        "notes",
+        payload.family_id,
+        query=payload.query,
+        filters=payload.model_dump(mode="json", exclude={"family_id", "actor", "query", "top_k"}),
+        top_k=payload.top_k,
+        compute=lambda: _rank_notes(db, payload=payload, embed_dim=embed_dim),
+        dump=lambda matches: [item.model_dump(mode="json") for item in matches],
+        load=lambda items: [NoteSearchMatch.model_validate(item) for item in items],
+        db=db,
+    )
+
+
+def _rank_notes(db: Session, *, payload: NoteSearchRequest, embed_dim: int) -> list[NoteSearchMatch]:
     query = (
         select(NoteDocument)
         .where(NoteDocument.family_id == payload.family_id)
@@ -222,6 +283,7 @@ def search_notes(
         date_to=payload.date_to,
         top_k=payload.top_k,
         embed_dim=embed_dim,
+        docs=docs,
     )
     ranked: list[tuple[float, NoteDocument, list[str]]] = []
     query_tag_set = [tag.strip().lower() for tag in payload.query_tags if tag.strip()]
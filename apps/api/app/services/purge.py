@@ -1,65 +1,272 @@
 from __future__ import annotations
 
-from sqlalchemy import delete, select
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Any, Callable
+
+from fastapi import HTTPException
+from sqlalchemy import Table, delete, or_, select, tuple_, update
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
 
+from app.core.config import settings
+from app.core.db import defer_until_batch_commit
+from app.models.agent_sessions import AgentSessionState
 from app.models.entities import (
+    AuditLog,
     BudgetPolicy,
     Decision,
     DecisionQueueItem,
     DecisionScore,
+    DecisionSuggestion,
     DiscretionaryBudgetLedger,
     Family,
     FamilyMember,
     Goal,
     MemberBudgetSetting,
     Period,
+    RoadmapDependency,
     RoadmapItem,
 )
+from app.models.family_dna import FamilyDnaCheckpoint, FamilyDnaEvent, FamilyDnaPatchProposal, FamilyDnaSnapshot
+from app.models.memory import MemoryDocument, MemoryDocumentArchive, MemoryEmbedding, MemoryEmbeddingArchive
+from app.models.notes import NoteDocument, NoteEmbedding
+from app.models.purge_jobs import FamilyPurgeJob
+from app.services.search_cache import bump_generation
+from app.services.vector_store import local_store
+
+
+_UNFINISHED = ("queued", "running", "failed")
+
+
+@dataclass(frozen=True)
+class _Step:
+    name: str
+    table: Table
+    # Rows of `table` belonging to the family; parent ids come from subqueries, never from Python lists.
+    scope: Callable[[int], ColumnElement[bool]]
+    # Audit rows are kept and only detached from the members being deleted.
+    nullify: str | None = None
+
+
+def _members(family_id: int):
+    return select(FamilyMember.id).where(FamilyMember.family_id == family_id)
+
+
+def _decisions(family_id: int):
+    return select(Decision.id).where(Decision.family_id == family_id)
+
+
+# Children before parents, so each step only deletes rows nothing else still references.
+_STEPS: tuple[_Step, ...] = (
+    _Step(
+        "audit_logs",
+        AuditLog.__table__,
+        lambda f: AuditLog.actor_member_id.in_(_members(f)),
+        nullify="actor_member_id",
+    ),
+    _Step(
+        "note_embeddings",
+        NoteEmbedding.__table__,
+        lambda f: NoteEmbedding.doc_id.in_(select(NoteDocument.doc_id).where(NoteDocument.family_id == f)),
+    ),
+    _Step("note_documents", NoteDocument.__table__, lambda f: NoteDocument.family_id == f),
+    _Step(
+        "memory_embeddings",
+        MemoryEmbedding.__table__,
+        lambda f: MemoryEmbedding.doc_id.in_(select(MemoryDocument.doc_id).where(MemoryDocument.family_id == f)),
+    ),
+    _Step("memory_documents", MemoryDocument.__table__, lambda f: MemoryDocument.family_id == f),
+    _Step(
+        "memory_embeddings_archive",
+        MemoryEmbeddingArchive.__table__,
+        lambda f: MemoryEmbeddingArchive.doc_id.in_(
+            select(MemoryDocumentArchive.doc_id).where(MemoryDocumentArchive.family_id == f)
+        ),
+    ),
+    _Step("memory_documents_archive", MemoryDocumentArchive.__table__, lambda f: MemoryDocumentArchive.family_id == f),
+    _Step("family_dna_events", FamilyDnaEvent.__table__, lambda f: FamilyDnaEvent.family_id == f),
+    _Step("family_dna_checkpoints", FamilyDnaCheckpoint.__table__, lambda f: FamilyDnaCheckpoint.family_id == f),
+    _Step("family_dna_patch_proposals", FamilyDnaPatchProposal.__table__, lambda f: FamilyDnaPatchProposal.family_id == f),
+    _Step("family_dna_snapshot", FamilyDnaSnapshot.__table__, lambda f: FamilyDnaSnapshot.family_id == f),
+    _Step("agent_session_states", AgentSessionState.__table__, lambda f: AgentSessionState.family_id == f),
+    _Step("roadmap_dependencies", RoadmapDependency.__table__, lambda f: RoadmapDependency.family_id == f),
+    _Step(
+        "decision_scores",
+        DecisionScore.__table__,
+        lambda f: or_(
+            DecisionScore.decision_id.in_(_decisions(f)),
+            DecisionScore.goal_id.in_(select(Goal.id).where(Goal.family_id == f)),
+        ),
+    ),
+    _Step("decision_suggestions", DecisionSuggestion.__table__, lambda f: DecisionSuggestion.decision_id.in_(_decisions(f))),
+    _Step("decision_queue_items", DecisionQueueItem.__table__, lambda f: DecisionQueueItem.decision_id.in_(_decisions(f))),
+    _Step("roadmap_items", RoadmapItem.__table__, lambda f: RoadmapItem.decision_id.in_(_decisions(f))),
+    _Step(
+        "discretionary_budget_ledger",
+        DiscretionaryBudgetLedger.__table__,
+        lambda f: or_(
+            DiscretionaryBudgetLedger.member_id.in_(_members(f)),
+            DiscretionaryBudgetLedger.period_id.in_(select(Period.id).where(Period.family_id == f)),
+            DiscretionaryBudgetLedger.decision_id.in_(_decisions(f)),
+        ),
+    ),
+    _Step(
+        "member_budget_settings",
+        MemberBudgetSetting.__table__,
+        lambda f: or_(MemberBudgetSetting.family_id == f, MemberBudgetSetting.member_id.in_(_members(f))),
+    ),
+    _Step("budget_policies", BudgetPolicy.__table__, lambda f: BudgetPolicy.family_id == f),
+    _Step("periods", Period.__table__, lambda f: Period.family_id == f),
+    _Step("goals", Goal.__table__, lambda f: Goal.family_id == f),
+    _Step("decisions", Decision.__table__, lambda f: Decision.family_id == f),
+    _Step("family_members", FamilyMember.__table__, lambda f: FamilyMember.family_id == f),
+    _Step("families", Family.__table__, lambda f: Family.id == f),
+)
+
+
+def _run_batch(db: Session, step: _Step, family_id: int, batch_size: int) -> int:
+    """Delete (or detach) up to `batch_size` of the family's rows in `step.table`; returns rows affected."""
+    keys = list(step.table.primary_key.columns)
+    key = keys[0] if len(keys) == 1 else tuple_(*keys)
+    batch = select(*keys).where(step.scope(family_id)).limit(batch_size)
+    if step.nullify is not None:
+        statement = update(step.table).where(key.in_(batch)).values({step.nullify: None})
+    else:
+        statement = delete(step.table).where(key.in_(batch))
+    return db.execute(statement).rowcount or 0
+
 
+def purge_job_payload(job: FamilyPurgeJob) -> dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "family_id": job.family_id,
+        "status": job.status,
+        "steps_done": job.steps_done,
+        "steps_total": len(_STEPS),
+        "current_step": job.current_step,
+        "deleted": dict(job.deleted_counts or {}),
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
 
-def purge_family(db: Session, family_id: int) -> None:
+
+def create_purge_job(db: Session, family_id: int, *, requested_by: str = "system") -> FamilyPurgeJob:
+    """Queue a purge, or return the family's unfinished (queued/running/failed) one; commits."""
+    existing = db.execute(
+        select(FamilyPurgeJob)
+        .where(FamilyPurgeJob.family_id == family_id, FamilyPurgeJob.status.in_(_UNFINISHED))
+        .order_by(FamilyPurgeJob.id.asc())
+        .limit(1)
+    ).scalar_one_or_none()
+    if existing is not None:
+        return existing
+    job = FamilyPurgeJob(family_id=family_id, requested_by=requested_by, status="queued", deleted_counts={})
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _claim(db: Session, job_id: int, now: datetime) -> bool:
+    """Mark a job running unless another runner holds it (a running job whose heartbeat is recent)."""
+    stale = now - timedelta(seconds=settings.purge_job_stale_seconds)
+    claimed = db.execute(
+        update(FamilyPurgeJob)
+        .where(
+            FamilyPurgeJob.id == job_id,
+            or_(
+                FamilyPurgeJob.status.in_(("queued", "failed")),
+                (FamilyPurgeJob.status == "running") & (FamilyPurgeJob.updated_at < stale),
+            ),
+        )
+        .values(status="running", error=None, updated_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return bool(claimed)
+
+
+def _forget_search_state(family_id: int) -> None:
+    # Bulk deletes bypass the session's search-cache hooks; local vector files are per family.
+    for scope in ("notes", "memory"):
+        bump_generation(scope, family_id)
+        local_store().drop(scope, family_id)
+
+
+def run_purge_job(db: Session, job_id: int, *, batch_size: int | None = None) -> FamilyPurgeJob:
+    """
+    Run (or resume) a purge job: one table at a time, `batch_size` rows per committed statement, so no
+    statement carries an unbounded id list and locks are held for one batch only. Progress is written
+    with every batch; an interrupted job continues at its last unfinished step.
     """
-    Hard-delete a family and all dependent records.
+    size = max(1, batch_size or settings.purge_batch_size)
+    if not _claim(db, job_id, datetime.now(timezone.utc)):
+        return db.get(FamilyPurgeJob, job_id, populate_existing=True)
+    job = db.get(FamilyPurgeJob, job_id, populate_existing=True)
+    try:
+        for index in range(job.steps_done, len(_STEPS)):
+            step = _STEPS[index]
+            job.current_step = step.name
+            while True:
+                affected = _run_batch(db, step, job.family_id, size)
+                if affected:
+                    job.deleted_counts = {**job.deleted_counts, step.name: job.deleted_counts.get(step.name, 0) + affected}
+                if affected < size:
+                    job.steps_done = index + 1
+                job.updated_at = datetime.now(timezone.utc)
+                db.commit()
+                if affected < size:
+                    break
+    except Exception as exc:
+        db.rollback()
+        job = db.get(FamilyPurgeJob, job_id, populate_existing=True)
+        job.status = "failed"
+        job.error = f"{type(exc).__name__}: {exc}"[:2000]
+        job.updated_at = datetime.now(timezone.utc)
+        db.commit()
+        return job
+
+    job.status = "completed"
+    job.current_step = None
+    job.finished_at = job.updated_at = datetime.now(timezone.utc)
+    db.commit()
+    defer_until_batch_commit(db, partial(_forget_search_state, job.family_id))
+    return job
+
+
+def resume_purge_jobs(db: Session) -> list[int]:
+    """Ids of queued, failed and stale running jobs (run them with `run_purge_job`)."""
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.purge_job_stale_seconds)
+    return list(
+        db.execute(
+            select(FamilyPurgeJob.id)
+            .where(
+                or_(
+                    FamilyPurgeJob.status.in_(("queued", "failed")),
+                    (FamilyPurgeJob.status == "running") & (FamilyPurgeJob.updated_at < stale),
+                )
+            )
+            .order_by(FamilyPurgeJob.id.asc())
+        ).scalars()
+    )
+
+
+def purge_family(db: Session, family_id: int, *, requested_by: str = "system") -> FamilyPurgeJob:
+    """
+    Hard-delete a family and all dependent records, synchronously.
 
     We do this explicitly (instead of relying on ON DELETE CASCADE) so existing
     installations can purge data without a migration to rewrite FK constraints.
+    Commits as it goes; a failed purge is left as a `failed` job for the resume sweep
+    (`resume_purge_jobs`) and reported as a 500.
     """
-    member_ids = [
-        row[0]
-        for row in db.execute(select(FamilyMember.id).where(FamilyMember.family_id == family_id)).all()
-    ]
-    decision_ids = [
-        row[0] for row in db.execute(select(Decision.id).where(Decision.family_id == family_id)).all()
-    ]
-    goal_ids = [row[0] for row in db.execute(select(Goal.id).where(Goal.family_id == family_id)).all()]
-    period_ids = [
-        row[0] for row in db.execute(select(Period.id).where(Period.family_id == family_id)).all()
-    ]
-
-    # Decision children
-    if decision_ids:
-        db.execute(delete(DecisionScore).where(DecisionScore.decision_id.in_(decision_ids)))
-        db.execute(delete(DecisionQueueItem).where(DecisionQueueItem.decision_id.in_(decision_ids)))
-        db.execute(delete(RoadmapItem).where(RoadmapItem.decision_id.in_(decision_ids)))
-
-    # Goal children
-    if goal_ids:
-        db.execute(delete(DecisionScore).where(DecisionScore.goal_id.in_(goal_ids)))
-
-    # Budget/period/member children
-    if member_ids:
-        db.execute(delete(MemberBudgetSetting).where(MemberBudgetSetting.member_id.in_(member_ids)))
-        db.execute(delete(DiscretionaryBudgetLedger).where(DiscretionaryBudgetLedger.member_id.in_(member_ids)))
-
-    if period_ids:
-        db.execute(delete(DiscretionaryBudgetLedger).where(DiscretionaryBudgetLedger.period_id.in_(period_ids)))
-
-    # Family-scoped tables
-    db.execute(delete(BudgetPolicy).where(BudgetPolicy.family_id == family_id))
-    db.execute(delete(Period).where(Period.family_id == family_id))
-    db.execute(delete(Goal).where(Goal.family_id == family_id))
-    db.execute(delete(Decision).where(Decision.family_id == family_id))
-    db.execute(delete(FamilyMember).where(FamilyMember.family_id == family_id))
-    db.execute(delete(Family).where(Family.id == family_id))
-
+    job = run_purge_job(db, create_purge_job(db, family_id, requested_by=requested_by).id)
+    if job.status == "running":
+        raise HTTPException(status_code=409, detail=f"family purge already in progress (job {job.id})")
+    if job.status != "completed":
+        raise HTTPException(status_code=500, detail=f"family purge failed (job {job.id}): {job.error}")
+    return job
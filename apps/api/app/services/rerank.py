@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+import numpy as np
+
+
+def collapse_by_document(candidates: Sequence[dict[str, Any]], k: int) -> list[dict[str, Any]]:
+    """Keep the best chunk per `doc_id` from candidates already ordered by distance."""
+    seen: set[str] = set()
+    out: list[dict[str, Any]] = []
+    for candidate in candidates:
+        if candidate["doc_id"] in seen:
+            continue
+        seen.add(candidate["doc_id"])
+        out.append(candidate)
+        if len(out) >= k:
+            break
+    return out
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.clip(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12, None)
+
+
+def mmr_order(query: np.ndarray, vectors: np.ndarray, k: int, *, lambda_: float = 0.5) -> list[int]:
+    """
+    Maximal marginal relevance: greedily pick the candidate maximizing
+    `lambda * sim(query, c) - (1 - lambda) * max(sim(c, picked))` (cosine similarities).
+
+    Runs in O(k * n) on the `(n, dim)` candidate matrix: the max-similarity-to-picked vector is updated
+    with one matrix-vector product per pick.
+    """
+    n = vectors.shape[0]
+    if n == 0 or k <= 0:
+        return []
+    unit = _unit_rows(np.asarray(vectors, dtype=np.float32))
+    relevance = unit @ _unit_rows(np.asarray(query, dtype=np.float32))
+    redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    picked: list[int] = []
+    for _ in range(min(k, n)):
+        if picked:
+            scores = lambda_ * relevance - (1.0 - lambda_) * redundancy
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        picked.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, unit @ unit[best])
+    return picked
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models.entities import RoadmapDependency, RoadmapItem
+
+
+def _normalize_dependencies(dependencies: list[int]) -> list[int]:
+    return list(dict.fromkeys(int(dep) for dep in dependencies))
+
+
+def _closure(db: Session, family_id: int, start_ids: set[int], *, reverse: bool) -> set[int]:
+    """
+    Transitive closure over the family's dependency edges via a recursive CTE.
+
+    Forward (reverse=False) walks item -> what it depends on (blockers); reverse walks item -> what depends on it.
+    UNION (not UNION ALL) de-duplicates rows, so the recursion terminates even if legacy data contains a cycle.
+    """
+    if not start_ids:
+        return set()
+    edge = RoadmapDependency
+    src, dst = (edge.depends_on_item_id, edge.roadmap_item_id) if reverse else (edge.roadmap_item_id, edge.depends_on_item_id)
+
+    closure = (
+        select(dst.label("item_id"))
+        .where(edge.family_id == family_id, src.in_(start_ids))
+        .cte("roadmap_closure", recursive=True)
+    )
+    closure = closure.union(
+        select(dst).join(closure, src == closure.c.item_id).where(edge.family_id == family_id)
+    )
+    return set(db.execute(select(closure.c.item_id)).scalars().all())
+
+
+def transitive_blockers(db: Session, family_id: int, item_id: int) -> set[int]:
+    return _closure(db, family_id, {item_id}, reverse=False)
+
+
+def transitive_dependents(db: Session, family_id: int, item_id: int) -> set[int]:
+    return _closure(db, family_id, {item_id}, reverse=True)
+
+
+def ensure_acyclic(db: Session, family_id: int, item_id: int, dependencies: list[int]) -> None:
+    deps = set(dependencies)
+    if item_id in deps:
+        raise HTTPException(status_code=400, detail="roadmap item cannot depend on itself")
+    if item_id in _closure(db, family_id, deps, reverse=False):
+        raise HTTPException(status_code=400, detail="dependency cycle detected")
+
+
+def set_item_dependencies(db: Session, item: RoadmapItem, family_id: int, dependencies: list[int]) -> list[int]:
+    """
+    Replace the dependency edges of `item` (which must already be flushed) after checking for cycles.
+
+    Returns the normalized (de-duplicated, order-preserving) dependency list.
+    """
+    deps = _normalize_dependencies(dependencies)
+    ensure_acyclic(db, family_id, item.id, deps)
+    db.execute(delete(RoadmapDependency).where(RoadmapDependency.roadmap_item_id == item.id))
+    db.add_all(RoadmapDependency(roadmap_item_id=item.id, depends_on_item_id=dep, family_id=family_id) for dep in deps)
+    return deps
+
+
+def delete_item_dependencies(db: Session, item_ids) -> None:
+    """Drop outgoing edges for the given roadmap item ids (a list or a scalar subquery)."""
+    db.execute(delete(RoadmapDependency).where(RoadmapDependency.roadmap_item_id.in_(item_ids)))
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import Any, Callable
+
+import numpy as np
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import defer_until_batch_commit, is_batch_session
+from app.core.metrics import SEARCH_CACHE_REQUESTS
+from app.models.memory import MemoryDocument
+from app.models.notes import NoteDocument
+from app.services.embeddings import embed_texts
+
+
+class _MemoryBackend:
+    """In-process TTL store (single API process, tests); same surface as the Redis calls used below."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: dict[str, tuple[float | None, bytes]] = {}
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            item = self._values.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires is not None and expires < time.monotonic():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        with self._lock:
+            self._values[key] = (time.monotonic() + ex if ex else None, value)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            _, current = self._values.get(key, (None, b"0"))
+            value = int(current) + 1
+            self._values[key] = (None, str(value).encode())
+            return value
+
+
+_backend: Any = None
+_backend_lock = threading.Lock()
+# Circuit breaker: after a Redis error, skip the cache until this monotonic time.
+_disabled_until = 0.0
+
+
+def backend() -> Any:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if settings.search_cache_backend == "memory":
+                    _backend = _MemoryBackend()
+                else:
+                    import redis
+
+                    _backend = redis.Redis(
+                        host=settings.redis_host,
+                        port=settings.redis_port,
+                        db=settings.search_cache_redis_db,
+                        socket_timeout=settings.search_cache_timeout_seconds,
+                        socket_connect_timeout=settings.search_cache_timeout_seconds,
+                    )
+    return _backend
+
+
+def reset_backend() -> None:
+    global _backend, _disabled_until
+    with _backend_lock:
+        _backend = None
+        _disabled_until = 0.0
+
+
+def _available() -> bool:
+    return settings.search_cache_enabled and time.monotonic() >= _disabled_until
+
+
+def _call(fn: Callable[[Any], Any]) -> Any:
+    """Run a cache operation; any backend failure degrades to a miss and opens the breaker for a while."""
+    global _disabled_until
+    if not _available():
+        return None
+    try:
+        return fn(backend())
+    except Exception:
+        _disabled_until = time.monotonic() + settings.search_cache_retry_seconds
+        return None
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query or "").strip().lower()
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+
+def embed_query(query: str, *, dim: int) -> np.ndarray:
+    """
+    Query embedding with a short-TTL cache shared across families (same text, same vector).
+
+    The normalized text is both the cache key and what gets embedded, so the vector does not depend on
+    which spelling of the query happened to fill the cache.
+    """
+    from app.services.embedding_providers import provider
+
+    text = normalize_query(query)
+    key = f"search:qemb:{provider().name}:{settings.embedding_dim}:{dim}:{_digest(text)}"
+    cached = _call(lambda r: r.get(key))
+    if cached is not None and len(cached) == dim * 4:
+        SEARCH_CACHE_REQUESTS.labels("query_embedding", "hit").inc()
+        return np.frombuffer(cached, dtype=np.float32)
+    SEARCH_CACHE_REQUESTS.labels("query_embedding", "miss").inc()
+    vector = embed_texts([text], dim=dim)[0]
+    _call(lambda r: r.set(key, np.asarray(vector, dtype=np.float32).tobytes(), ex=settings.search_cache_embedding_ttl_seconds))
+    return vector
+
+
+def _generation_key(scope: str, family_id: int) -> str:
+    return f"search:gen:{scope}:{family_id}"
+
+
+def cached_results(
+    scope: str,
+    family_id: int,
+    *,
+    query: str,
+    filters: dict[str, Any],
+    top_k: int,
+    compute: Callable[[], Any],
+    dump: Callable[[Any], Any] = lambda value: value,
+    load: Callable[[Any], Any] = lambda value: value,
+    db: Session | None = None,
+) -> Any:
+    """
+    Return `compute()` memoized under (scope, family, generation, normalized query, filters, top_k).
+
+    Bumping the family's generation (see `bump_generation`) orphans every cached result for it at once;
+    the orphans simply expire. A search on a batch session (`db`) sees the batch's uncommitted writes, so
+    it neither reads nor fills the cache.
+    """
+    if not _available() or (db is not None and is_batch_session(db)):
+        return compute()
+    generation = _call(lambda r: r.get(_generation_key(scope, family_id)))
+    fingerprint = _digest({"q": normalize_query(query), "filters": filters, "top_k": top_k})
+    key = f"search:res:{scope}:{family_id}:{int(generation or 0)}:{fingerprint}"
+    cached = _call(lambda r: r.get(key))
+    if cached is not None:
+        SEARCH_CACHE_REQUESTS.labels(scope, "hit").inc()
+        return load(json.loads(cached))
+    SEARCH_CACHE_REQUESTS.labels(scope, "miss").inc()
+    value = compute()
+    if _available():
+        payload = json.dumps(dump(value), default=str).encode("utf-8")
+        _call(lambda r: r.set(key, payload, ex=settings.search_cache_result_ttl_seconds))
+    return value
+
+
+def bump_generation(scope: str, family_id: int) -> None:
+    _call(lambda r: r.incr(_generation_key(scope, family_id)))
+
+
+# Invalidation: collect families whose notes/memory changed during a flush, bump after the commit lands.
+# Embedding rows are always written alongside their (new or touched) document, so documents suffice.
+_SCOPES: dict[type, str] = {NoteDocument: "notes", MemoryDocument: "memory"}
+
+
+def _touched_families(obj: Any) -> set[int]:
+    # A re-indexed note may move between families: invalidate both the old and the new one.
+    history = inspect(obj).attrs.family_id.history
+    return {value for value in (*history.added, *history.unchanged, *history.deleted) if value is not None}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_search_invalidations(session: Session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        scope = _SCOPES.get(type(obj))
+        if scope is not None:
+            dirty = session.info.setdefault("search_cache_dirty", set())
+            dirty.update((scope, family_id) for family_id in _touched_families(obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_search_invalidations(session: Session) -> None:
+    # Also fires when a batch operation commits its savepoint; the bump then waits for the batch itself.
+    for scope, family_id in session.info.pop("search_cache_dirty", set()):
+        defer_until_batch_commit(session, lambda scope=scope, family_id=family_id: bump_generation(scope, family_id))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_search_invalidations(session: Session) -> None:
+    session.info.pop("search_cache_dirty", None)
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import json
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+
+@dataclass
+class Neighbor:
+    doc_id: str
+    chunk_id: int
+    distance: float  # L2, same as pgvector's `<->`
+    text: str
+    vector: np.ndarray | None = None
+
+
+class _Collection:
+    """
+    One (collection, family) matrix on disk:
+
+    - `vectors.f32`: row-major float32, appended to and memory-mapped read-only for search;
+    - `rows.jsonl`: one `{"doc_id", "chunk_id", "text"}` line per vector row, plus `{"deleted": doc_id}`
+      tombstones (which consume no row).
+
+    Deleted rows stay in the files until dead rows outnumber live ones, then both files are rewritten.
+    """
+
+    def __init__(self, path: Path, index_kind: str) -> None:
+        self.path = path
+        self.index_kind = index_kind
+        self.lock = threading.RLock()
+        self.dim = 0
+        self.rows: list[tuple[str, int, str]] = []
+        self.alive = np.zeros(0, dtype=bool)
+        self.doc_rows: dict[str, list[int]] = {}
+        self.vectors: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        self.sq_norms = np.zeros(0, dtype=np.float32)
+        self._hnsw: Any = None
+        self._load()
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.path / "vectors.f32"
+
+    @property
+    def _rows_path(self) -> Path:
+        return self.path / "rows.jsonl"
+
+    def _load(self) -> None:
+        meta = self.path / "meta.json"
+        if not meta.exists():
+            return
+        self.dim = int(json.loads(meta.read_text())["dim"])
+        row_bytes = 4 * self.dim
+        capacity = self._vectors_path.stat().st_size // row_bytes if self._vectors_path.exists() else 0
+        # A crash between (or during) the two appends leaves one file ahead of the other, possibly with a
+        # torn last line: keep the records that are complete and have a vector, then cut both files back to
+        # them, so later appends line up again.
+        kept = 0
+        if self._rows_path.exists():
+            with self._rows_path.open("rb") as handle:
+                for line in handle:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    if "deleted" in record:
+                        for row in self.doc_rows.pop(record["deleted"], []):
+                            self.rows[row] = ("", -1, "")
+                    elif len(self.rows) < capacity:
+                        self.doc_rows.setdefault(record["doc_id"], []).append(len(self.rows))
+                        self.rows.append((record["doc_id"], int(record["chunk_id"]), record["text"]))
+                    else:
+                        break
+                    kept += len(line)
+            if kept < self._rows_path.stat().st_size:
+                with self._rows_path.open("r+b") as handle:
+                    handle.truncate(kept)
+        if self._vectors_path.exists() and self._vectors_path.stat().st_size != len(self.rows) * row_bytes:
+            with self._vectors_path.open("r+b") as handle:
+                handle.truncate(len(self.rows) * row_bytes)
+        self.alive = np.zeros(len(self.rows), dtype=bool)
+        for rows in self.doc_rows.values():
+            self.alive[rows] = True
+        self._map()
+
+    def _map(self, *, appended: np.ndarray | None = None) -> None:
+        count = len(self.rows)
+        if count == 0:
+            self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+            self.sq_norms = np.zeros(0, dtype=np.float32)
+            return
+        self.vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+        if appended is not None:
+            self.sq_norms = np.concatenate([self.sq_norms, np.einsum("ij,ij->i", appended, appended)])
+        else:
+            self.sq_norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+
+    def add(self, doc_id: str, items: list[tuple[int, np.ndarray, str]]) -> None:
+        if not items:
+            return
+        matrix = np.asarray([vector for _, vector, _ in items], dtype=np.float32)
+        with self.lock:
+            if self.dim == 0:
+                self.path.mkdir(parents=True, exist_ok=True)
+                self.dim = matrix.shape[1]
+                (self.path / "meta.json").write_text(json.dumps({"dim": self.dim}))
+            if matrix.shape[1] != self.dim:
+                raise ValueError(f"vector width {matrix.shape[1]} does not match store width {self.dim}")
+            start = len(self.rows)
+            with self._vectors_path.open("ab") as handle:
+                handle.write(matrix.tobytes())
+            with self._rows_path.open("a") as handle:
+                for chunk_id, _, text in items:
+                    handle.write(json.dumps({"doc_id": doc_id, "chunk_id": chunk_id, "text": text}) + "\n")
+                    self.rows.append((doc_id, chunk_id, text))
+            self.doc_rows.setdefault(doc_id, []).extend(range(start, len(self.rows)))
+            self.alive = np.concatenate([self.alive, np.ones(len(items), dtype=bool)])
+            self._map(appended=matrix)
+            if self._hnsw is not None:
+                self._hnsw.resize_index(max(len(self.rows), 1))
+                self._hnsw.add_items(matrix, np.arange(start, len(self.rows)))
+
+    def discard(self, doc_ids: Iterable[str]) -> None:
+        with self.lock:
+            removed = [doc_id for doc_id in doc_ids if doc_id in self.doc_rows]
+            if not removed:
+                return
+            with self._rows_path.open("a") as handle:
+                for doc_id in removed:
+                    handle.write(json.dumps({"deleted": doc_id}) + "\n")
+                    rows = self.doc_rows.pop(doc_id)
+                    self.alive[rows] = False
+                    if self._hnsw is not None:
+                        for row in rows:
+                            self._hnsw.mark_deleted(row)
+            if (~self.alive).sum() > max(1000, self.alive.sum()):
+                self._rewrite()
+
+    def _rewrite(self) -> None:
+        keep = np.flatnonzero(self.alive)
+        vectors = np.asarray(self.vectors[keep])
+        rows = [self.rows[row] for row in keep]
+        tmp_vectors = self._vectors_path.with_suffix(".tmp")
+        tmp_rows = self._rows_path.with_suffix(".tmp")
+        tmp_vectors.write_bytes(vectors.tobytes())
+        with tmp_rows.open("w") as handle:
+            for doc_id, chunk_id, text in rows:
+                handle.write(json.dumps({"doc_id": doc_id, "chunk_id": chunk_id, "text": text}) + "\n")
+        self.vectors = np.zeros((0, self.dim), dtype=np.float32)  # release the old mapping first
+        tmp_vectors.replace(self._vectors_path)
+        tmp_rows.replace(self._rows_path)
+        self.rows = rows
+        self.doc_rows = {}
+        for index, (doc_id, _, _) in enumerate(rows):
+            self.doc_rows.setdefault(doc_id, []).append(index)
+        self.alive = np.ones(len(rows), dtype=bool)
+        self._hnsw = None
+        self._map()
+
+    def _hnsw_index(self) -> Any:
+        if self._hnsw is None:
+            try:
+                import hnswlib
+            except ImportError as exc:  # pragma: no cover - depends on optional package
+                raise RuntimeError("LOCAL_VECTOR_INDEX=hnsw requires the optional 'hnswlib' package") from exc
+            index = hnswlib.Index(space="l2", dim=self.dim)
+            index.init_index(max_elements=max(len(self.rows), 1), ef_construction=200, M=16, allow_replace_deleted=False)
+            if len(self.rows):
+                index.add_items(np.asarray(self.vectors), np.arange(len(self.rows)))
+                for row in np.flatnonzero(~self.alive):
+                    index.mark_deleted(int(row))
+            self._hnsw = index
+        return self._hnsw
+
+    def search(self, query: np.ndarray, limit: int, doc_ids: set[str] | None, with_vectors: bool) -> list[Neighbor]:
+        with self.lock:
+            if not len(self.rows) or limit <= 0:
+                return []
+            mask = self.alive.copy()
+            if doc_ids is not None:
+                allowed = np.zeros_like(mask)
+                for doc_id in doc_ids:
+                    allowed[self.doc_rows.get(doc_id, [])] = True
+                mask &= allowed
+            candidates = int(mask.sum())
+            if candidates == 0:
+                return []
+            query = np.asarray(query, dtype=np.float32)
+            if self.index_kind == "hnsw" and candidates > limit:
+                index = self._hnsw_index()
+                index.set_ef(max(limit * 2, 50))
+                labels, sq = index.knn_query(query, k=min(limit, candidates), filter=lambda label: bool(mask[label]))
+                order, sq_distances = labels[0].astype(np.int64), sq[0]
+            else:
+                # Brute force over the memory map: |x - q|^2 = |x|^2 - 2 x.q + |q|^2.
+                rows = np.flatnonzero(mask)
+                sq_all = self.sq_norms[rows] - 2.0 * (self.vectors[rows] @ query) + float(query @ query)
+                top = np.argpartition(sq_all, limit - 1)[:limit] if len(rows) > limit else np.arange(len(rows))
+                top = top[np.argsort(sq_all[top], kind="stable")]
+                order, sq_distances = rows[top], sq_all[top]
+            return [
+                Neighbor(
+                    doc_id=self.rows[row][0],
+                    chunk_id=self.rows[row][1],
+                    distance=float(np.sqrt(max(float(value), 0.0))),
+                    text=self.rows[row][2],
+                    vector=np.array(self.vectors[row]) if with_vectors else None,
+                )
+                for row, value in zip(order, sq_distances)
+            ]
+
+
+class LocalVectorStore:
+    """
+    In-process vector index for SQLite/dev deployments: float32 matrices per (collection, family) under
+    `root`, searched by brute force (NumPy) or an optional hnswlib graph built from the same files.
+
+    Single-process only: concurrent writers in different processes would interleave appends.
+    """
+
+    def __init__(self, root: str | Path, *, index_kind: str = "flat") -> None:
+        self.root = Path(root)
+        self.index_kind = index_kind
+        self._collections: dict[tuple[str, int], _Collection] = {}
+        self._lock = threading.Lock()
+
+    def _collection(self, collection: str, family_id: int) -> _Collection:
+        key = (collection, family_id)
+        with self._lock:
+            if key not in self._collections:
+                self._collections[key] = _Collection(self.root / collection / str(family_id), self.index_kind)
+            return self._collections[key]
+
+    def has(self, collection: str, family_id: int, doc_id: str) -> bool:
+        return doc_id in self._collection(collection, family_id).doc_rows
+
+    def replace(self, collection: str, family_id: int, doc_id: str, items: list[tuple[int, np.ndarray, str]]) -> None:
+        """Store `(chunk_id, vector, text)` rows for a document, dropping any it had before."""
+        target = self._collection(collection, family_id)
+        with target.lock:
+            target.discard([doc_id])
+            target.add(doc_id, items)
+
+    def discard(self, collection: str, family_id: int, doc_ids: Iterable[str]) -> None:
+        self._collection(collection, family_id).discard(list(doc_ids))
+
+    def drop(self, collection: str, family_id: int) -> None:
+        """Forget a family's whole collection (files included), e.g. after a family purge."""
+        with self._lock:
+            self._collections.pop((collection, family_id), None)
+            shutil.rmtree(self.root / collection / str(family_id), ignore_errors=True)
+
+    def search(
+        self,
+        collection: str,
+        family_id: int,
+        query: np.ndarray,
+        *,
+        limit: int,
+        doc_ids: set[str] | None = None,
+        with_vectors: bool = False,
+    ) -> list[Neighbor]:
+        """Nearest live chunks (ascending L2 distance), optionally restricted to `doc_ids`."""
+        return self._collection(collection, family_id).search(query, limit, doc_ids, with_vectors)
+
+
+_store: LocalVectorStore | None = None
+_store_lock = threading.Lock()
+
+
+def local_store() -> LocalVectorStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LocalVectorStore(settings.local_vector_store_dir, index_kind=settings.local_vector_index)
+    return _store
+
+
+def reset_local_store() -> None:
+    global _store
+    with _store_lock:
+        _store = None
+
+
+def uses_pgvector(db: Session) -> bool:
+    """VECTOR_STORE=auto means pgvector on Postgres and the local store elsewhere; `local` forces the latter."""
+    if settings.vector_store == "local":
+        return False
+    return db.bind is not None and db.bind.dialect.name == "postgresql"
@@ -0,0 +1 @@
+"""Reproducible load benchmarks for the API hot paths (run with `python -m benchmarks`)."""
@@ -0,0 +1,158 @@
+"""
+Benchmark the API hot paths against synthetic data.
+
+    python -m benchmarks --decisions 500 --requests 300 --concurrency 8 --output run.json
+
+Seeds families straight through the ORM, then drives each scenario in-process (httpx ASGI transport)
+or against a running server (--base-url, which must share --database-url). Embeddings always use the
+deterministic hash fallback and event publishing and search caching are disabled, so runs are offline and reproducible.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from app.core.config import settings
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    from benchmarks.runner import SCENARIOS
+    from benchmarks.seed import SeedSpec
+
+    defaults = SeedSpec()
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--database-url", default=settings.database_url, help="database to seed (and serve, in-process)")
+    parser.add_argument("--base-url", default=None, help="benchmark a running API instead of the in-process app")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1234, help="RNG seed for data and request mix")
+    parser.add_argument("--create-schema", action="store_true", help="create tables first (implied for SQLite)")
+    parser.add_argument("--cleanup", action="store_true", help="purge the seeded families afterwards")
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON report here instead of stdout")
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value, help=f"per-family (default {value})")
+    return parser.parse_args(argv)
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core import db as db_module
+    from app.core.db import build_engine, get_db
+    from app.models import entities  # noqa: F401
+    from app.models.base import Base
+    from app.services.embedding_providers import reset_provider
+    from app.services.purge import purge_family
+    from app.services.vector_store import reset_local_store
+    from benchmarks.runner import SCENARIOS, run_scenario
+    from benchmarks.seed import SeedSpec, seed
+
+    # Offline and deterministic: hash embeddings, no NATS, no Redis search caches (every search hits the DB).
+    settings.openai_api_key = ""
+    settings.embedding_provider = "hash"
+    settings.events_enabled = False
+    settings.search_cache_enabled = False
+    # Non-Postgres runs index vectors in the local store; keep its files out of the working tree.
+    settings.local_vector_store_dir = tempfile.mkdtemp(prefix="bench-vectors-")
+    reset_provider()
+    reset_local_store()
+
+    engine = build_engine(args.database_url)
+    if args.create_schema or engine.dialect.name == "sqlite":
+        Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    spec = SeedSpec(**{name: getattr(args, name) for name in asdict(SeedSpec())})
+    rng = random.Random(args.seed)
+    with Session() as db:
+        families = seed(db, spec, rng=rng, label=f"bench-{args.seed}")
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60.0)
+    else:
+        from app.main import app
+
+        def _bench_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = _bench_db
+        db_module.ReplicaSessionLocal = None
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60.0)
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    results = []
+    try:
+        async with client:
+            for name in [item.strip() for item in args.scenarios.split(",") if item.strip()]:
+                if name not in SCENARIOS:
+                    raise SystemExit(f"unknown scenario: {name}")
+                results.append(
+                    await run_scenario(
+                        client,
+                        SCENARIOS[name],
+                        families,
+                        requests=args.requests,
+                        concurrency=args.concurrency,
+                        rng=rng,
+                        warmup=args.warmup,
+                    )
+                )
+    finally:
+        if args.cleanup:
+            with Session() as db:
+                for family in families:
+                    purge_family(db, family.family_id)
+        engine.dispose()
+
+    return {
+        "started_at": started_at,
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "target": args.base_url or "in-process",
+        "database": engine.dialect.name,
+        "seed": args.seed,
+        "spec": asdict(spec),
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    report = asyncio.run(_run(args))
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(payload + "\n")
+    else:
+        sys.stdout.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
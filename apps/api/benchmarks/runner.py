@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, NamedTuple
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+from benchmarks.seed import SeededFamily, phrase
+
+
+class RequestSpec(NamedTuple):
+    method: str
+    path: str
+    body: dict[str, Any] | None = None
+    # Per-request headers; run_scenario adds X-Dev-User for a member of the family the request targets.
+    headers: dict[str, str] | None = None
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    # Route template as labelled by the metrics middleware (used to read statements per request).
+    route: str
+    build: Callable[[random.Random, SeededFamily], RequestSpec]
+
+
+def _list_decisions(rng: random.Random, fam: SeededFamily) -> RequestSpec:
+    return RequestSpec("GET", f"/v1/decisions?family_id={fam.family_id}&include_scores=true")
+
+
+def _note_search(rng: random.Random, fam: SeededFamily) -> RequestSpec:
+    body = {"family_id": fam.family_id, "actor": fam.member_emails[0], "query": phrase(rng, 3), "top_k": 5}
+    return RequestSpec("POST", "/v1/notes/search", body)
+
+
+def _search_memory(rng: random.Random, fam: SeededFamily) -> RequestSpec:
+    return RequestSpec("POST", f"/v1/family/{fam.family_id}/memory/search", {"query": phrase(rng, 4), "top_k": 8})
+
+
+def _budget_summary(rng: random.Random, fam: SeededFamily) -> RequestSpec:
+    return RequestSpec("GET", f"/v1/budgets/families/{fam.family_id}")
+
+
+def _create_roadmap_item(rng: random.Random, fam: SeededFamily) -> RequestSpec:
+    decisions = fam.schedulable_decision_ids or fam.decision_ids
+    deps = rng.sample(fam.roadmap_item_ids, min(len(fam.roadmap_item_ids), 2))
+    body = {
+        "decision_id": rng.choice(decisions),
+        "bucket": "2026-Q4",
+        "status": "Scheduled",
+        "dependencies": deps,
+        "use_discretionary_budget": False,
+    }
+    return RequestSpec("POST", "/v1/roadmap", body)
+
+
+def _manual_score_decision(rng: random.Random, fam: SeededFamily) -> RequestSpec:
+    body = {
+        "goal_scores": [
+            {"goal_id": goal_id, "score_1_to_5": rng.randint(1, 5), "rationale": phrase(rng, 5)} for goal_id in fam.goal_ids
+        ],
+        "threshold_1_to_5": 4.0,
+        "computed_by": "human",
+    }
+    return RequestSpec("POST", f"/v1/decisions/{rng.choice(fam.decision_ids)}/score", body)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("list_decisions", "GET", "/v1/decisions", _list_decisions),
+        Scenario("note_search", "POST", "/v1/notes/search", _note_search),
+        Scenario("search_memory", "POST", "/v1/family/{family_id}/memory/search", _search_memory),
+        Scenario("budget_summary", "GET", "/v1/budgets/families/{family_id}", _budget_summary),
+        Scenario("create_roadmap_item", "POST", "/v1/roadmap", _create_roadmap_item),
+        Scenario("manual_score_decision", "POST", "/v1/decisions/{decision_id}/score", _manual_score_decision),
+    )
+}
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Linear-interpolated percentile (q in [0, 100]) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * q / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+async def _db_statement_totals(client: httpx.AsyncClient) -> dict[tuple[str, str], tuple[float, float]]:
+    """(sum, count) of `api_request_db_queries` per (method, route), scraped from /metrics."""
+    response = await client.get("/metrics")
+    response.raise_for_status()
+    totals: dict[tuple[str, str], list[float]] = {}
+    for family in text_string_to_metric_families(response.text):
+        if family.name != "api_request_db_queries":
+            continue
+        for sample in family.samples:
+            key = (sample.labels.get("method", ""), sample.labels.get("route", ""))
+            if sample.name.endswith("_sum"):
+                totals.setdefault(key, [0.0, 0.0])[0] = sample.value
+            elif sample.name.endswith("_count"):
+                totals.setdefault(key, [0.0, 0.0])[1] = sample.value
+    return {key: (value[0], value[1]) for key, value in totals.items()}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    families: list[SeededFamily],
+    *,
+    requests: int,
+    concurrency: int,
+    rng: random.Random,
+    warmup: int = 0,
+) -> dict[str, Any]:
+    def plan() -> RequestSpec:
+        fam = rng.choice(families)
+        spec = scenario.build(rng, fam)
+        return spec._replace(headers={"X-Dev-User": fam.member_emails[0], **(spec.headers or {})})
+
+    plans = [plan() for _ in range(warmup + requests)]
+    for spec in plans[:warmup]:
+        await client.request(spec.method, spec.path, json=spec.body, headers=spec.headers)
+
+    before = await _db_statement_totals(client)
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    queue: asyncio.Queue[RequestSpec] = asyncio.Queue()
+    for spec in plans[warmup:]:
+        queue.put_nowait(spec)
+
+    async def worker() -> None:
+        while True:
+            try:
+                spec = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                response = await client.request(spec.method, spec.path, json=spec.body, headers=spec.headers)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError:
+                statuses[0] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    elapsed = time.perf_counter() - started
+    after = await _db_statement_totals(client)
+
+    key = (scenario.method, scenario.route)
+    sum_before, count_before = before.get(key, (0.0, 0.0))
+    sum_after, count_after = after.get(key, (0.0, 0.0))
+    observed = count_after - count_before
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if status == 0 or status >= 400)
+    return {
+        "scenario": scenario.name,
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "status_counts": {str(status): count for status, count in sorted(statuses.items())},
+        "elapsed_seconds": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": round(1000 * sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "p50": round(1000 * percentile(latencies, 50), 3),
+            "p95": round(1000 * percentile(latencies, 95), 3),
+            "p99": round(1000 * percentile(latencies, 99), 3),
+            "max": round(1000 * latencies[-1], 3) if latencies else 0.0,
+        },
+        "statements_per_request": round((sum_after - sum_before) / observed, 2) if observed else None,
+    }
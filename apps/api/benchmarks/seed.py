@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.models.entities import (
+    Decision,
+    DecisionScore,
+    DecisionStatusEnum,
+    DiscretionaryBudgetLedger,
+    Family,
+    FamilyMember,
+    Goal,
+    Period,
+    PeriodTypeEnum,
+    RoadmapItem,
+    RoleEnum,
+)
+from app.schemas.notes import NoteIndexRequest
+from app.services.budget import get_or_create_policy
+from app.services.memory import create_document_with_embeddings
+from app.services.notes import upsert_note_document
+from app.services.roadmap_graph import set_item_dependencies
+
+
+WORDS = (
+    "budget school travel garden car repair summer camp college savings health insurance kitchen remodel "
+    "vacation piano lessons soccer league groceries mortgage refinance daycare birthday party laptop upgrade "
+    "roof solar panels retirement chores allowance dentist braces weekend trip holiday gifts pet adoption"
+).split()
+
+
+@dataclass(frozen=True)
+class SeedSpec:
+    families: int = 2
+    members: int = 4
+    goals: int = 5
+    decisions: int = 200
+    scored_fraction: float = 0.8
+    roadmap_items: int = 60
+    ledger_rows: int = 40
+    notes: int = 100
+    memory_docs: int = 100
+
+
+@dataclass
+class SeededFamily:
+    family_id: int
+    member_ids: list[int] = field(default_factory=list)
+    member_emails: list[str] = field(default_factory=list)
+    goal_ids: list[int] = field(default_factory=list)
+    decision_ids: list[int] = field(default_factory=list)
+    # Decisions whose current score clears the default threshold, so scheduling them needs no budget.
+    schedulable_decision_ids: list[int] = field(default_factory=list)
+    roadmap_item_ids: list[int] = field(default_factory=list)
+
+
+def phrase(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def seed(db: Session, spec: SeedSpec, *, rng: random.Random, label: str = "bench") -> list[SeededFamily]:
+    """Insert `spec.families` synthetic families and return the ids the scenarios draw from."""
+    seeded = [_seed_family(db, spec, rng=rng, name=f"{label}-{index}") for index in range(spec.families)]
+    db.commit()
+    return seeded
+
+
+def _seed_family(db: Session, spec: SeedSpec, *, rng: random.Random, name: str) -> SeededFamily:
+    family = Family(name=name)
+    db.add(family)
+    db.flush()
+    out = SeededFamily(family_id=family.id)
+
+    members = [
+        FamilyMember(
+            family_id=family.id,
+            email=f"{name}-member{index}@bench.invalid",
+            display_name=f"Member {index}",
+            role=RoleEnum.admin if index == 0 else RoleEnum.editor,
+        )
+        for index in range(max(spec.members, 1))
+    ]
+    goals = [
+        Goal(family_id=family.id, name=f"Goal {index}", description=phrase(rng, 8), weight=rng.uniform(0.5, 2.0))
+        for index in range(max(spec.goals, 1))
+    ]
+    db.add_all(members + goals)
+    db.flush()
+    out.member_ids = [member.id for member in members]
+    out.member_emails = [member.email for member in members]
+    out.goal_ids = [goal.id for goal in goals]
+
+    decisions = [
+        Decision(
+            family_id=family.id,
+            created_by_member_id=rng.choice(out.member_ids),
+            title=phrase(rng, 4).capitalize(),
+            description=phrase(rng, 20),
+            cost=round(rng.uniform(10, 5000), 2),
+            urgency=rng.randint(1, 5),
+            tags=rng.sample(WORDS, 2),
+            status=DecisionStatusEnum.draft,
+        )
+        for _ in range(spec.decisions)
+    ]
+    db.add_all(decisions)
+    db.flush()
+    out.decision_ids = [decision.id for decision in decisions]
+
+    scored = decisions[: int(len(decisions) * spec.scored_fraction)]
+    for index, decision in enumerate(scored):
+        # Every other scored decision gets top marks so create_roadmap_item can schedule it on merit.
+        schedulable = index % 2 == 0
+        db.add_all(
+            DecisionScore(
+                decision_id=decision.id,
+                goal_id=goal_id,
+                score_1_to_5=5 if schedulable else rng.randint(1, 5),
+                rationale=phrase(rng, 6),
+                computed_by="human",
+                version=decision.version or 1,
+            )
+            for goal_id in out.goal_ids
+        )
+        decision.status = DecisionStatusEnum.scored
+        if schedulable:
+            out.schedulable_decision_ids.append(decision.id)
+    db.flush()
+
+    candidates = out.schedulable_decision_ids or out.decision_ids
+    for index in range(spec.roadmap_items):
+        item = RoadmapItem(
+            decision_id=candidates[index % len(candidates)],
+            bucket=f"2026-Q{index % 4 + 1}",
+            status="Scheduled",
+        )
+        db.add(item)
+        db.flush()
+        # Chain-ish dependencies so the cycle check walks a non-trivial graph.
+        deps = rng.sample(out.roadmap_item_ids[-5:], min(len(out.roadmap_item_ids), rng.randint(0, 2)))
+        item.dependencies = set_item_dependencies(db, item, family.id, deps)
+        out.roadmap_item_ids.append(item.id)
+
+    policy = get_or_create_policy(db, family.id)
+    today = date.today()
+    period = Period(
+        family_id=family.id,
+        start_date=today - timedelta(days=10),
+        end_date=today + timedelta(days=policy.period_days - 11),
+        type=PeriodTypeEnum.custom,
+    )
+    db.add(period)
+    db.flush()
+    db.add_all(
+        DiscretionaryBudgetLedger(
+            member_id=member_id,
+            period_id=period.id,
+            delta=policy.default_allowance,
+            reason="period_allocation",
+            decision_id=None,
+        )
+        for member_id in out.member_ids
+    )
+    db.add_all(
+        DiscretionaryBudgetLedger(
+            member_id=rng.choice(out.member_ids),
+            period_id=period.id,
+            delta=rng.choice([-1, 1]),
+            reason=rng.choice(["discretionary_schedule_override", "discretionary_unschedule_refund", "policy_adjustment"]),
+            decision_id=rng.choice(out.decision_ids) if out.decision_ids else None,
+        )
+        for _ in range(spec.ledger_rows)
+    )
+
+    for index in range(spec.notes):
+        upsert_note_document(
+            db,
+            payload=NoteIndexRequest(
+                family_id=family.id,
+                actor=out.member_emails[0],
+                path=f"/{name}/notes/{index:05d}.md",
+                item_type=rng.choice(["polished", "raw"]),
+                role="polished",
+                title=phrase(rng, 4),
+                summary=phrase(rng, 12),
+                body_text=phrase(rng, 120),
+                source_date=today - timedelta(days=rng.randint(0, 365)),
+                tags=rng.sample(WORDS, 2),
+            ),
+        )
+    for _ in range(spec.memory_docs):
+        create_document_with_embeddings(
+            db,
+            family_id=family.id,
+            type=rng.choice(["decision", "rationale", "note"]),
+            text_value=phrase(rng, 60),
+            source_refs=[],
+        )
+    db.flush()
+    return out
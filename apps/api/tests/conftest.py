@@ -1,13 +1,21 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+
 import pytest
+from fastapi import Request
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.core.db import get_db
+from app.core.config import settings
+from app.core.db import BATCH_SESSION_SCOPE_KEY, get_db
 from app.main import app
 from app.models.base import Base
 from app.models import entities  # noqa: F401
+from app.services.search_cache import reset_backend
+from app.services.vector_store import reset_local_store
 
 
 engine = create_engine(
@@ -18,7 +26,11 @@ engine = create_engine(
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-def override_get_db():
+def override_get_db(request: Request):
+    batch = request.scope.get(BATCH_SESSION_SCOPE_KEY)
+    if batch is not None:
+        yield batch
+        return
     db = TestingSessionLocal()
     try:
         yield db
@@ -27,13 +39,19 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+settings.search_cache_backend = "memory"
 
 
 @pytest.fixture(autouse=True)
-def reset_db():
+def reset_db(tmp_path, monkeypatch):
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    # Family ids are reused after the schema reset: start from empty caches and vector files.
+    reset_backend()
+    monkeypatch.setattr(settings, "local_vector_store_dir", str(tmp_path / "vectors"))
+    reset_local_store()
     yield
+    reset_local_store()
 
 
 @pytest.fixture
@@ -49,3 +67,64 @@ def db_session():
         yield db
     finally:
         db.close()
+
+
+_IN_LIST = re.compile(r"IN \((?:\?|__\[POSTCOMPILE_\w+\])(?:, \?)*\)")
+
+
+def _statement_shape(statement: str) -> str:
+    # Statements are parameterized already; collapse whitespace and expanded IN lists so a loop
+    # issuing the same query per row produces one repeated shape.
+    return _IN_LIST.sub("IN (?)", " ".join(statement.split()))
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, more_than: int) -> dict[str, int]:
+        shapes = Counter(_statement_shape(statement) for statement in self.statements)
+        return {shape: n for shape, n in shapes.items() if n > more_than}
+
+    def check(self, max_queries: int | None, max_repeats: int) -> None:
+        detail = "\n".join(self.statements)
+        if max_queries is not None:
+            assert self.count <= max_queries, f"expected at most {max_queries} statements, got {self.count}:\n{detail}"
+        repeated = self.repeated(max_repeats)
+        assert not repeated, f"possible N+1, statement shapes repeated more than {max_repeats} times: {repeated}"
+
+
+@pytest.fixture
+def query_counter():
+    """
+    Count SQL statements issued on the test engine inside a block.
+
+        with query_counter(max_queries=6):
+            client.get(...)
+
+    Fails if the block exceeds `max_queries`, or if any statement shape repeats more than
+    `max_repeats` times (the signature of a per-row query loop).
+    """
+
+    @contextmanager
+    def counting(max_queries: int | None = None, max_repeats: int = 3):
+        counter = QueryCounter()
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            # SQLite can't guarantee RETURNING order, so ORM flushes insert autoincrement rows one
+            # statement each; Postgres batches them (insertmanyvalues). Only reads/updates/deletes count.
+            if not statement.lstrip().upper().startswith("INSERT"):
+                counter.statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+        counter.check(max_queries, max_repeats)
+
+    return counting
@@ -0,0 +1,97 @@
+from app.core.config import settings
+
+
+def _seed(client):
+    family_id = client.post("/v1/families", json={"name": "Audit Family"}).json()["id"]
+    member_id = client.post(
+        f"/v1/families/{family_id}/members",
+        json={"email": "parent@example.com", "display_name": "Parent", "role": "admin"},
+    ).json()["id"]
+    return family_id, member_id
+
+
+def test_changes_are_recorded_as_field_diffs(client, monkeypatch):
+    family_id, member_id = _seed(client)
+    monkeypatch.setattr(settings, "auth_mode", "forwardauth")
+    headers = {"X-Forwarded-User": "parent@example.com"}
+
+    goal = client.post(
+        "/v1/goals",
+        json={"family_id": family_id, "name": "Stability", "description": "Steady", "weight": 0.5, "action_types": []},
+        headers=headers,
+    ).json()
+    assert client.patch(f"/v1/goals/{goal['id']}", json={"weight": 0.8, "name": "Stability"}, headers=headers).status_code == 200
+    assert client.delete(f"/v1/goals/{goal['id']}", headers=headers).status_code == 204
+
+    response = client.get(
+        "/v1/audit",
+        params={"family_id": family_id, "entity_type": "goal", "entity_id": goal["id"]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    events = response.json()["items"]
+    assert [event["action"] for event in events] == ["delete", "update", "create"]
+    assert all(event["actor_member_id"] == member_id for event in events)
+    # Only the field that actually changed is in the update diff.
+    assert events[1]["changes"] == {"weight": {"old": 0.5, "new": 0.8}}
+    assert events[2]["changes"]["name"] == {"old": None, "new": "Stability"}
+    assert events[0]["changes"]["weight"] == {"old": 0.8, "new": None}
+
+    # Other families' members cannot read this history.
+    assert client.get("/v1/audit", params={"family_id": family_id}, headers={"X-Forwarded-User": "x@example.com"}).status_code == 403
+
+
+def test_audit_pages_with_a_keyset_cursor(client):
+    family_id, _ = _seed(client)
+    for index in range(5):
+        client.post(
+            "/v1/goals",
+            json={"family_id": family_id, "name": f"Goal {index}", "description": "d", "weight": 0.1, "action_types": []},
+        )
+    other_family_id, _ = _seed(client)
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params = {"family_id": family_id, "entity_type": "goal", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/v1/audit", params=params).json()
+        seen += [event["entity_id"] for event in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 5 and len(set(seen)) == 5
+    assert seen == sorted(seen, reverse=True)
+
+    members = client.get("/v1/audit", params={"family_id": other_family_id, "entity_type": "member"}).json()["items"]
+    assert [event["action"] for event in members] == ["create"]
+    assert client.get("/v1/audit", params={"family_id": family_id, "cursor": "nope"}).status_code == 400
+
+
+def test_member_with_audited_changes_can_be_deleted(client, db_session, monkeypatch):
+    family_id, admin_id = _seed(client)
+    editor_id = client.post(
+        f"/v1/families/{family_id}/members",
+        json={"email": "editor@example.com", "display_name": "Editor", "role": "editor"},
+    ).json()["id"]
+    monkeypatch.setattr(settings, "auth_mode", "forwardauth")
+    goal = client.post(
+        "/v1/goals",
+        json={"family_id": family_id, "name": "Calm", "description": "d", "weight": 0.5, "action_types": []},
+        headers={"X-Forwarded-User": "editor@example.com"},
+    ).json()
+
+    connection = db_session.connection()
+    connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+    try:
+        admin = {"X-Forwarded-User": "parent@example.com"}
+        assert client.delete(f"/v1/families/{family_id}/members/{editor_id}", headers=admin).status_code == 204
+        # An admin removing themselves is attributed to no one rather than to the deleted member.
+        assert client.delete(f"/v1/families/{family_id}/members/{admin_id}", headers=admin).status_code == 204
+    finally:
+        connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+
+    monkeypatch.setattr(settings, "auth_mode", "none")
+    history = client.get("/v1/audit", params={"family_id": family_id, "entity_type": "goal", "entity_id": goal["id"]}).json()
+    assert [(event["action"], event["actor_member_id"]) for event in history["items"]] == [("create", None)]
@@ -0,0 +1,96 @@
+from sqlalchemy import func, select
+
+from app.models.entities import Decision, Family, FamilyMember
+
+
+def _count(db_session, model) -> int:
+    return int(db_session.execute(select(func.count()).select_from(model)).scalar_one())
+
+
+def test_batch_runs_operations_in_one_transaction_with_references(client, db_session):
+    operations = [
+        {"method": "POST", "path": "/families", "body": {"name": "Batch Family"}},
+        {
+            "method": "POST",
+            "path": "/families/${0.id}/members",
+            "body": {"email": "batch@example.com", "display_name": "Batch", "role": "editor"},
+        },
+        {
+            "method": "POST",
+            "path": "/v1/decisions",
+            "body": {
+                "family_id": "${0.id}",
+                "created_by_member_id": "${1.id}",
+                "title": "Bike",
+                "description": "Buy a bike",
+            },
+        },
+        {"method": "GET", "path": "/decisions", "query": {"family_id": "${0.id}"}},
+    ]
+    response = client.post("/v1/batch", json={"operations": operations})
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [result["status_code"] for result in results] == [201, 201, 201, 200]
+    family_id = results[0]["body"]["id"]
+    assert results[2]["body"]["family_id"] == family_id
+    # Later operations see earlier, not yet committed, writes.
+    assert [item["title"] for item in results[3]["body"]["items"]] == ["Bike"]
+    assert _count(db_session, Decision) == 1
+
+
+def test_batch_failure_rolls_back_earlier_operations(client, db_session):
+    operations = [
+        {"method": "POST", "path": "/families", "body": {"name": "Doomed"}},
+        {
+            "method": "POST",
+            "path": "/families/${0.id}/members",
+            "body": {"email": "a@example.com", "display_name": "A", "role": "editor"},
+        },
+        {
+            "method": "POST",
+            "path": "/families/${0.id}/members",
+            "body": {"email": "a@example.com", "display_name": "Duplicate", "role": "viewer"},
+        },
+    ]
+    response = client.post("/v1/batch", json={"operations": operations})
+    assert response.status_code == 409
+    detail = response.json()["detail"]
+    assert detail["failed_index"] == 2
+    assert [result["status_code"] for result in detail["results"]] == [201, 201, 409]
+    assert _count(db_session, Family) == 0
+    assert _count(db_session, FamilyMember) == 0
+
+    bad_reference = client.post(
+        "/v1/batch", json={"operations": [{"method": "GET", "path": "/families/${3.id}"}]}
+    )
+    assert bad_reference.status_code == 400
+
+
+def test_batch_with_idempotency_key_is_applied_once(client, db_session):
+    operations = [
+        {"method": "POST", "path": "/families", "body": {"name": "Once"}},
+        {
+            "method": "POST",
+            "path": "/families/${0.id}/members",
+            "body": {"email": "once@example.com", "display_name": "Once", "role": "editor"},
+        },
+    ]
+    headers = {"Idempotency-Key": "proposal-1"}
+    first = client.post("/v1/batch", json={"operations": operations}, headers=headers)
+    assert first.status_code == 200, first.text
+    # A retry after a lost response gets the original results; nothing is created twice.
+    repeat = client.post("/v1/batch", json={"operations": operations}, headers=headers)
+    assert repeat.status_code == 200
+    assert repeat.json() == first.json()
+    assert _count(db_session, Family) == 1
+    assert _count(db_session, FamilyMember) == 1
+
+    reused = client.post("/v1/batch", json={"operations": operations[:1]}, headers=headers)
+    assert reused.status_code == 422
+
+    # A failed batch stores nothing, so the same key can be retried once the problem is fixed.
+    failing = [{"method": "POST", "path": "/families/999999/members", "body": operations[1]["body"]}]
+    assert client.post("/v1/batch", json={"operations": failing}, headers={"Idempotency-Key": "proposal-2"}).status_code == 404
+    retried = client.post("/v1/batch", json={"operations": operations[:1]}, headers={"Idempotency-Key": "proposal-2"})
+    assert retried.status_code == 200
+    assert _count(db_session, Family) == 2
@@ -0,0 +1,59 @@
+import asyncio
+import random
+
+import httpx
+
+from app.core.config import settings
+from app.main import app
+from benchmarks.runner import SCENARIOS, percentile, run_scenario
+from benchmarks.seed import SeedSpec, seed
+
+
+def test_percentile_interpolates():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    assert percentile([], 99) == 0.0
+
+
+def test_benchmark_scenarios_run_offline(db_session):
+    # The test engine shares one SQLite connection, so drive requests serially here.
+    rng = random.Random(7)
+    spec = SeedSpec(families=1, members=2, goals=2, decisions=6, roadmap_items=3, ledger_rows=4, notes=3, memory_docs=2)
+    families = seed(db_session, spec, rng=rng)
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return [
+                await run_scenario(client, scenario, families, requests=4, concurrency=1, rng=rng)
+                for scenario in SCENARIOS.values()
+            ]
+
+    results = asyncio.run(_run())
+    assert [result["scenario"] for result in results] == list(SCENARIOS)
+    for result in results:
+        assert result["errors"] == 0, result
+        assert result["requests"] == 4
+        assert result["latency_ms"]["p50"] <= result["latency_ms"]["p99"]
+        assert result["statements_per_request"] > 0
+
+
+def test_benchmark_requests_act_as_a_member_of_the_target_family(db_session, monkeypatch):
+    # With auth on, a request whose X-Dev-User is not in the target family gets 403.
+    monkeypatch.setattr(settings, "auth_mode", "forwardauth")
+    rng = random.Random(11)
+    spec = SeedSpec(families=3, members=2, goals=2, decisions=6, roadmap_items=3, ledger_rows=4, notes=3, memory_docs=2)
+    families = seed(db_session, spec, rng=rng)
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return [
+                await run_scenario(client, scenario, families, requests=12, concurrency=1, rng=rng)
+                for scenario in SCENARIOS.values()
+            ]
+
+    for result in asyncio.run(_run()):
+        assert set(result["status_counts"]) <= {"200", "201"}, result
@@ -80,3 +80,26 @@ def test_budget_reset_period_reallocates_allowance(client):
 
     assert first["period_days"] == second["period_days"]
     assert sum(item["used"] for item in second["members"]) == 0
+
+
+def test_budget_summary_query_count_is_independent_of_member_count(client, query_counter):
+    family, _, _ = _seed_family_with_members(client)
+    for index in range(4):
+        client.post(
+            f"/v1/families/{family['id']}/members",
+            json={"email": f"extra{index}@example.com", "display_name": f"Extra {index}", "role": "viewer"},
+        )
+    client.get(f"/v1/budgets/families/{family['id']}")
+
+    with query_counter(max_queries=10):
+        summary = client.get(f"/v1/budgets/families/{family['id']}")
+    assert len(summary.json()["members"]) == 6
+
+    # +1: the audit rows for the whole commit go in as one bulk insert.
+    with query_counter(max_queries=17):
+        update = client.put(
+            f"/v1/budgets/families/{family['id']}/policy",
+            json={"threshold_1_to_5": 4.0, "period_days": 30, "default_allowance": 3, "member_allowances": []},
+        )
+    assert update.status_code == 200
+    assert all(item["allowance"] == 3 for item in update.json()["members"])
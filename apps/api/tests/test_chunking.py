@@ -0,0 +1,49 @@
+from app.services.chunking import iter_chunks, iter_embedded_chunks
+from app.services.embedding_providers import estimate_tokens
+
+
+def _words(count: int, prefix: str) -> str:
+    return " ".join(f"{prefix}{index}" for index in range(count))
+
+
+def test_chunks_respect_budget_and_prefer_paragraph_boundaries():
+    paragraphs = [_words(20, f"p{index}w") for index in range(6)]
+    chunks = list(iter_chunks("\n\n".join(paragraphs), max_tokens=80, overlap_tokens=0))
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 80 for chunk in chunks)
+    # No paragraph is split when paragraphs fit the budget.
+    for paragraph in paragraphs:
+        assert any(paragraph in chunk for chunk in chunks)
+
+
+def test_oversized_paragraphs_fall_back_to_sentences_and_words_with_overlap():
+    sentences = [f"Sentence {index} says {_words(8, 'x')}." for index in range(30)]
+    text = " ".join(sentences) + " " + "y" * 2000
+    chunks = list(iter_chunks(text, max_tokens=60, overlap_tokens=20))
+    assert all(estimate_tokens(chunk) <= 60 + 1 for chunk in chunks)
+    # Consecutive sentence chunks share a trailing sentence as overlap.
+    last_of_first = next(sentence for sentence in reversed(sentences) if sentence in chunks[0])
+    assert chunks[1].startswith(last_of_first)
+    assert any("y" * 200 in chunk for chunk in chunks)
+
+
+def test_chunker_is_lazy_over_sections_and_skips_empty_input():
+    consumed = []
+
+    def sections():
+        for index in range(1000):
+            consumed.append(index)
+            yield _words(30, f"s{index}w")
+
+    first = next(iter_chunks(sections(), max_tokens=50, overlap_tokens=0))
+    assert first
+    assert len(consumed) < 5
+    assert list(iter_chunks("", max_tokens=50)) == []
+    assert list(iter_chunks(["", "   "], max_tokens=50)) == []
+
+
+def test_iter_embedded_chunks_numbers_chunks_across_batches():
+    rows = list(iter_embedded_chunks(iter(["a", "b", "c", "d", "e"]), dim=16, batch_size=2))
+    assert [chunk_id for chunk_id, _, _ in rows] == [0, 1, 2, 3, 4]
+    assert [text for _, text, _ in rows] == ["a", "b", "c", "d", "e"]
+    assert all(vector.shape == (16,) for _, _, vector in rows)
@@ -150,3 +150,61 @@ def test_create_score_below_threshold_routes_to_needs_work(client, db_session):
     detail_response = client.get(f"/v1/decisions/{decision_id}")
     assert detail_response.status_code == 200
     assert detail_response.json()["score_summary"]["weighted_total_1_to_5"] == 2.4
+
+
+def test_list_decisions_filters_by_tag(client):
+    ids = _seed_family_context(client)
+    for title, tags in [("Beach trip", ["travel", "summer"]), ("Ski trip", ["travel", "winter"]), ("New roof", ["home"])]:
+        response = client.post(
+            "/v1/decisions",
+            json={
+                "family_id": ids["family_id"],
+                "created_by_member_id": ids["member_id"],
+                "title": title,
+                "description": title,
+                "tags": tags,
+            },
+        )
+        assert response.status_code == 201
+        assert response.json()["tags"] == tags
+
+    travel = client.get(f"/v1/decisions?family_id={ids['family_id']}&tag=travel")
+    assert travel.status_code == 200
+    assert sorted(item["title"] for item in travel.json()["items"]) == ["Beach trip", "Ski trip"]
+
+    summer_travel = client.get(f"/v1/decisions?family_id={ids['family_id']}&tag=travel&tag=summer")
+    assert [item["title"] for item in summer_travel.json()["items"]] == ["Beach trip"]
+
+    assert client.get(f"/v1/decisions?family_id={ids['family_id']}&tag=missing").json()["items"] == []
+
+
+def test_list_decisions_with_scores_has_constant_query_count(client, query_counter):
+    ids = _seed_family_context(client)
+    for index in range(5):
+        decision_id = client.post(
+            "/v1/decisions",
+            json={
+                "family_id": ids["family_id"],
+                "created_by_member_id": ids["member_id"],
+                "title": f"Decision {index}",
+                "description": "Bulk",
+            },
+        ).json()["id"]
+        client.post(
+            f"/v1/decisions/{decision_id}/score",
+            json={
+                "goal_scores": [
+                    {"goal_id": ids["goal_a_id"], "score_1_to_5": 4, "rationale": "ok"},
+                    {"goal_id": ids["goal_b_id"], "score_1_to_5": 3, "rationale": "ok"},
+                ],
+                "threshold_1_to_5": 4.0,
+                "computed_by": "human",
+            },
+        )
+
+    with query_counter(max_queries=3):
+        response = client.get(f"/v1/decisions?family_id={ids['family_id']}&include_scores=true")
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == 5
+    assert all(len(item["score_summary"]["goal_scores"]) == 2 for item in items)
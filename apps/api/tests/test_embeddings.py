@@ -0,0 +1,150 @@
+import hashlib
+
+import numpy as np
+
+from app.services.embeddings import embed_text, embed_texts, hash_embeddings, vector_param
+
+
+def _reference_embedding(text: str, dim: int) -> list[float]:
+    seed = hashlib.sha256(text.encode("utf-8")).digest()
+    return [(seed[i % len(seed)] / 255.0) * 2.0 - 1.0 for i in range(dim)]
+
+
+def test_hash_embeddings_match_scalar_reference():
+    texts = ["alpha", "", "family budget ✓"]
+    batch = hash_embeddings(texts, dim=100)
+    assert batch.shape == (3, 100)
+    assert batch.dtype == np.float32
+    for row, text in zip(batch, texts):
+        np.testing.assert_allclose(row, _reference_embedding(text, 100), atol=1e-6)
+    np.testing.assert_allclose(embed_text("alpha", dim=100), _reference_embedding("alpha", 100), atol=1e-6)
+
+
+def test_embed_texts_returns_array_batch():
+    assert embed_texts([], dim=8).shape == (0, 8)
+    vectors = embed_texts(["a", "b"], dim=1536)
+    assert vectors.shape == (2, 1536)
+    assert vector_param(vectors[0]) == [float(value) for value in vectors[0]]
+
+
+def test_plan_batches_groups_by_length_within_token_budget():
+    from app.services.embedding_providers import plan_batches
+
+    lengths = [120, 5, 7, 6, 118, 60]
+    batches = plan_batches(lengths, max_batch_tokens=240, max_batch_size=3)
+    assert sorted(index for batch in batches for index in batch) == list(range(len(lengths)))
+    for batch in batches:
+        assert len(batch) <= 3
+        assert len(batch) * max(lengths[index] for index in batch) <= 240
+    assert batches[0] == [1, 3, 2]
+
+
+def test_mean_pool_ignores_padding_and_normalizes():
+    from app.services.embedding_providers import mean_pool
+
+    hidden = np.array([[[1.0, 0.0], [3.0, 0.0], [100.0, 100.0]]], dtype=np.float32)
+    pooled = mean_pool(hidden, np.array([[1, 1, 0]]))
+    np.testing.assert_allclose(pooled, [[1.0, 0.0]])
+
+
+def test_provider_width_is_padded_to_storage(monkeypatch):
+    from app.core.config import settings
+    from app.services import embedding_providers
+
+    monkeypatch.setattr(settings, "embedding_provider", "hash")
+    monkeypatch.setattr(settings, "embedding_dim", 384)
+    embedding_providers.reset_provider()
+    try:
+        vectors = embed_texts(["alpha"], dim=1536)
+        assert vectors.shape == (1, 1536)
+        np.testing.assert_allclose(vectors[0, :384], hash_embeddings(["alpha"], dim=384)[0])
+        assert not vectors[0, 384:].any()
+
+        monkeypatch.setattr(settings, "embedding_provider", "local")
+        monkeypatch.setattr(settings, "local_embedding_model_dir", "")
+        embedding_providers.reset_provider()
+        import pytest
+
+        with pytest.raises(RuntimeError):
+            embed_texts(["alpha"])
+    finally:
+        embedding_providers.reset_provider()
+
+
+def test_batch_by_budget_respects_item_and_token_limits():
+    from app.services.embedding_providers import batch_by_budget, estimate_tokens
+
+    texts = ["x" * 40] * 5 + ["y" * 400] + ["z"]
+    ranges = batch_by_budget(texts, max_items=3, max_tokens=60)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(texts)
+    assert all(prev[1] == nxt[0] for prev, nxt in zip(ranges, ranges[1:]))
+    for start, end in ranges:
+        assert end - start <= 3
+        assert end - start == 1 or sum(estimate_tokens(text) for text in texts[start:end]) <= 60
+    # An oversized single input still gets its own request rather than being dropped.
+    assert (5, 6) in ranges
+
+
+def test_call_with_retries_backs_off_on_rate_limits_only():
+    import httpx
+    import openai
+    import pytest
+
+    from app.services.embedding_providers import call_with_retries
+
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    sleeps: list[float] = []
+    attempts = {"n": 0}
+
+    def flaky():
+        attempts["n"] += 1
+        if attempts["n"] == 1:
+            raise openai.RateLimitError("slow down", response=httpx.Response(429, request=request, headers={"retry-after": "2"}), body=None)
+        if attempts["n"] == 2:
+            raise openai.InternalServerError("oops", response=httpx.Response(503, request=request), body=None)
+        return "ok"
+
+    assert call_with_retries(flaky, max_retries=3, base_seconds=0.5, max_seconds=10, sleep=sleeps.append) == "ok"
+    assert sleeps[0] == 2.0
+    assert 0 <= sleeps[1] <= 1.0
+
+    def bad_request():
+        raise openai.BadRequestError("nope", response=httpx.Response(400, request=request), body=None)
+
+    with pytest.raises(openai.BadRequestError):
+        call_with_retries(bad_request, max_retries=3, base_seconds=0.5, max_seconds=10, sleep=sleeps.append)
+    assert len(sleeps) == 2
+
+
+def test_openai_requests_in_flight_are_capped_across_callers(monkeypatch):
+    import threading
+    import time
+    from types import SimpleNamespace
+
+    from app.core.config import settings
+    from app.services.embedding_providers import OpenAIEmbeddingProvider
+
+    monkeypatch.setattr(settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(settings, "openai_embedding_concurrency", 2)
+    provider = OpenAIEmbeddingProvider(dim=4)
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0}
+
+    def create(model, input, dimensions):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        time.sleep(0.02)
+        with lock:
+            in_flight["now"] -= 1
+        data = [SimpleNamespace(index=index, embedding=[0.0] * dimensions) for index in range(len(input))]
+        return SimpleNamespace(data=data, usage=SimpleNamespace(total_tokens=len(input)))
+
+    provider.client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+    # Single-batch calls from many request threads at once.
+    callers = [threading.Thread(target=provider.embed, args=(["text"],)) for _ in range(8)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    assert in_flight["max"] == 2
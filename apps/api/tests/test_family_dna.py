@@ -1,4 +1,8 @@
 from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.models.family_dna import FamilyDnaCheckpoint
 
 
 def test_family_dna_propose_commit_roundtrip(client: TestClient):
@@ -39,3 +43,84 @@ def test_family_dna_rejects_secrets(client: TestClient):
     )
     assert resp.status_code == 400
 
+
+
+def test_family_dna_history_reads_replay_from_checkpoints(client: TestClient, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "dna_checkpoint_interval", 2)
+    family_id = client.post("/v1/families", json={"name": "HistoryFam"}).json()["id"]
+    patches = [[{"op": "add", "path": "/people", "value": []}]] + [
+        [{"op": "add", "path": "/people/-", "value": {"id": f"p{index}", "name": f"Person {index}"}}] for index in range(1, 5)
+    ]
+    for patch in patches:
+        proposal = client.post(f"/v1/family/{family_id}/dna/propose", json={"patch": patch}).json()
+        assert client.post(f"/v1/family/{family_id}/dna/commit/{proposal['proposal_id']}").status_code == 200
+
+    checkpoints = db_session.execute(
+        select(FamilyDnaCheckpoint.version).where(FamilyDnaCheckpoint.family_id == family_id)
+    ).scalars().all()
+    assert sorted(checkpoints) == [2, 4]
+
+    latest = client.get(f"/v1/family/{family_id}/dna").json()
+    assert latest["version"] == 5
+    for version in range(6):
+        snap = client.get(f"/v1/family/{family_id}/dna", params={"version": version}).json()
+        assert snap["version"] == version
+        people = snap["snapshot"].get("people")
+        assert (people is None) if version == 0 else len(people) == version - 1
+    # Checkpoints missing for older history are stored by the first replay that passes them.
+    db_session.execute(delete(FamilyDnaCheckpoint).where(FamilyDnaCheckpoint.family_id == family_id))
+    db_session.commit()
+    assert len(client.get(f"/v1/family/{family_id}/dna", params={"version": 4}).json()["snapshot"]["people"]) == 3
+    assert sorted(db_session.execute(select(FamilyDnaCheckpoint.version)).scalars().all()) == [2, 4]
+    assert client.get(f"/v1/family/{family_id}/dna", params={"version": 6}).status_code == 404
+
+    assert client.get(f"/v1/family/{family_id}/dna", params={"as_of": "2000-01-01T00:00:00Z"}).json()["version"] == 0
+    assert client.get(f"/v1/family/{family_id}/dna", params={"as_of": "2999-01-01T00:00:00Z"}).json()["version"] == 5
+
+    diff = client.get(f"/v1/family/{family_id}/dna/diff", params={"from_version": 2, "to_version": 4}).json()
+    assert [op["op"] for op in diff["patch"]] == ["add", "add"]
+    assert [op["value"]["id"] for op in diff["patch"]] == ["p2", "p3"]
+
+
+def _propose(client: TestClient, family_id: int, patch: list[dict], **extra) -> str:
+    response = client.post(f"/v1/family/{family_id}/dna/propose", json={"patch": patch, **extra})
+    assert response.status_code == 201
+    return response.json()["proposal_id"]
+
+
+def test_family_dna_commits_rebase_unless_paths_overlap(client: TestClient):
+    family_id = client.post("/v1/families", json={"name": "ConcurrentFam"}).json()["id"]
+    first = _propose(
+        client,
+        family_id,
+        [
+            {"op": "add", "path": "/people", "value": [{"id": "p0", "name": "Alex"}]},
+            {"op": "add", "path": "/goals", "value": []},
+        ],
+    )
+    assert client.post(f"/v1/family/{family_id}/dna/commit/{first}").json()["version"] == 1
+
+    # Four writers all start from version 1.
+    append_a = _propose(client, family_id, [{"op": "add", "path": "/people/-", "value": {"id": "p1", "name": "Blair"}}])
+    append_b = _propose(client, family_id, [{"op": "add", "path": "/people/-", "value": {"id": "p2", "name": "Casey"}}])
+    goal = _propose(client, family_id, [{"op": "add", "path": "/goals/-", "value": {"id": "g1", "name": "Rest", "weight": 1.0}}])
+    rename = _propose(client, family_id, [{"op": "replace", "path": "/people/0/name", "value": "Alexis"}])
+    overwrite = _propose(client, family_id, [{"op": "replace", "path": "/people", "value": []}], base_version=1)
+
+    assert [client.post(f"/v1/family/{family_id}/dna/commit/{pid}").json()["version"] for pid in (append_a, append_b, goal, rename)] == [2, 3, 4, 5]
+    snapshot = client.get(f"/v1/family/{family_id}/dna").json()["snapshot"]
+    assert [person["name"] for person in snapshot["people"]] == ["Alexis", "Blair", "Casey"]
+    assert [item["id"] for item in snapshot["goals"]] == ["g1"]
+
+    conflict = client.post(f"/v1/family/{family_id}/dna/commit/{overwrite}")
+    assert conflict.status_code == 409
+    detail = conflict.json()["detail"]
+    assert detail["base_version"] == 1 and detail["current_version"] == 5
+    assert {item["version"] for item in detail["conflicts"]} == {2, 3, 5}
+
+    # Removing an element shifts the indices after it, so an edit aimed at a later element conflicts.
+    late_edit = _propose(client, family_id, [{"op": "replace", "path": "/people/2/name", "value": "Cass"}])
+    remove_first = _propose(client, family_id, [{"op": "remove", "path": "/people/0"}])
+    assert client.post(f"/v1/family/{family_id}/dna/commit/{remove_first}").status_code == 200
+    assert client.post(f"/v1/family/{family_id}/dna/commit/{late_edit}").status_code == 409
+    assert client.post(f"/v1/family/{family_id}/dna/commit/{remove_first}").status_code == 400
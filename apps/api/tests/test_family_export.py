@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.base import Base
+from app.models.entities import Decision, Family, FamilyMember, Goal, RoadmapItem, RoleEnum
+from app.models.memory import MemoryDocument, MemoryEmbedding
+
+
+HEADERS = {"X-Internal-Admin-Token": "secret"}
+
+
+def _seed(db) -> int:
+    family = Family(name="Exported")
+    db.add(family)
+    db.flush()
+    member = FamilyMember(family_id=family.id, email="a@example.com", display_name="A", role=RoleEnum.admin)
+    goal = Goal(family_id=family.id, name="Save", description="Save money", weight=1.0, action_types=["buy"])
+    db.add_all([member, goal])
+    db.flush()
+    decision = Decision(
+        family_id=family.id, created_by_member_id=member.id, title="Tent", description="Buy a tent", tags=["camping"]
+    )
+    db.add(decision)
+    db.flush()
+    first = RoadmapItem(decision_id=decision.id, bucket="Q1", status="planned", dependencies=[])
+    db.add(first)
+    db.flush()
+    db.add(RoadmapItem(decision_id=decision.id, bucket="Q2", status="planned", dependencies=[first.id]))
+    doc = MemoryDocument(
+        family_id=family.id, type="decision", text="Decision created: Tent", entity_type="decision", entity_id=decision.id
+    )
+    db.add(doc)
+    db.flush()
+    db.add(MemoryEmbedding(doc_id=doc.doc_id, chunk_id=0, embedding=np.linspace(-1, 1, 1536, dtype=np.float32)))
+    db.commit()
+    return family.id
+
+
+def test_family_export_import_round_trip(client, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "internal_admin_token", "secret")
+    family_id = _seed(db_session)
+    bind = db_session.get_bind()
+
+    response = client.get(f"/v1/admin/families/{family_id}/export", headers=HEADERS)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["kind"] == "header" and lines[-1]["kind"] == "end"
+    assert lines[-1]["counts"]["roadmap_items"] == 2
+    dump = response.content
+
+    # Restore into a fresh database whose id sequences have already moved on.
+    db_session.close()
+    Base.metadata.drop_all(bind=bind)
+    Base.metadata.create_all(bind=bind)
+    db_session.add_all([Family(name="Other"), Family(name="Another")])
+    db_session.commit()
+
+    truncated = b"\n".join(dump.splitlines()[:-1])
+    assert client.post("/v1/admin/families/import", headers=HEADERS, content=truncated).status_code == 400
+    assert len(client.get("/v1/admin/families", headers=HEADERS).json()["items"]) == 2
+
+    response = client.post("/v1/admin/families/import", headers=HEADERS, content=dump)
+    assert response.status_code == 201, response.text
+    body = response.json()
+    new_id = body["family_id"]
+    assert new_id != family_id
+    assert body["counts"]["memory_embeddings"] == 1
+
+    decision = db_session.execute(select(Decision).where(Decision.family_id == new_id)).scalar_one()
+    member = db_session.execute(select(FamilyMember).where(FamilyMember.family_id == new_id)).scalar_one()
+    assert decision.created_by_member_id == member.id and member.role == RoleEnum.admin
+    items = db_session.execute(select(RoadmapItem).order_by(RoadmapItem.id)).scalars().all()
+    assert [item.decision_id for item in items] == [decision.id, decision.id]
+    assert items[1].dependencies == [items[0].id]
+    doc = db_session.execute(select(MemoryDocument)).scalar_one()
+    assert (doc.family_id, doc.entity_id) == (new_id, decision.id)
+    embedding = db_session.execute(select(MemoryEmbedding.embedding)).scalar_one()
+    assert np.allclose(np.asarray(embedding), np.linspace(-1, 1, 1536))
+
+    # Memory document ids are kept, so loading the same dump twice conflicts.
+    assert client.post("/v1/admin/families/import", headers=HEADERS, content=dump).status_code == 409
+    assert len(client.get("/v1/admin/families", headers=HEADERS).json()["items"]) == 3
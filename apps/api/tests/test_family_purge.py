@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.entities import AuditLog, Decision, Family, FamilyMember, Goal, RoadmapItem, RoleEnum
+from app.models.memory import MemoryDocument, MemoryEmbedding
+from app.models.notes import NoteDocument
+from app.models.purge_jobs import FamilyPurgeJob
+from app.services.purge import run_purge_job
+
+
+HEADERS = {"X-Internal-Admin-Token": "secret"}
+
+
+def _seed_family(db, name: str) -> int:
+    family = Family(name=name)
+    db.add(family)
+    db.flush()
+    member = FamilyMember(family_id=family.id, email=f"{name}@example.com", display_name=name, role=RoleEnum.admin)
+    db.add_all([member, Goal(family_id=family.id, name="Goal", description="", weight=1.0)])
+    db.flush()
+    for index in range(3):
+        decision = Decision(family_id=family.id, created_by_member_id=member.id, title=f"D{index}", description="")
+        db.add(decision)
+        db.flush()
+        db.add(RoadmapItem(decision_id=decision.id, bucket="Q1", status="planned"))
+    db.add(AuditLog(actor_member_id=member.id, entity_type="family", entity_id=family.id, action="create", changes_json="{}"))
+    doc = MemoryDocument(family_id=family.id, type="chat", text=f"{name} memory")
+    db.add(doc)
+    db.add(NoteDocument(family_id=family.id, actor="a", path=f"/{name}/note.md", item_type="note", role="user"))
+    db.flush()
+    db.add(MemoryEmbedding(doc_id=doc.doc_id, chunk_id=0, embedding=np.zeros(1536, dtype=np.float32)))
+    db.commit()
+    return family.id
+
+
+def _count(db, model, **filters) -> int:
+    query = select(func.count()).select_from(model)
+    for name, value in filters.items():
+        query = query.where(getattr(model, name) == value)
+    return int(db.execute(query).scalar_one())
+
+
+def test_background_purge_is_batched_and_scoped(client, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "internal_admin_token", "secret")
+    monkeypatch.setattr(settings, "purge_batch_size", 2)
+    doomed = _seed_family(db_session, "doomed")
+    kept = _seed_family(db_session, "kept")
+
+    response = client.delete(f"/v1/admin/families/{doomed}?background=true", headers=HEADERS)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    job = client.get(f"/v1/admin/families/purge-jobs/{job_id}", headers=HEADERS).json()
+    assert job["status"] == "completed"
+    assert job["steps_done"] == job["steps_total"]
+    assert job["deleted"]["decisions"] == 3 and job["deleted"]["roadmap_items"] == 3
+    assert job["deleted"]["memory_embeddings"] == 1 and job["deleted"]["note_documents"] == 1
+
+    db_session.expire_all()
+    assert db_session.get(Family, doomed) is None
+    assert _count(db_session, Decision, family_id=doomed) == 0
+    assert _count(db_session, MemoryDocument, family_id=doomed) == 0
+    assert _count(db_session, Decision, family_id=kept) == 3
+    assert _count(db_session, MemoryEmbedding) == 1
+    # Audit history survives, detached from the deleted member.
+    assert _count(db_session, AuditLog, entity_type="family") == 2
+    assert _count(db_session, AuditLog, entity_type="family", entity_id=doomed, actor_member_id=None) == 1
+
+
+def test_interrupted_purge_resumes_where_it_stopped(client, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "internal_admin_token", "secret")
+    family_id = _seed_family(db_session, "family")
+    # A runner that died mid-way: first steps done, heartbeat long gone.
+    job = FamilyPurgeJob(
+        family_id=family_id,
+        status="running",
+        steps_done=3,
+        deleted_counts={"audit_logs": 1, "note_embeddings": 0},
+        updated_at=datetime.now(timezone.utc) - timedelta(hours=1),
+    )
+    db_session.add(job)
+    db_session.commit()
+
+    response = client.post("/v1/admin/families/purge-jobs/resume", headers=HEADERS)
+    assert response.json() == {"resumed": [job.id]}
+    db_session.expire_all()
+    assert db_session.get(FamilyPurgeJob, job.id).status == "completed"
+    assert db_session.get(Family, family_id) is None
+    # Steps before `steps_done` were not re-run.
+    assert _count(db_session, NoteDocument, family_id=family_id) == 1
+
+    # A live runner's job is not taken over.
+    other = _seed_family(db_session, "other")
+    live = FamilyPurgeJob(family_id=other, status="running", updated_at=datetime.now(timezone.utc))
+    db_session.add(live)
+    db_session.commit()
+    assert run_purge_job(db_session, live.id).status == "running"
+    assert client.post("/v1/admin/families/purge-jobs/resume", headers=HEADERS).json() == {"resumed": []}
+    assert db_session.get(Family, other) is not None
+
@@ -2,3 +2,36 @@ def test_health_check(client):
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json()["status"] == "ok"
+
+
+def test_db_pool_health_reports_pool_stats(client):
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    pool = response.json()["pool"]
+    assert pool["pool_class"] == "InstrumentedQueuePool"
+    assert {"size", "checked_out", "checkouts", "checkout_wait_seconds_total"} <= set(pool)
+
+
+def test_instrumented_pool_records_checkout_timeouts(tmp_path):
+    import pytest
+    from sqlalchemy import create_engine
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+    from app.core.db import InstrumentedQueuePool, pool_status, pool_wait_stats
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    before = pool_wait_stats.snapshot()
+    with engine.connect():
+        assert pool_status(engine)["checked_out"] == 1
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    after = pool_wait_stats.snapshot()
+    assert after["checkouts"] == before["checkouts"] + 2
+    assert after["checkout_timeouts"] == before["checkout_timeouts"] + 1
+    assert after["checkout_wait_seconds_max"] >= 0.05
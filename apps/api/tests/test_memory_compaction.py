@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.entities import Family, FamilyMember, RoleEnum
+from app.models.memory import MemoryDocument, MemoryDocumentArchive
+from app.services.memory import compact_memory_documents, create_document_with_embeddings
+from app.services.memory_retention import apply_memory_retention
+
+
+def _family(db_session) -> int:
+    family = Family(name="Family")
+    db_session.add(family)
+    db_session.commit()
+    return family.id
+
+
+def _add(db_session, family_id: int, text: str, **entity):
+    doc = create_document_with_embeddings(db_session, family_id=family_id, type="decision", text_value=text, **entity)
+    db_session.commit()
+    return doc.doc_id
+
+
+def _count(db_session) -> int:
+    return db_session.execute(select(func.count()).select_from(MemoryDocument)).scalar_one()
+
+
+def test_identical_documents_are_stored_once(db_session):
+    family_id = _family(db_session)
+    first = _add(db_session, family_id, "Decision created: Buy a bike")
+    assert _add(db_session, family_id, "Decision created: Buy a bike") == first
+    assert _count(db_session) == 1
+
+    # Entity docs only dedup against the entity's latest version.
+    a = _add(db_session, family_id, "Decision updated: A", entity_type="decision", entity_id=7)
+    assert _add(db_session, family_id, "Decision updated: A", entity_type="decision", entity_id=7) == a
+    _add(db_session, family_id, "Decision updated: B", entity_type="decision", entity_id=7)
+    assert _add(db_session, family_id, "Decision updated: A", entity_type="decision", entity_id=7) != a
+
+
+def test_compaction_keeps_latest_doc_per_entity(client, db_session, monkeypatch):
+    family_id = _family(db_session)
+    for text in ("Decision created: v1", "Decision updated: v2", "Decision updated: v3"):
+        _add(db_session, family_id, text, entity_type="decision", entity_id=1)
+    _add(db_session, family_id, "Decision created: other", entity_type="decision", entity_id=2)
+    # A pre-dedup duplicate (rows inserted before content hashing was enforced).
+    for _ in range(2):
+        db_session.add(MemoryDocument(family_id=family_id, type="chat", text="hello", content_hash="h"))
+        db_session.commit()
+
+    monkeypatch.setattr(settings, "internal_admin_token", "secret")
+    assert client.post("/v1/admin/memory/compact").status_code == 401
+    response = client.post("/v1/admin/memory/compact", headers={"X-Internal-Admin-Token": "secret"})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["documents_removed"] == 3
+    assert report["families"] == [family_id]
+    assert report["estimated_bytes_reclaimed"] > 0
+
+    db_session.expire_all()
+    texts = sorted(db_session.execute(select(MemoryDocument.text)).scalars())
+    assert texts == ["Decision created: other", "Decision updated: v3", "hello"]
+    assert compact_memory_documents(db_session)["documents_removed"] == 0
+
+
+def test_compaction_ranks_documents_once_per_run(db_session, query_counter):
+    family_id = _family(db_session)
+    for version in range(4):
+        _add(db_session, family_id, f"Decision updated: v{version}", entity_type="decision", entity_id=1)
+
+    # Three single-row batches: each deletes and commits, but the window query runs only once.
+    with query_counter(max_repeats=10) as counter:
+        report = compact_memory_documents(db_session, family_id=family_id, batch_size=1)
+    assert report["documents_removed"] == 3
+    assert sum("row_number" in statement.lower() for statement in counter.statements) == 1
+    assert _count(db_session) == 1
+
+
+def test_retention_moves_old_documents_to_archive(client, db_session, monkeypatch):
+    family_id = _family(db_session)
+    db_session.add(FamilyMember(family_id=family_id, email="u@example.com", display_name="U", role=RoleEnum.admin))
+    old = datetime.now(timezone.utc) - timedelta(days=60)
+    db_session.add(MemoryDocument(family_id=family_id, type="chat", text="old chat about tents", created_at=old))
+    db_session.add(MemoryDocument(family_id=family_id, type="dna", text="old dna about tents", created_at=old))
+    db_session.add(MemoryDocument(family_id=family_id, type="chat", text="new chat about tents"))
+    db_session.commit()
+
+    def search(**extra):
+        response = client.post(
+            f"/v1/family/{family_id}/memory/search",
+            headers={"X-Dev-User": "u@example.com"},
+            json={"query": "tents", **extra},
+        )
+        assert response.status_code == 200
+        return sorted(item["text"] for item in response.json()["items"])
+
+    monkeypatch.setattr(settings, "memory_hot_retention_days", {"chat": 30})
+    report = apply_memory_retention(db_session)
+    assert report["archived"] == {"chat": 1}
+    assert report["families"] == [family_id]
+    assert db_session.execute(select(MemoryDocumentArchive.text)).scalars().all() == ["old chat about tents"]
+
+    assert search() == ["new chat about tents", "old dna about tents"]
+    assert search(include_archive=True) == ["new chat about tents", "old chat about tents", "old dna about tents"]
+
+    monkeypatch.setattr(settings, "memory_archive_retention_days", 45)
+    assert apply_memory_retention(db_session)["expired"] == 1
+    assert search(include_archive=True) == ["new chat about tents", "old dna about tents"]
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.models.entities import Family, FamilyMember, RoleEnum
+from app.models.memory import MemoryDocument
+from app.services.rerank import collapse_by_document, mmr_order
+
+
+def test_mmr_prefers_diverse_candidates():
+    query = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    candidates = np.array(
+        [
+            [0.9, 0.1, 0.0],  # relevant
+            [0.9, 0.11, 0.0],  # near-duplicate of the first
+            [0.7, 0.0, 0.7],  # less relevant, different direction
+        ],
+        dtype=np.float32,
+    )
+    assert mmr_order(query, candidates, 2, lambda_=1.0) == [0, 1]
+    assert mmr_order(query, candidates, 2, lambda_=0.5) == [0, 2]
+    assert mmr_order(query, candidates[:0], 2) == []
+
+
+def test_collapse_keeps_best_chunk_per_document():
+    candidates = [{"doc_id": "a", "chunk_id": 0}, {"doc_id": "a", "chunk_id": 1}, {"doc_id": "b", "chunk_id": 0}]
+    assert [(c["doc_id"], c["chunk_id"]) for c in collapse_by_document(candidates, 5)] == [("a", 0), ("b", 0)]
+
+
+def test_memory_search_filters_and_diversity(client, db_session):
+    family = Family(name="Family")
+    db_session.add(family)
+    db_session.flush()
+    db_session.add(FamilyMember(family_id=family.id, email="u@example.com", display_name="U", role=RoleEnum.admin))
+    now = datetime.now(timezone.utc)
+    long_text = "\n\n".join(f"Paragraph {i} about the camping trip. " * 40 for i in range(4))
+    db_session.add_all(
+        [
+            MemoryDocument(family_id=family.id, type="chat", text=long_text, created_at=now),
+            MemoryDocument(
+                family_id=family.id,
+                type="decision",
+                text="Decision created: tent",
+                source_refs_jsonb=[{"kind": "decision", "id": 4}],
+                created_at=now - timedelta(days=10),
+            ),
+            MemoryDocument(family_id=family.id, type="dna", text="Family values outdoors", created_at=now),
+        ]
+    )
+    db_session.commit()
+
+    def search(**payload):
+        response = client.post(
+            f"/v1/family/{family.id}/memory/search",
+            headers={"X-Dev-User": "u@example.com"},
+            json={"query": "camping", **payload},
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["items"]
+
+    raw = search(diversity="none", top_k=20)
+    collapsed = search(top_k=20)
+    assert len(raw) > len(collapsed) == 3
+    assert len({item["doc_id"] for item in collapsed}) == 3
+    assert len(search(diversity="mmr", top_k=3)) == 3
+
+    assert {item["metadata"]["type"] for item in search(types=["decision", "dna"])} == {"decision", "dna"}
+    assert [item["text"] for item in search(source_ref={"kind": "decision", "id": 4})] == ["Decision created: tent"]
+    recent = search(created_from=(now - timedelta(days=1)).isoformat())
+    assert {item["metadata"]["type"] for item in recent} == {"chat", "dna"}
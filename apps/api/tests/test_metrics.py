@@ -0,0 +1,32 @@
+from app.core.metrics import registry
+
+
+def _sample(name: str, labels: dict[str, str]) -> float:
+    return registry.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_labels_requests_by_route_template_and_counts_queries(client):
+    family_id = client.post("/v1/families", json={"name": "Household"}).json()["id"]
+    labels = {"method": "GET", "route": "/v1/families/{family_id}"}
+    before_count = _sample("api_request_db_queries_count", labels)
+    before_sum = _sample("api_request_db_queries_sum", labels)
+
+    assert client.get(f"/v1/families/{family_id}").status_code == 200
+
+    assert _sample("api_request_db_queries_count", labels) == before_count + 1
+    assert _sample("api_request_db_queries_sum", labels) > before_sum
+    assert _sample("api_request_duration_seconds_count", {**labels, "status": "200"}) >= 1
+
+    body = client.get("/metrics").text
+    assert 'route="/v1/families/{family_id}"' in body
+    assert f'route="/v1/families/{family_id}"' not in body
+    assert "api_db_pool_checkouts" in body
+    assert "api_request_db_seconds_sum" in body
+
+
+def test_embedding_calls_are_counted():
+    from app.services.embeddings import embed_texts
+
+    before = _sample("api_embedding_texts_total", {"provider": "hash"})
+    embed_texts(["alpha", "beta"])
+    assert _sample("api_embedding_texts_total", {"provider": "hash"}) == before + 2
@@ -0,0 +1,51 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import db as db_module
+from app.core.db import CONSISTENCY_TOKEN_COOKIE, CONSISTENCY_TOKEN_HEADER
+from app.models.base import Base
+
+
+def _replica(monkeypatch):
+    # A lagging "replica": its own empty database, so reads it serves don't see primary writes.
+    replica_engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=replica_engine)
+    monkeypatch.setattr(db_module, "ReplicaSessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=replica_engine))
+    return replica_engine
+
+
+def test_reads_use_primary_without_replica(client):
+    created = client.post("/v1/families", json={"name": "Household"})
+    assert created.status_code == 201
+    assert CONSISTENCY_TOKEN_HEADER not in created.headers
+    assert len(client.get("/v1/families").json()["items"]) == 1
+
+
+def test_writes_return_consistency_token_and_reads_stay_on_primary(client, monkeypatch):
+    _replica(monkeypatch)
+    monkeypatch.setattr(db_module.settings, "replica_max_lag_seconds", 60.0)
+
+    created = client.post("/v1/families", json={"name": "Household"})
+    assert created.status_code == 201
+    token = created.headers[CONSISTENCY_TOKEN_HEADER]
+    assert token.startswith("ts:")
+    assert client.cookies.get(CONSISTENCY_TOKEN_COOKIE) == token
+
+    # The cookie carries the token: the client reads its own write from the primary.
+    assert len(client.get("/v1/families").json()["items"]) == 1
+
+    # Without a token the read is served by the (stale) replica.
+    client.cookies.clear()
+    assert client.get("/v1/families").json()["items"] == []
+    assert CONSISTENCY_TOKEN_HEADER not in client.get("/v1/families").headers
+
+
+def test_replica_serves_token_older_than_lag_window(client, monkeypatch):
+    _replica(monkeypatch)
+    monkeypatch.setattr(db_module.settings, "replica_max_lag_seconds", 0.0)
+
+    token = client.post("/v1/families", json={"name": "Household"}).headers[CONSISTENCY_TOKEN_HEADER]
+    client.cookies.clear()
+    resp = client.get("/v1/families", headers={CONSISTENCY_TOKEN_HEADER: token})
+    assert resp.json()["items"] == []
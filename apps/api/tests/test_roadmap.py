@@ -221,3 +221,76 @@ def test_unschedule_after_done_does_not_refund_discretionary_budget(client):
     member_summary = next(item for item in final_summary["members"] if item["member_id"] == member["id"])
     assert member_summary["used"] == 1
     assert member_summary["remaining"] == 1
+
+
+def test_roadmap_dependency_graph_and_cycle_detection(client, query_counter):
+    family = client.post("/v1/families", json={"name": "Graph Family"}).json()
+    member = client.post(
+        f"/v1/families/{family['id']}/members",
+        json={"email": "graph@example.com", "display_name": "Grapher", "role": "editor"},
+    ).json()
+    client.put(
+        f"/v1/budgets/families/{family['id']}/policy",
+        json={
+            "threshold_1_to_5": 4.0,
+            "period_days": 30,
+            "default_allowance": 5,
+            "member_allowances": [{"member_id": member["id"], "allowance": 5}],
+        },
+    )
+
+    item_ids = []
+    for title in ["Foundation", "Framing", "Roofing"]:
+        decision = client.post(
+            "/v1/decisions",
+            json={
+                "family_id": family["id"],
+                "created_by_member_id": member["id"],
+                "title": title,
+                "description": f"{title} step",
+            },
+        ).json()
+        created = client.post(
+            "/v1/roadmap",
+            json={
+                "decision_id": decision["id"],
+                "bucket": "2026-Q3",
+                "status": "Scheduled",
+                "dependencies": item_ids[-1:],
+                "use_discretionary_budget": True,
+            },
+        )
+        assert created.status_code == 201
+        item_ids.append(created.json()["id"])
+    foundation, framing, roofing = item_ids
+
+    with query_counter(max_queries=2):
+        listed = client.get(f"/v1/roadmap?family_id={family['id']}")
+    assert len(listed.json()["items"]) == 3
+
+    with query_counter(max_queries=4):
+        blockers = client.get(f"/v1/roadmap/{roofing}/blockers")
+    assert blockers.status_code == 200
+    assert [item["id"] for item in blockers.json()["items"]] == [foundation, framing]
+    assert blockers.json()["blocked"] is True
+
+    dependents = client.get(f"/v1/roadmap/{foundation}/dependents")
+    assert dependents.status_code == 200
+    assert [item["id"] for item in dependents.json()["items"]] == [framing, roofing]
+
+    cycle = client.patch(f"/v1/roadmap/{foundation}", json={"dependencies": [roofing]})
+    assert cycle.status_code == 400
+    assert "cycle" in cycle.json()["detail"]
+
+    self_dependency = client.patch(f"/v1/roadmap/{framing}", json={"dependencies": [framing]})
+    assert self_dependency.status_code == 400
+
+    for done_id in (foundation, framing):
+        assert client.patch(f"/v1/roadmap/{done_id}", json={"status": "Done"}).status_code == 200
+    assert client.get(f"/v1/roadmap/{roofing}/blockers").json()["blocked"] is False
+
+    assert client.delete(f"/v1/roadmap/{framing}").status_code == 204
+    dependents = client.get(f"/v1/roadmap/{foundation}/dependents").json()
+    assert dependents["items"] == []
+    blockers = client.get(f"/v1/roadmap/{roofing}/blockers").json()
+    assert blockers["missing_item_ids"] == [framing]
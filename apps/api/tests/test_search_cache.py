@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.core.metrics import SEARCH_CACHE_REQUESTS
+from app.models.entities import Family, FamilyMember, RoleEnum
+from app.services import search_cache
+from app.services.vector_store import local_store
+
+
+def _seed_family(db_session):
+    family = Family(name="Family")
+    db_session.add(family)
+    db_session.flush()
+    db_session.add(FamilyMember(family_id=family.id, email="u@example.com", display_name="User", role=RoleEnum.admin))
+    db_session.commit()
+    return family
+
+
+def _note(family_id: int, path: str, title: str) -> dict:
+    return {
+        "family_id": family_id,
+        "actor": "u@example.com",
+        "path": path,
+        "item_type": "polished",
+        "role": "polished",
+        "title": title,
+        "summary": title,
+        "body_text": title,
+        "source_date": "2026-02-22",
+    }
+
+
+def _query(family_id: int, query: str) -> dict:
+    return {"family_id": family_id, "actor": "u@example.com", "query": query, "top_k": 5}
+
+
+def _index(client, family_id: int, path: str, title: str):
+    response = client.post("/v1/notes/index", headers={"X-Dev-User": "u@example.com"}, json=_note(family_id, path, title))
+    assert response.status_code == 201
+
+
+def _search(client, family_id: int, query: str):
+    response = client.post("/v1/notes/search", headers={"X-Dev-User": "u@example.com"}, json=_query(family_id, query))
+    assert response.status_code == 200
+    return [item["path"] for item in response.json()["items"]]
+
+
+def _hits(cache: str) -> float:
+    return SEARCH_CACHE_REQUESTS.labels(cache, "hit")._value.get()
+
+
+def test_repeated_note_search_is_served_from_cache_until_a_write(client, db_session):
+    family = _seed_family(db_session)
+    _index(client, family.id, "/Notes/soccer.md", "Soccer practice schedule")
+
+    before = _hits("notes")
+    assert _search(client, family.id, "Soccer  schedule") == ["/Notes/soccer.md"]
+    # Same query modulo case/whitespace: answered from the result cache.
+    assert _search(client, family.id, "soccer schedule") == ["/Notes/soccer.md"]
+    assert _hits("notes") == before + 1
+
+    # Indexing bumps the family's generation, so the next search sees the new note.
+    _index(client, family.id, "/Notes/soccer-2.md", "Soccer tournament schedule")
+    assert sorted(_search(client, family.id, "soccer schedule")) == ["/Notes/soccer-2.md", "/Notes/soccer.md"]
+    assert _hits("notes") == before + 1
+
+
+def test_rolled_back_writes_do_not_invalidate(db_session):
+    family = _seed_family(db_session)
+    search_cache.bump_generation("notes", family.id)
+    key = f"search:gen:notes:{family.id}"
+    generation = search_cache.backend().get(key)
+
+    from app.models.notes import NoteDocument
+
+    db_session.add(NoteDocument(family_id=family.id, actor="u@example.com", path="/x.md", item_type="raw", role="inbox"))
+    db_session.flush()
+    db_session.rollback()
+    assert search_cache.backend().get(key) == generation
+
+
+def test_batched_note_writes_reach_search_only_once_the_batch_commits(client, db_session):
+    family = _seed_family(db_session)
+    _index(client, family.id, "/Notes/soccer.md", "Soccer practice schedule")
+    assert _search(client, family.id, "soccer schedule") == ["/Notes/soccer.md"]
+    key = f"search:gen:notes:{family.id}"
+    generation = search_cache.backend().get(key)
+
+    write_then_search = [
+        {"method": "POST", "path": "/notes/index", "body": _note(family.id, "/Notes/soccer-2.md", "Soccer tournament schedule")},
+        {"method": "POST", "path": "/notes/search", "body": _query(family.id, "soccer schedule")},
+    ]
+    failing = write_then_search + [{"method": "GET", "path": "/families/999999"}]
+    response = client.post("/v1/batch", headers={"X-Dev-User": "u@example.com"}, json={"operations": failing})
+    assert response.status_code == 404
+    # The rolled-back note neither invalidated the cache nor reached the local vector store.
+    assert search_cache.backend().get(key) == generation
+    assert _search(client, family.id, "soccer schedule") == ["/Notes/soccer.md"]
+    assert len(local_store()._collection("notes", family.id).doc_rows) == 1
+
+    response = client.post("/v1/batch", headers={"X-Dev-User": "u@example.com"}, json={"operations": write_then_search})
+    assert response.status_code == 200
+    assert search_cache.backend().get(key) != generation
+    assert sorted(_search(client, family.id, "soccer schedule")) == ["/Notes/soccer-2.md", "/Notes/soccer.md"]
+    assert len(local_store()._collection("notes", family.id).doc_rows) == 2
+
+
+def test_query_embedding_cache_reuses_vectors():
+    first = search_cache.embed_query("Where is the  permit?", dim=32)
+    before = _hits("query_embedding")
+    second = search_cache.embed_query("where is the permit?", dim=32)
+    assert _hits("query_embedding") == before + 1
+    np.testing.assert_array_equal(first, second)
+
+    # A cold cache gives the same vector whichever spelling comes first.
+    search_cache.reset_backend()
+    np.testing.assert_array_equal(search_cache.embed_query("where is the permit?", dim=32), first)
+
+
+def test_cache_errors_fall_back_to_computing(monkeypatch):
+    class Broken:
+        def get(self, key):
+            raise ConnectionError("redis down")
+
+    monkeypatch.setattr(search_cache, "_backend", Broken())
+    calls = []
+    for _ in range(2):
+        value = search_cache.cached_results("memory", 1, query="q", filters={}, top_k=3, compute=lambda: calls.append(1) or [1])
+        assert value == [1]
+    assert len(calls) == 2
+    # The breaker stays open after the first failure instead of retrying every request.
+    assert not search_cache._available()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.services.vector_store import LocalVectorStore
+
+
+def _rows(matrix: np.ndarray) -> list[tuple[int, np.ndarray, str]]:
+    return [(index, vector, f"chunk {index}") for index, vector in enumerate(matrix)]
+
+
+def test_local_store_matches_exact_search_and_persists(tmp_path):
+    rng = np.random.default_rng(3)
+    a, b = rng.normal(size=(5, 16)).astype(np.float32), rng.normal(size=(4, 16)).astype(np.float32)
+    query = rng.normal(size=16).astype(np.float32)
+
+    store = LocalVectorStore(tmp_path)
+    store.replace("memory", 1, "a", _rows(a))
+    store.replace("memory", 1, "b", _rows(b))
+    store.replace("memory", 2, "c", _rows(b))  # other family, never returned
+
+    hits = store.search("memory", 1, query, limit=3)
+    expected = np.sort(np.linalg.norm(np.vstack([a, b]) - query, axis=1))[:3]
+    np.testing.assert_allclose([hit.distance for hit in hits], expected, rtol=1e-5)
+    assert {hit.doc_id for hit in store.search("memory", 1, query, limit=20, doc_ids={"b"})} == {"b"}
+
+    # Re-indexing replaces a document's rows; discards and re-indexes survive a reload from disk.
+    store.replace("memory", 1, "a", _rows(a[:2]))
+    store.discard("memory", 1, ["b"])
+    reloaded = LocalVectorStore(tmp_path)
+    hits = reloaded.search("memory", 1, query, limit=20, with_vectors=True)
+    assert sorted((hit.doc_id, hit.chunk_id) for hit in hits) == [("a", 0), ("a", 1)]
+    np.testing.assert_array_equal(hits[0].vector, a[hits[0].chunk_id])
+    assert reloaded.has("memory", 2, "c") and not reloaded.has("memory", 1, "b")
+
+
+def test_local_store_recovers_from_a_crash_between_appends(tmp_path):
+    rng = np.random.default_rng(5)
+    a, b, orphan = (rng.normal(size=(2, 8)).astype(np.float32) for _ in range(3))
+    store = LocalVectorStore(tmp_path)
+    store.replace("memory", 1, "a", _rows(a))
+    collection = tmp_path / "memory" / "1"
+    # Crash after the vectors were appended but before their rows (and mid-write of a tombstone).
+    with (collection / "vectors.f32").open("ab") as handle:
+        handle.write(orphan.tobytes() + b"\x00\x01")
+    with (collection / "rows.jsonl").open("a") as handle:
+        handle.write('{"deleted": "a"')
+
+    restarted = LocalVectorStore(tmp_path)
+    assert restarted.has("memory", 1, "a")
+    assert (collection / "vectors.f32").stat().st_size == a.nbytes
+    restarted.replace("memory", 1, "b", _rows(b))
+
+    reloaded = LocalVectorStore(tmp_path)
+    hits = reloaded.search("memory", 1, b[1], limit=1)
+    assert (hits[0].doc_id, hits[0].chunk_id) == ("b", 1)
+    assert hits[0].distance < 1e-5
+    assert reloaded.has("memory", 1, "a")
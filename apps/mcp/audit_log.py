@@ -0,0 +1,290 @@
+"""
+Append-only JSONL audit log for the MCP server.
+
+Tool calls hand events to `AuditLogWriter.write`, which only enqueues them; a background thread drains the
+queue, writes each batch with a single `write` (so lines from concurrent tools never interleave), flushes,
+and fsyncs at most every `fsync_seconds`. When the queue is full, events are dropped rather than blocking a
+tool, and an `audit_events_dropped` line records how many were lost.
+
+The active file is rotated once it reaches `max_bytes` or its first record is `rotate_seconds` old (checked
+after writes and while idle, across restarts): it is renamed to `<path>.<UTC timestamp>` and, with `compress="zstd"`, compressed to `<path>.<UTC timestamp>.zst`.
+`iter_audit_events` (or `python audit_log.py`) streams all segments oldest first, with optional filters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import glob
+import io
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+_SEGMENT_FORMAT = "%Y%m%dT%H%M%S%fZ"
+_STOP = object()
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise RuntimeError("zstd compression of audit segments requires the `zstandard` package") from exc
+    return zstandard
+
+
+class AuditLogWriter:
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_bytes: int = 50 * 1024 * 1024,
+        rotate_seconds: float = 86400.0,
+        compress: str = "",
+        fsync_seconds: float = 1.0,
+        queue_size: int = 10000,
+        batch_size: int = 500,
+    ) -> None:
+        if compress not in {"", "zstd"}:
+            raise ValueError(f"unsupported audit log compression: {compress}")
+        if compress:
+            _zstd()
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self.fsync_seconds = fsync_seconds
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._handle: io.BufferedWriter | None = None
+        self._started_at = 0.0
+        self._last_fsync = 0.0
+        self._thread = threading.Thread(target=self._run, name="mcp-audit-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, row: dict[str, Any]) -> bool:
+        """Queue one event; returns False (and counts it) if the queue is full."""
+        line = (json.dumps(row, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            with self._dropped_lock:
+                self._dropped += 1
+            return False
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write everything queued so far, fsync and stop the thread."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.fsync_seconds)
+            except queue.Empty:
+                self._sync(force=False)
+                self._rotate_if_due()
+                continue
+            batch: list[bytes] = []
+            item = first
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+        self._sync(force=True)
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _write_batch(self, batch: list[bytes]) -> None:
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            marker = {"ts": datetime.now(timezone.utc).isoformat(), "event_type": "audit_events_dropped", "count": dropped}
+            batch.append((json.dumps(marker, separators=(",", ":")) + "\n").encode("utf-8"))
+        if not batch:
+            return
+        try:
+            handle = self._open()
+            handle.write(b"".join(batch))
+            handle.flush()
+            self._sync(force=False)
+            self._rotate_if_due()
+        except OSError as exc:
+            # The audit trail must never take the tools down with it; report and keep going.
+            print(f"mcp audit log: failed to write {len(batch)} events: {exc}", file=sys.stderr)
+            with self._dropped_lock:
+                self._dropped += len(batch)
+
+    def _open(self) -> io.BufferedWriter:
+        if self._handle is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._handle = open(self.path, "ab")
+            # The file's age counts from its first record, not from when this process opened it.
+            self._started_at = self._first_record_time() or time.time()
+            self._last_fsync = time.monotonic()
+        return self._handle
+
+    def _first_record_time(self) -> float | None:
+        try:
+            with open(self.path, "rb") as handle:
+                return _parse_ts(json.loads(handle.readline())["ts"]).timestamp()
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _rotate_if_due(self) -> None:
+        """Rotate once the active file is big or old enough; also called while idle, so quiet servers rotate too."""
+        try:
+            if self._handle is None:
+                if not os.path.exists(self.path):
+                    return
+                self._open()
+            size = self._handle.tell()
+            if size and (size >= self.max_bytes or time.time() - self._started_at >= self.rotate_seconds):
+                self._rotate()
+        except OSError as exc:
+            print(f"mcp audit log: failed to rotate {self.path}: {exc}", file=sys.stderr)
+
+    def _sync(self, *, force: bool) -> None:
+        if self._handle is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_fsync >= self.fsync_seconds:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._last_fsync = now
+
+    def _rotate(self) -> None:
+        self._sync(force=True)
+        self._handle.close()
+        self._handle = None
+        stamp = datetime.now(timezone.utc).strftime(_SEGMENT_FORMAT)
+        segment = f"{self.path}.{stamp}"
+        os.replace(self.path, segment)
+        if self.compress == "zstd":
+            zstandard = _zstd()
+            with open(segment, "rb") as source, open(f"{segment}.zst.tmp", "wb") as target:
+                zstandard.ZstdCompressor().copy_stream(source, target)
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(f"{segment}.zst.tmp", f"{segment}.zst")
+            os.remove(segment)
+
+
+def build_writer(path: str, **options: Any) -> AuditLogWriter:
+    writer = AuditLogWriter(path, **options)
+    atexit.register(writer.close)
+    return writer
+
+
+def _segment_time(path: str, base: str) -> datetime | None:
+    stamp = path[len(base) + 1 :].removesuffix(".zst")
+    try:
+        return datetime.strptime(stamp, _SEGMENT_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def audit_segments(path: str) -> list[str]:
+    """Rotated segments oldest first, then the active file."""
+    rotated = [
+        candidate
+        for candidate in glob.glob(f"{glob.escape(path)}.*")
+        if _segment_time(candidate, path) is not None
+    ]
+    rotated.sort(key=lambda candidate: _segment_time(candidate, path))
+    return rotated + ([path] if os.path.exists(path) else [])
+
+
+def _read_lines(segment: str) -> Iterator[str]:
+    if segment.endswith(".zst"):
+        with open(segment, "rb") as raw:
+            reader = _zstd().ZstdDecompressor().stream_reader(raw)
+            yield from io.TextIOWrapper(reader, encoding="utf-8")
+        return
+    with open(segment, encoding="utf-8") as handle:
+        yield from handle
+
+
+def _parse_ts(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def iter_audit_events(
+    path: str,
+    *,
+    event_type: str | None = None,
+    proposal_id: str | None = None,
+    actor_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Stream events from every segment, oldest first, keeping those matching all given filters."""
+    for segment in audit_segments(path):
+        rotated_at = _segment_time(segment, path)
+        if since is not None and rotated_at is not None and rotated_at < since:
+            continue
+        for line in _read_lines(segment):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue  # torn last line after a crash
+            if event_type is not None and row.get("event_type") != event_type:
+                continue
+            if proposal_id is not None and row.get("proposal_id") != proposal_id:
+                continue
+            if actor_id is not None and row.get("actor_id") != actor_id:
+                continue
+            if since is not None or until is not None:
+                ts = _parse_ts(row["ts"])
+                if (since is not None and ts < since) or (until is not None and ts >= until):
+                    continue
+            yield row
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Print MCP audit events (all segments, oldest first) as JSONL.")
+    parser.add_argument("--path", default=os.getenv("DECISION_MCP_AUDIT_LOG_PATH", ".decision_mcp_audit.jsonl"))
+    parser.add_argument("--event-type")
+    parser.add_argument("--proposal-id")
+    parser.add_argument("--actor-id")
+    parser.add_argument("--since", type=_parse_ts, help="ISO timestamp, inclusive")
+    parser.add_argument("--until", type=_parse_ts, help="ISO timestamp, exclusive")
+    args = parser.parse_args(argv)
+    for row in iter_audit_events(
+        args.path,
+        event_type=args.event_type,
+        proposal_id=args.proposal_id,
+        actor_id=args.actor_id,
+        since=args.since,
+        until=args.until,
+    ):
+        sys.stdout.write(json.dumps(row, separators=(",", ":")) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,130 @@
+"""
+Proposal persistence for the MCP server.
+
+Proposals are stored as JSON with a version number. Every status transition is a compare-and-set on that
+version, so two server replicas (or two tool calls racing in one) cannot both confirm or commit the same
+proposal. Entries expire: open proposals after DECISION_MCP_PROPOSAL_TTL_SECONDS, finished ones
+(committed/canceled) after DECISION_MCP_PROPOSAL_RETENTION_SECONDS.
+
+With DECISION_MCP_REDIS_URL set the store is Redis and survives restarts and is shared by replicas;
+without it, an in-process store keeps the single-process stdio setup dependency-free.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Protocol
+
+
+class ProposalConflict(ValueError):
+    """The proposal changed since it was read (another replica or call won the transition)."""
+
+
+class ProposalStore(Protocol):
+    def create(self, proposal_id: str, data: dict[str, Any], ttl_seconds: int) -> int: ...
+
+    def get(self, proposal_id: str) -> tuple[dict[str, Any], int] | None: ...
+
+    def compare_and_set(self, proposal_id: str, data: dict[str, Any], expected_version: int, ttl_seconds: int) -> int: ...
+
+
+class MemoryProposalStore:
+    def __init__(self, clock=time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._items: dict[str, tuple[dict[str, Any], int, float]] = {}
+
+    def _sweep(self, now: float) -> None:
+        for proposal_id in [key for key, (_, _, expires) in self._items.items() if expires <= now]:
+            del self._items[proposal_id]
+
+    def create(self, proposal_id: str, data: dict[str, Any], ttl_seconds: int) -> int:
+        with self._lock:
+            now = self._clock()
+            self._sweep(now)
+            if proposal_id in self._items:
+                raise ProposalConflict(f"proposal already exists: {proposal_id}")
+            self._items[proposal_id] = (json.loads(json.dumps(data)), 1, now + ttl_seconds)
+            return 1
+
+    def get(self, proposal_id: str) -> tuple[dict[str, Any], int] | None:
+        with self._lock:
+            item = self._items.get(proposal_id)
+            if item is None or item[2] <= self._clock():
+                self._items.pop(proposal_id, None)
+                return None
+            return json.loads(json.dumps(item[0])), item[1]
+
+    def compare_and_set(self, proposal_id: str, data: dict[str, Any], expected_version: int, ttl_seconds: int) -> int:
+        with self._lock:
+            now = self._clock()
+            item = self._items.get(proposal_id)
+            if item is None or item[2] <= now or item[1] != expected_version:
+                raise ProposalConflict(f"proposal {proposal_id} changed concurrently or expired; fetch it again")
+            self._items[proposal_id] = (json.loads(json.dumps(data)), expected_version + 1, now + ttl_seconds)
+            return expected_version + 1
+
+
+# KEYS[1] = proposal hash; ARGV = JSON, ttl seconds.
+_CREATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  return 0
+end
+redis.call('HSET', KEYS[1], 'version', 1, 'data', ARGV[1])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+return 1
+"""
+
+# KEYS[1] = proposal hash; ARGV = expected version, new JSON, ttl seconds.
+_CAS_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'version')
+if not current or tonumber(current) ~= tonumber(ARGV[1]) then
+  return 0
+end
+local version = tonumber(current) + 1
+redis.call('HSET', KEYS[1], 'version', version, 'data', ARGV[2])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return version
+"""
+
+
+class RedisProposalStore:
+    """`{prefix}{id}` hashes holding `version` and `data`; transitions are one Lua script (atomic on the server)."""
+
+    def __init__(self, url: str, *, prefix: str = "mcp:proposal:") -> None:
+        import redis
+
+        self._redis = redis.Redis.from_url(url, socket_timeout=5.0, socket_connect_timeout=5.0)
+        self._prefix = prefix
+        self._create = self._redis.register_script(_CREATE_SCRIPT)
+        self._cas = self._redis.register_script(_CAS_SCRIPT)
+
+    def _key(self, proposal_id: str) -> str:
+        return f"{self._prefix}{proposal_id}"
+
+    def create(self, proposal_id: str, data: dict[str, Any], ttl_seconds: int) -> int:
+        created = self._create(keys=[self._key(proposal_id)], args=[json.dumps(data, separators=(",", ":")), ttl_seconds])
+        if not created:
+            raise ProposalConflict(f"proposal already exists: {proposal_id}")
+        return 1
+
+    def get(self, proposal_id: str) -> tuple[dict[str, Any], int] | None:
+        version, data = self._redis.hmget(self._key(proposal_id), ["version", "data"])
+        if version is None or data is None:
+            return None
+        return json.loads(data), int(version)
+
+    def compare_and_set(self, proposal_id: str, data: dict[str, Any], expected_version: int, ttl_seconds: int) -> int:
+        version = self._cas(
+            keys=[self._key(proposal_id)],
+            args=[expected_version, json.dumps(data, separators=(",", ":")), ttl_seconds],
+        )
+        if not version:
+            raise ProposalConflict(f"proposal {proposal_id} changed concurrently or expired; fetch it again")
+        return int(version)
+
+
+def build_store(redis_url: str | None) -> ProposalStore:
+    return RedisProposalStore(redis_url) if redis_url else MemoryProposalStore()
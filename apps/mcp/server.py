@@ -1,20 +1,40 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import os
-import threading
 import uuid
 from datetime import datetime, timezone
 from typing import Any, Literal
 
-import requests
+import httpx
 from mcp.server.fastmcp import FastMCP
 from pydantic import BaseModel, Field
 
+from audit_log import build_writer
+from proposal_store import ProposalConflict, build_store
+
 SERVER_NAME = "decision-system-mcp"
 API_BASE = os.getenv("DECISION_API_BASE_URL", "http://localhost:8000/v1").rstrip("/")
 REQUEST_TIMEOUT_SECONDS = float(os.getenv("DECISION_MCP_HTTP_TIMEOUT_SECONDS", "20"))
+# Keep-alive pool per process; retries (with exponential backoff) never repeat non-idempotent requests
+# the API may have received.
+HTTP_POOL_SIZE = int(os.getenv("DECISION_MCP_HTTP_POOL_SIZE", "10"))
+HTTP_RETRIES = int(os.getenv("DECISION_MCP_HTTP_RETRIES", "3"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("DECISION_MCP_HTTP_BACKOFF_SECONDS", "0.3"))
 AUDIT_LOG_PATH = os.getenv("DECISION_MCP_AUDIT_LOG_PATH", ".decision_mcp_audit.jsonl")
+AUDIT_MAX_BYTES = int(os.getenv("DECISION_MCP_AUDIT_MAX_BYTES", str(50 * 1024 * 1024)))
+AUDIT_ROTATE_SECONDS = float(os.getenv("DECISION_MCP_AUDIT_ROTATE_SECONDS", "86400"))
+AUDIT_COMPRESS = os.getenv("DECISION_MCP_AUDIT_COMPRESS", "").strip().lower()
+AUDIT_FSYNC_SECONDS = float(os.getenv("DECISION_MCP_AUDIT_FSYNC_SECONDS", "1.0"))
+AUDIT_QUEUE_SIZE = int(os.getenv("DECISION_MCP_AUDIT_QUEUE_SIZE", "10000"))
+# Shared proposal store (unset: in-process, lost on restart). Open proposals expire after the TTL;
+# committed/canceled ones stay readable for the retention period.
+REDIS_URL = os.getenv("DECISION_MCP_REDIS_URL", "")
+PROPOSAL_TTL_SECONDS = int(os.getenv("DECISION_MCP_PROPOSAL_TTL_SECONDS", "86400"))
+PROPOSAL_RETENTION_SECONDS = int(os.getenv("DECISION_MCP_PROPOSAL_RETENTION_SECONDS", "604800"))
+# A commit still in flight after this long is presumed dead (its replica stopped) and may be taken over.
+# Keep it above the API timeout times the connection retries.
+COMMIT_STALE_SECONDS = float(os.getenv("DECISION_MCP_COMMIT_STALE_SECONDS", "120"))
 
 OperationType = Literal[
     "create_family",
@@ -48,14 +68,18 @@ class Proposal(BaseModel):
     actor_id: str
     actor_name: str | None = None
     rationale: str
-    status: Literal["proposed", "confirmed", "committed", "canceled"] = "proposed"
+    status: Literal["proposed", "confirmed", "committing", "committed", "canceled"] = "proposed"
     operations: list[Operation]
     operation_preview: list[str]
     allow_destructive: bool = False
     created_at: str
     confirmed_at: str | None = None
     committed_at: str | None = None
+    # Set while a commit request is in flight; cleared when it ends without a known outcome.
+    commit_started_at: str | None = None
     commit_results: list[dict[str, Any]] = Field(default_factory=list)
+    # Store version this copy was read at; every save is a compare-and-set against it.
+    version: int = 0
 
 
 class _OperationPlan(BaseModel):
@@ -67,8 +91,15 @@ class _OperationPlan(BaseModel):
 
 
 mcp = FastMCP(SERVER_NAME)
-_proposal_lock = threading.Lock()
-_proposals: dict[str, Proposal] = {}
+_store = build_store(REDIS_URL or None)
+_audit = build_writer(
+    AUDIT_LOG_PATH,
+    max_bytes=AUDIT_MAX_BYTES,
+    rotate_seconds=AUDIT_ROTATE_SECONDS,
+    compress=AUDIT_COMPRESS,
+    fsync_seconds=AUDIT_FSYNC_SECONDS,
+    queue_size=AUDIT_QUEUE_SIZE,
+)
 
 
 def _now_iso() -> str:
@@ -76,47 +107,110 @@ def _now_iso() -> str:
 
 
 def _append_audit_event(event_type: str, payload: dict[str, Any]) -> None:
-    row = {"ts": _now_iso(), "event_type": event_type, **payload}
-    with open(AUDIT_LOG_PATH, "a", encoding="utf-8") as handle:
-        handle.write(json.dumps(row, separators=(",", ":")) + "\n")
+    _audit.write({"ts": _now_iso(), "event_type": event_type, **payload})
 
 
-def _request(
-    method: str,
-    path: str,
-    actor_id: str,
-    actor_name: str | None,
-    body: dict[str, Any] | None = None,
-    query: dict[str, Any] | None = None,
-) -> dict[str, Any]:
+def _proposal_ttl(proposal: Proposal) -> int:
+    return PROPOSAL_RETENTION_SECONDS if proposal.status in {"committed", "canceled"} else PROPOSAL_TTL_SECONDS
+
+
+def _load_proposal(proposal_id: str) -> Proposal:
+    found = _store.get(proposal_id)
+    if found is None:
+        raise ValueError(f"proposal not found: {proposal_id}")
+    data, version = found
+    return Proposal.model_validate({**data, "version": version})
+
+
+def _save_proposal(proposal: Proposal) -> Proposal:
+    """Write back a proposal read at `proposal.version`; raises ProposalConflict if it changed meanwhile."""
+    data = proposal.model_dump(mode="json", exclude={"version"})
+    proposal.version = _store.compare_and_set(proposal.id, data, proposal.version, _proposal_ttl(proposal))
+    return proposal
+
+
+def _save_if_unchanged(proposal: Proposal) -> None:
+    """`_save_proposal`, except that losing to a concurrent change is fine (whoever changed it owns it now)."""
+    try:
+        _save_proposal(proposal)
+    except ProposalConflict:
+        pass
+
+
+def _commit_in_flight(proposal: Proposal) -> bool:
+    if proposal.commit_started_at is None:
+        return False
+    started = datetime.fromisoformat(proposal.commit_started_at)
+    return (datetime.now(timezone.utc) - started).total_seconds() < COMMIT_STALE_SECONDS
+
+
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+_RETRY_STATUSES = (502, 503, 504)
+_async_client: httpx.AsyncClient | None = None
+
+
+def _http_async_client() -> httpx.AsyncClient:
+    # Created lazily inside the server's event loop; connection errors are retried by the transport.
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            base_url=API_BASE,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE),
+            transport=httpx.AsyncHTTPTransport(retries=HTTP_RETRIES),
+        )
+    return _async_client
+
+
+def _request_headers(actor_id: str, actor_name: str | None) -> dict[str, str]:
     headers = {
         "Content-Type": "application/json",
         "X-Decision-Actor-Id": actor_id,
     }
     if actor_name:
         headers["X-Decision-Actor-Name"] = actor_name
+    return headers
 
-    response = requests.request(
-        method=method,
-        url=f"{API_BASE}{path}",
-        params=query,
-        json=body,
-        headers=headers,
-        timeout=REQUEST_TIMEOUT_SECONDS,
-    )
+
+def _response_result(method: str, path: str, response: httpx.Response) -> dict[str, Any]:
     if response.status_code == 204:
         return {"status_code": response.status_code, "body": None}
 
     try:
         parsed = response.json()
-    except requests.JSONDecodeError:
+    except ValueError:
         parsed = {"raw": response.text}
 
-    if not response.ok:
+    if response.status_code >= 400:
         raise RuntimeError(f"{method} {path} failed ({response.status_code}): {parsed}")
     return {"status_code": response.status_code, "body": parsed}
 
 
+async def _arequest(
+    method: str,
+    path: str,
+    actor_id: str,
+    actor_name: str | None,
+    body: dict[str, Any] | None = None,
+    query: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """Call the API without blocking the event loop; gateway errors are retried for idempotent methods only."""
+    attempts = 1 + (HTTP_RETRIES if method in _IDEMPOTENT_METHODS else 0)
+    for attempt in range(attempts):
+        response = await _http_async_client().request(
+            method,
+            path,
+            params=query,
+            json=body,
+            headers={**_request_headers(actor_id, actor_name), **(headers or {})},
+        )
+        if response.status_code not in _RETRY_STATUSES or attempt == attempts - 1:
+            break
+        await asyncio.sleep(HTTP_BACKOFF_SECONDS * (2**attempt))
+    return _response_result(method, path, response)
+
+
 def _required(payload: dict[str, Any], fields: list[str], op_type: str) -> None:
     missing = [field for field in fields if field not in payload]
     if missing:
@@ -289,64 +383,68 @@ def _proposal_output(proposal: Proposal) -> dict[str, Any]:
         "created_at": proposal.created_at,
         "confirmed_at": proposal.confirmed_at,
         "committed_at": proposal.committed_at,
+        "commit_started_at": proposal.commit_started_at,
         "operation_preview": proposal.operation_preview,
         "commit_results": proposal.commit_results,
+        "version": proposal.version,
     }
 
 
 @mcp.tool()
-def server_health() -> dict[str, Any]:
+async def server_health() -> dict[str, Any]:
     """Verify MCP server and Decision API connectivity."""
-    result = _request("GET", "/health", actor_id="mcp-system", actor_name=SERVER_NAME)
+    result = await _arequest("GET", "/health", actor_id="mcp-system", actor_name=SERVER_NAME)
     return {"mcp_server": SERVER_NAME, "api_base": API_BASE, "api_health": result["body"]}
 
 
 @mcp.tool()
-def list_families() -> dict[str, Any]:
+async def list_families() -> dict[str, Any]:
     """Read families."""
-    return _request("GET", "/families", actor_id="read-only", actor_name=SERVER_NAME)["body"]
+    return (await _arequest("GET", "/families", actor_id="read-only", actor_name=SERVER_NAME))["body"]
 
 
 @mcp.tool()
-def list_family_members(family_id: int) -> dict[str, Any]:
+async def list_family_members(family_id: int) -> dict[str, Any]:
     """Read members for a family."""
-    return _request("GET", f"/families/{family_id}/members", actor_id="read-only", actor_name=SERVER_NAME)["body"]
+    return (await _arequest("GET", f"/families/{family_id}/members", actor_id="read-only", actor_name=SERVER_NAME))["body"]
 
 
 @mcp.tool()
-def list_goals(family_id: int, active_only: bool = False) -> dict[str, Any]:
+async def list_goals(family_id: int, active_only: bool = False) -> dict[str, Any]:
     """Read goals for a family."""
-    return _request(
+    result = await _arequest(
         "GET",
         "/goals",
         actor_id="read-only",
         actor_name=SERVER_NAME,
         query={"family_id": family_id, "active_only": str(active_only).lower()},
-    )["body"]
+    )
+    return result["body"]
 
 
 @mcp.tool()
-def list_decisions(family_id: int, include_scores: bool = True) -> dict[str, Any]:
+async def list_decisions(family_id: int, include_scores: bool = True) -> dict[str, Any]:
     """Read decisions for a family."""
-    return _request(
+    result = await _arequest(
         "GET",
         "/decisions",
         actor_id="read-only",
         actor_name=SERVER_NAME,
         query={"family_id": family_id, "include_scores": str(include_scores).lower()},
-    )["body"]
+    )
+    return result["body"]
 
 
 @mcp.tool()
-def list_roadmap_items(family_id: int) -> dict[str, Any]:
+async def list_roadmap_items(family_id: int) -> dict[str, Any]:
     """Read roadmap items for a family."""
-    return _request("GET", "/roadmap", actor_id="read-only", actor_name=SERVER_NAME, query={"family_id": family_id})["body"]
+    return (await _arequest("GET", "/roadmap", actor_id="read-only", actor_name=SERVER_NAME, query={"family_id": family_id}))["body"]
 
 
 @mcp.tool()
-def get_budget_summary(family_id: int) -> dict[str, Any]:
+async def get_budget_summary(family_id: int) -> dict[str, Any]:
     """Read discretionary budget summary for a family."""
-    return _request("GET", f"/budgets/families/{family_id}", actor_id="read-only", actor_name=SERVER_NAME)["body"]
+    return (await _arequest("GET", f"/budgets/families/{family_id}", actor_id="read-only", actor_name=SERVER_NAME))["body"]
 
 
 @mcp.tool()
@@ -377,8 +475,7 @@ def propose_changes(
         created_at=_now_iso(),
     )
 
-    with _proposal_lock:
-        _proposals[proposal.id] = proposal
+    proposal.version = _store.create(proposal.id, proposal.model_dump(mode="json", exclude={"version"}), _proposal_ttl(proposal))
     _append_audit_event("proposal_created", _proposal_output(proposal))
     return _proposal_output(proposal)
 
@@ -386,27 +483,20 @@ def propose_changes(
 @mcp.tool()
 def get_proposal(proposal_id: str) -> dict[str, Any]:
     """Fetch current proposal state."""
-    with _proposal_lock:
-        proposal = _proposals.get(proposal_id)
-    if proposal is None:
-        raise ValueError(f"proposal not found: {proposal_id}")
-    return _proposal_output(proposal)
+    return _proposal_output(_load_proposal(proposal_id))
 
 
 @mcp.tool()
 def confirm_proposal(proposal_id: str, actor_id: str, confirmation_note: str) -> dict[str, Any]:
     """Confirm a staged proposal before commit."""
-    with _proposal_lock:
-        proposal = _proposals.get(proposal_id)
-        if proposal is None:
-            raise ValueError(f"proposal not found: {proposal_id}")
-        if proposal.status != "proposed":
-            raise ValueError(f"proposal status is {proposal.status}; only proposed items can be confirmed")
-        if proposal.actor_id != actor_id:
-            raise ValueError("actor_id must match proposal owner")
-        proposal.status = "confirmed"
-        proposal.confirmed_at = _now_iso()
-        _proposals[proposal_id] = proposal
+    proposal = _load_proposal(proposal_id)
+    if proposal.status != "proposed":
+        raise ValueError(f"proposal status is {proposal.status}; only proposed items can be confirmed")
+    if proposal.actor_id != actor_id:
+        raise ValueError("actor_id must match proposal owner")
+    proposal.status = "confirmed"
+    proposal.confirmed_at = _now_iso()
+    _save_proposal(proposal)
 
     _append_audit_event(
         "proposal_confirmed",
@@ -423,52 +513,96 @@ def confirm_proposal(proposal_id: str, actor_id: str, confirmation_note: str) ->
 @mcp.tool()
 def cancel_proposal(proposal_id: str, actor_id: str, reason: str) -> dict[str, Any]:
     """Cancel a staged proposal."""
-    with _proposal_lock:
-        proposal = _proposals.get(proposal_id)
-        if proposal is None:
-            raise ValueError(f"proposal not found: {proposal_id}")
-        if proposal.status in {"committed", "canceled"}:
-            raise ValueError(f"proposal already {proposal.status}")
-        if proposal.actor_id != actor_id:
-            raise ValueError("actor_id must match proposal owner")
-        proposal.status = "canceled"
-        _proposals[proposal_id] = proposal
+    proposal = _load_proposal(proposal_id)
+    if proposal.status == "committing":
+        # The batch may already be applied; commit_proposal settles it either way.
+        raise ValueError("proposal is committing; call commit_proposal to complete it")
+    if proposal.status in {"committed", "canceled"}:
+        raise ValueError(f"proposal already {proposal.status}")
+    if proposal.actor_id != actor_id:
+        raise ValueError("actor_id must match proposal owner")
+    proposal.status = "canceled"
+    _save_proposal(proposal)
 
     _append_audit_event("proposal_canceled", {"proposal_id": proposal_id, "actor_id": actor_id, "reason": reason})
     return _proposal_output(proposal)
 
 
 @mcp.tool()
-def commit_proposal(proposal_id: str, actor_id: str) -> dict[str, Any]:
-    """Persist a confirmed proposal as atomic, ordered API calls."""
-    with _proposal_lock:
-        proposal = _proposals.get(proposal_id)
-        if proposal is None:
-            raise ValueError(f"proposal not found: {proposal_id}")
-        if proposal.status != "confirmed":
-            raise ValueError(f"proposal status is {proposal.status}; only confirmed items can be committed")
-        if proposal.actor_id != actor_id:
-            raise ValueError("actor_id must match proposal owner")
+async def commit_proposal(proposal_id: str, actor_id: str) -> dict[str, Any]:
+    """
+    Persist a confirmed proposal: all operations, in order, in one API transaction (POST /batch).
+
+    Also resolves a proposal left in `committing`: at once after a lost API response, or after
+    DECISION_MCP_COMMIT_STALE_SECONDS if the replica that was committing it stopped. The batch carries the
+    proposal id as its Idempotency-Key, so the API applies it at most once and a repeat returns the
+    original results.
+    """
+    proposal = _load_proposal(proposal_id)
+    if proposal.status not in {"confirmed", "committing"}:
+        raise ValueError(f"proposal status is {proposal.status}; only confirmed items can be committed")
+    if proposal.actor_id != actor_id:
+        raise ValueError("actor_id must match proposal owner")
+    if proposal.status == "committing" and _commit_in_flight(proposal):
+        raise ValueError("proposal is being committed; retry once that commit has finished or timed out")
+    # Claim the commit first: of two concurrent claims (any replica), only one gets past this save. A
+    # taken-over claim can still finish its request; the idempotency key keeps that to one application.
+    proposal.status = "committing"
+    proposal.commit_started_at = _now_iso()
+    _save_proposal(proposal)
 
     plans = [_to_plan(op) for op in proposal.operations]
-    results: list[dict[str, Any]] = []
-    for index, plan in enumerate(plans, start=1):
-        result = _request(plan.method, plan.path, actor_id=proposal.actor_id, actor_name=proposal.actor_name, body=plan.body)
-        results.append(
-            {
-                "index": index,
-                "summary": plan.summary,
-                "request": {"method": plan.method, "path": plan.path, "body": plan.body},
-                "response": result,
-            }
+    batch = {"operations": [{"method": plan.method, "path": plan.path, "body": plan.body} for plan in plans]}
+    try:
+        response = await _arequest(
+            "POST",
+            "/batch",
+            actor_id=proposal.actor_id,
+            actor_name=proposal.actor_name,
+            body=batch,
+            headers={"Idempotency-Key": f"mcp-proposal-{proposal.id}"},
         )
+    except RuntimeError:
+        # The API answered with an error: the batch rolled back as a whole, so back to confirmed and the
+        # owner can fix, retry or cancel.
+        proposal.status = "confirmed"
+        proposal.commit_started_at = None
+        _save_if_unchanged(proposal)
+        raise
+    except httpx.HTTPError as exc:
+        # No answer (timeout, dropped connection): the batch may or may not have been applied. Stay in
+        # committing, with no request in flight, so calling commit_proposal again finds out safely.
+        proposal.commit_started_at = None
+        _save_if_unchanged(proposal)
+        _append_audit_event("proposal_commit_unknown", {"proposal_id": proposal.id, "actor_id": actor_id, "error": str(exc)})
+        raise RuntimeError(
+            f"commit of proposal {proposal.id} has an unknown outcome ({exc.__class__.__name__}); "
+            "call commit_proposal again to complete or confirm it"
+        ) from exc
+
+    results = [
+        {
+            "index": index,
+            "summary": plan.summary,
+            "request": {"method": plan.method, "path": plan.path, "body": plan.body},
+            "response": {"status_code": result["status_code"], "body": result["body"]},
+        }
+        for index, (plan, result) in enumerate(zip(plans, response["body"]["results"]), start=1)
+    ]
 
-    with _proposal_lock:
-        proposal = _proposals[proposal_id]
+    while True:
         proposal.status = "committed"
         proposal.committed_at = _now_iso()
+        proposal.commit_started_at = None
         proposal.commit_results = results
-        _proposals[proposal_id] = proposal
+        try:
+            _save_proposal(proposal)
+            break
+        except ProposalConflict:
+            # Another call took the commit over meanwhile; the batch was applied once either way.
+            proposal = _load_proposal(proposal_id)
+            if proposal.status == "committed":
+                return _proposal_output(proposal)
 
     _append_audit_event("proposal_committed", _proposal_output(proposal))
     return _proposal_output(proposal)
@@ -0,0 +1,48 @@
+import os
+import tempfile
+
+# The server builds its audit writer and proposal store at import: keep both out of the working tree.
+os.environ.setdefault("DECISION_MCP_AUDIT_LOG_PATH", os.path.join(tempfile.mkdtemp(), "audit.jsonl"))
+os.environ.pop("DECISION_MCP_REDIS_URL", None)
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+import server  # noqa: E402
+from proposal_store import MemoryProposalStore  # noqa: E402
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeApi:
+    """Stands in for the Decision API: records requests and answers with `respond` (sync or async)."""
+
+    def __init__(self) -> None:
+        self.requests: list[httpx.Request] = []
+        self.respond = lambda request: httpx.Response(200, json={"results": []})
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        response = self.respond(request)
+        return await response if hasattr(response, "__await__") else response
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def api(monkeypatch, clock):
+    fake = FakeApi()
+    monkeypatch.setattr(server, "_store", MemoryProposalStore(clock=clock))
+    monkeypatch.setattr(
+        server, "_async_client", httpx.AsyncClient(base_url="http://api/v1", transport=httpx.MockTransport(fake.handler))
+    )
+    return fake
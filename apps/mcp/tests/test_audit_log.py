@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import audit_log
+from audit_log import AuditLogWriter, audit_segments, iter_audit_events
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _event(index: int, **fields) -> dict:
+    return {"ts": datetime.now(timezone.utc).isoformat(), "event_type": "proposal_created", "index": index, **fields}
+
+
+def test_writer_rotates_by_size_and_reads_segments_oldest_first(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    writer = AuditLogWriter(path, max_bytes=300, fsync_seconds=0.01)
+    for index in range(20):
+        writer.write(_event(index, proposal_id=f"p{index % 2}"))
+        time.sleep(0.002)
+    writer.close()
+
+    segments = audit_segments(path)
+    assert len(segments) > 2
+    rotated_at = [audit_log._segment_time(segment, path) for segment in segments if segment != path]
+    assert rotated_at == sorted(rotated_at)
+    # Everything written before close() is on disk, in write order, across segments.
+    assert [row["index"] for row in iter_audit_events(path)] == list(range(20))
+    assert [row["index"] for row in iter_audit_events(path, proposal_id="p1")] == list(range(1, 20, 2))
+    assert list(iter_audit_events(path, event_type="proposal_committed")) == []
+
+
+def test_full_queue_drops_events_and_records_the_count(tmp_path):
+    gate = threading.Event()
+
+    class GatedWriter(AuditLogWriter):
+        def _write_batch(self, batch):
+            gate.wait()
+            super()._write_batch(batch)
+
+    path = str(tmp_path / "audit.jsonl")
+    writer = GatedWriter(path, queue_size=1, fsync_seconds=0.01)
+    assert writer.write(_event(0))
+    _wait_for(writer._queue.empty)  # the writer thread holds event 0 at the gate
+    assert writer.write(_event(1))
+    assert not writer.write(_event(2))
+    assert not writer.write(_event(3))
+    gate.set()
+    writer.close()
+
+    # The marker goes out with the batch being written when the drops are noticed.
+    rows = list(iter_audit_events(path))
+    assert [row.get("index") for row in rows] == [0, None, 1]
+    assert rows[1]["event_type"] == "audit_events_dropped" and rows[1]["count"] == 2
+
+
+def test_writer_rotates_by_age_while_idle_and_across_restarts(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    writer = AuditLogWriter(path, rotate_seconds=0.2, fsync_seconds=0.02)
+    writer.write(_event(0))
+    # No further writes: the idle writer still rotates the file once its first record is old enough.
+    _wait_for(lambda: audit_segments(path) and path not in audit_segments(path))
+    writer.close()
+
+    # A file left by an earlier process is aged by its first record, not by when it was reopened.
+    stale = {**_event(1), "ts": (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat()}
+    with open(path, "w") as handle:
+        handle.write(json.dumps(stale) + "\n")
+    restarted = AuditLogWriter(path, rotate_seconds=3600, fsync_seconds=0.02)
+    _wait_for(lambda: path not in audit_segments(path))
+    restarted.close()
+    assert [row["index"] for row in iter_audit_events(path)] == [0, 1]
+
+
+def test_zstd_segments_are_compressed_and_readable(tmp_path):
+    pytest.importorskip("zstandard")
+    path = str(tmp_path / "audit.jsonl")
+    writer = AuditLogWriter(path, max_bytes=200, compress="zstd", fsync_seconds=0.01)
+    for index in range(10):
+        writer.write(_event(index))
+        time.sleep(0.002)
+    writer.close()
+
+    rotated = [segment for segment in audit_segments(path) if segment != path]
+    assert rotated and all(segment.endswith(".zst") for segment in rotated)
+    assert [row["index"] for row in iter_audit_events(path)] == list(range(10))
+
+
+def test_since_skips_segments_rotated_before_it(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "audit.jsonl")
+    writer = AuditLogWriter(path, max_bytes=1, fsync_seconds=0.01)
+    writer.write(_event(0))
+    _wait_for(lambda: len(audit_segments(path)) == 1 and path not in audit_segments(path))
+    since = datetime.now(timezone.utc)
+    time.sleep(0.01)
+    writer.write(_event(1))
+    writer.close()
+    old_segment, new_segment = audit_segments(path)
+
+    read: list[str] = []
+    original = audit_log._read_lines
+    monkeypatch.setattr(audit_log, "_read_lines", lambda segment: read.append(segment) or original(segment))
+    assert audit_log.main(["--path", path, "--since", since.isoformat()]) == 0
+    assert [json.loads(line)["index"] for line in capsys.readouterr().out.splitlines()] == [1]
+    assert read == [new_segment]
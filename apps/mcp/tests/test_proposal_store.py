@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+
+from proposal_store import MemoryProposalStore, ProposalConflict
+
+
+def test_compare_and_set_rejects_stale_versions(clock):
+    store = MemoryProposalStore(clock=clock)
+    assert store.create("p1", {"status": "proposed"}, ttl_seconds=60) == 1
+    with pytest.raises(ProposalConflict):
+        store.create("p1", {"status": "proposed"}, ttl_seconds=60)
+
+    data, version = store.get("p1")
+    data["status"] = "mutated"  # callers get a copy
+    assert store.get("p1") == ({"status": "proposed"}, 1)
+
+    assert store.compare_and_set("p1", {"status": "confirmed"}, version, ttl_seconds=60) == 2
+    # A second writer that read version 1 loses.
+    with pytest.raises(ProposalConflict):
+        store.compare_and_set("p1", {"status": "canceled"}, version, ttl_seconds=60)
+    assert store.get("p1") == ({"status": "confirmed"}, 2)
+    with pytest.raises(ProposalConflict):
+        store.compare_and_set("missing", {}, 1, ttl_seconds=60)
+
+
+def test_entries_expire_after_their_ttl(clock):
+    store = MemoryProposalStore(clock=clock)
+    store.create("p1", {"status": "proposed"}, ttl_seconds=60)
+    clock.now += 59
+    # Every write restarts the TTL.
+    assert store.compare_and_set("p1", {"status": "confirmed"}, 1, ttl_seconds=60) == 2
+    clock.now += 59
+    assert store.get("p1") is not None
+
+    clock.now += 1
+    assert store.get("p1") is None
+    with pytest.raises(ProposalConflict):
+        store.compare_and_set("p1", {"status": "committed"}, 2, ttl_seconds=60)
+    # An expired id is free again.
+    assert store.create("p1", {"status": "proposed"}, ttl_seconds=60) == 1
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import server
+from proposal_store import ProposalConflict
+
+
+def _propose(actor_id: str = "parent@example.com") -> str:
+    proposal = server.propose_changes(
+        actor_id=actor_id,
+        rationale="new family",
+        operations=[server.Operation(type="create_family", payload={"name": "Family"})],
+    )
+    assert proposal["status"] == "proposed" and proposal["version"] == 1
+    return proposal["id"]
+
+
+def _confirmed() -> str:
+    proposal_id = _propose()
+    assert server.confirm_proposal(proposal_id, "parent@example.com", "ok")["status"] == "confirmed"
+    return proposal_id
+
+
+def _applied(request: httpx.Request) -> httpx.Response:
+    operations = json.loads(request.content)["operations"]
+    return httpx.Response(200, json={"results": [{"index": i, "status_code": 201, "body": {"id": 7}} for i in range(len(operations))]})
+
+
+def test_confirm_and_cancel_transitions(api):
+    proposal_id = _propose()
+    with pytest.raises(ValueError, match="actor_id must match"):
+        server.confirm_proposal(proposal_id, "someone@example.com", "ok")
+    server.confirm_proposal(proposal_id, "parent@example.com", "ok")
+    with pytest.raises(ValueError, match="only proposed items can be confirmed"):
+        server.confirm_proposal(proposal_id, "parent@example.com", "again")
+
+    # A copy read before the confirmation cannot be written back over it.
+    stale = server._load_proposal(proposal_id)
+    server.cancel_proposal(proposal_id, "parent@example.com", "changed my mind")
+    stale.status = "committing"
+    with pytest.raises(ProposalConflict):
+        server._save_proposal(stale)
+    assert server.get_proposal(proposal_id)["status"] == "canceled"
+    with pytest.raises(ValueError, match="already canceled"):
+        server.cancel_proposal(proposal_id, "parent@example.com", "again")
+
+
+@pytest.mark.asyncio
+async def test_commit_sends_one_idempotent_batch(api):
+    proposal_id = _propose()
+    with pytest.raises(ValueError, match="only confirmed items can be committed"):
+        await server.commit_proposal(proposal_id, "parent@example.com")
+    server.confirm_proposal(proposal_id, "parent@example.com", "ok")
+
+    api.respond = _applied
+    committed = await server.commit_proposal(proposal_id, "parent@example.com")
+    assert committed["status"] == "committed" and committed["commit_started_at"] is None
+    assert committed["commit_results"][0]["response"] == {"status_code": 201, "body": {"id": 7}}
+    (request,) = api.requests
+    assert request.url.path == "/v1/batch"
+    assert request.headers["Idempotency-Key"] == f"mcp-proposal-{proposal_id}"
+    assert json.loads(request.content)["operations"] == [{"method": "POST", "path": "/families", "body": {"name": "Family"}}]
+
+    with pytest.raises(ValueError, match="status is committed"):
+        await server.commit_proposal(proposal_id, "parent@example.com")
+    with pytest.raises(ValueError, match="already committed"):
+        server.cancel_proposal(proposal_id, "parent@example.com", "too late")
+
+
+@pytest.mark.asyncio
+async def test_api_error_returns_the_proposal_to_confirmed(api):
+    proposal_id = _confirmed()
+    api.respond = lambda request: httpx.Response(409, json={"detail": "duplicate"})
+    with pytest.raises(RuntimeError, match="409"):
+        await server.commit_proposal(proposal_id, "parent@example.com")
+    assert server.get_proposal(proposal_id)["status"] == "confirmed"
+
+    api.respond = _applied
+    assert (await server.commit_proposal(proposal_id, "parent@example.com"))["status"] == "committed"
+
+
+@pytest.mark.asyncio
+async def test_unknown_outcome_stays_committing_until_commit_is_called_again(api):
+    proposal_id = _confirmed()
+
+    def timeout(request):
+        raise httpx.ReadTimeout("read timed out", request=request)
+
+    api.respond = timeout
+    with pytest.raises(RuntimeError, match="unknown outcome"):
+        await server.commit_proposal(proposal_id, "parent@example.com")
+    proposal = server.get_proposal(proposal_id)
+    assert proposal["status"] == "committing" and proposal["commit_started_at"] is None
+    with pytest.raises(ValueError, match="call commit_proposal"):
+        server.cancel_proposal(proposal_id, "parent@example.com", "unsure")
+
+    # Re-entering from committing resends the same batch; the key lets the API apply it once.
+    api.respond = _applied
+    assert (await server.commit_proposal(proposal_id, "parent@example.com"))["status"] == "committed"
+    assert {request.headers["Idempotency-Key"] for request in api.requests} == {f"mcp-proposal-{proposal_id}"}
+
+
+@pytest.mark.asyncio
+async def test_in_flight_commit_is_taken_over_only_once_stale(api, monkeypatch):
+    proposal_id = _confirmed()
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return _applied(request)
+
+    api.respond = slow
+    first = asyncio.create_task(server.commit_proposal(proposal_id, "parent@example.com"))
+    while server.get_proposal(proposal_id)["status"] != "committing":
+        await asyncio.sleep(0)
+    with pytest.raises(ValueError, match="being committed"):
+        await server.commit_proposal(proposal_id, "parent@example.com")
+
+    # The first call's replica is presumed dead: a second call takes over and commits.
+    monkeypatch.setattr(server, "COMMIT_STALE_SECONDS", 0)
+    api.respond = _applied
+    assert (await server.commit_proposal(proposal_id, "parent@example.com"))["status"] == "committed"
+    # The first call's request still completes; it reports the commit instead of a conflict.
+    release.set()
+    assert (await first)["status"] == "committed"
+    assert len(api.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_committed_proposals_are_kept_for_the_retention_period(api, clock, monkeypatch):
+    monkeypatch.setattr(server, "PROPOSAL_TTL_SECONDS", 60)
+    monkeypatch.setattr(server, "PROPOSAL_RETENTION_SECONDS", 600)
+    open_id = _propose()
+    committed_id = _confirmed()
+    api.respond = _applied
+    await server.commit_proposal(committed_id, "parent@example.com")
+
+    clock.now += 61
+    with pytest.raises(ValueError, match="proposal not found"):
+        server.get_proposal(open_id)
+    assert server.get_proposal(committed_id)["status"] == "committed"
+
+    clock.now += 540
+    with pytest.raises(ValueError, match="proposal not found"):
+        server.get_proposal(committed_id)
@@ -19,6 +19,18 @@ celery_app.conf.beat_schedule = {
         "task": "worker.tasks.send_roadmap_nudges",
         "schedule": 604800.0,
     },
+    "memory-compaction": {
+        "task": "worker.tasks.compact_memory_documents",
+        "schedule": 86400.0,
+    },
+    "memory-retention": {
+        "task": "worker.tasks.apply_memory_retention",
+        "schedule": 86400.0,
+    },
+    "family-purge-resume": {
+        "task": "worker.tasks.resume_family_purges",
+        "schedule": 600.0,
+    },
     "quarterly-rollover-check": {
         "task": "worker.tasks.run_period_rollover",
         "schedule": 86400.0,
@@ -77,6 +77,51 @@ def run_period_rollover():
     return {"job": "period_rollover", "status": "stub"}
 
 
+@celery_app.task
+def compact_memory_documents():
+    base = os.environ.get("DECISION_API_BASE_URL", "http://api:8000/v1").rstrip("/")
+    token = os.environ.get("INTERNAL_ADMIN_TOKEN", "")
+    if not token:
+        return {"job": "memory_compaction", "status": "skipped", "reason": "missing INTERNAL_ADMIN_TOKEN"}
+
+    try:
+        resp = httpx.post(f"{base}/admin/memory/compact", headers={"X-Internal-Admin-Token": token}, timeout=600.0)
+        resp.raise_for_status()
+        return {"job": "memory_compaction", "status": "ok", "result": resp.json()}
+    except Exception as exc:
+        return {"job": "memory_compaction", "status": "error", "error": str(exc)}
+
+
+@celery_app.task
+def apply_memory_retention():
+    base = os.environ.get("DECISION_API_BASE_URL", "http://api:8000/v1").rstrip("/")
+    token = os.environ.get("INTERNAL_ADMIN_TOKEN", "")
+    if not token:
+        return {"job": "memory_retention", "status": "skipped", "reason": "missing INTERNAL_ADMIN_TOKEN"}
+
+    try:
+        resp = httpx.post(f"{base}/admin/memory/retention", headers={"X-Internal-Admin-Token": token}, timeout=600.0)
+        resp.raise_for_status()
+        return {"job": "memory_retention", "status": "ok", "result": resp.json()}
+    except Exception as exc:
+        return {"job": "memory_retention", "status": "error", "error": str(exc)}
+
+
+@celery_app.task
+def resume_family_purges():
+    base = os.environ.get("DECISION_API_BASE_URL", "http://api:8000/v1").rstrip("/")
+    token = os.environ.get("INTERNAL_ADMIN_TOKEN", "")
+    if not token:
+        return {"job": "family_purge_resume", "status": "skipped", "reason": "missing INTERNAL_ADMIN_TOKEN"}
+
+    try:
+        resp = httpx.post(f"{base}/admin/families/purge-jobs/resume", headers={"X-Internal-Admin-Token": token}, timeout=60.0)
+        resp.raise_for_status()
+        return {"job": "family_purge_resume", "status": "ok", "result": resp.json()}
+    except Exception as exc:
+        return {"job": "family_purge_resume", "status": "error", "error": str(exc)}
+
+
 @celery_app.task
 def sync_keycloak_families():
     base = os.environ.get("DECISION_API_BASE_URL", "http://api:8000/v1").rstrip("/")